@@ -0,0 +1,241 @@
+"""
+Magasin local des annonces suivies (SQLite).
+
+- ``annonces`` : dernier état connu de chaque annonce (une ligne par URL),
+  avec l'empreinte des champs extraits et les dates de récupération ;
+- ``historique_prix`` : une ligne par prix observé différent du précédent.
+
+Les coordonnées (géocodage de l'adresse) sont conservées à part : elles
+n'entrent pas dans l'empreinte et une extraction sans coordonnées
+n'efface pas celles déjà connues. De même, un prix absent d'une extraction
+partielle ne remplace pas le dernier prix connu.
+
+Les écritures se font par lots dans une seule transaction (executemany),
+ce qui permet d'ingérer des dizaines de milliers d'annonces rapidement.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+from cache_http import DOSSIER_CACHE
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SCHÉMA
+# ═══════════════════════════════════════════════════════════════════════════
+
+# Emplacement fixe : crawler.py et l'application partagent la base quel que soit le dossier courant
+FICHIER_ANNONCES = DOSSIER_CACHE / "annonces.sqlite"
+
+# Champs extraits conservés pour chaque annonce (voir scraper.extraire_donnees)
+CHAMPS_ANNONCE = (
+    "plateforme", "prix", "type_immeuble", "nb_logements", "adresse",
+    "ville", "revenus_bruts", "depenses",
+)
+
+# Coordonnées issues du géocodage (voir geocodage.py), hors empreinte
+CHAMPS_POSITION = ("latitude", "longitude")
+
+# Taille des paquets de paramètres « IN (?, ?, ...) » (limite SQLite prudente)
+_TAILLE_PAQUET = 900
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS annonces (
+    url             TEXT PRIMARY KEY,
+    plateforme      TEXT,
+    prix            REAL,
+    type_immeuble   TEXT,
+    nb_logements    INTEGER,
+    adresse         TEXT,
+    ville           TEXT,
+    revenus_bruts   REAL,
+    depenses        REAL,
+    latitude        REAL,
+    longitude       REAL,
+    empreinte       TEXT NOT NULL,
+    premier_vu_le   REAL NOT NULL,
+    recupere_le     REAL NOT NULL,
+    modifie_le      REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS annonces_recupere_le ON annonces(recupere_le);
+CREATE TABLE IF NOT EXISTS historique_prix (
+    url         TEXT NOT NULL,
+    prix        REAL,
+    observe_le  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS historique_prix_url ON historique_prix(url, observe_le);
+"""
+
+
+def empreinte_annonce(donnees: dict) -> str:
+    """Empreinte des champs extraits : change dès qu'un champ change."""
+    champs = {cle: donnees.get(cle) for cle in CHAMPS_ANNONCE}
+    return hashlib.sha256(json.dumps(champs, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _paquets(elements: list, taille: int = _TAILLE_PAQUET):
+    for debut in range(0, len(elements), taille):
+        yield elements[debut:debut + taille]
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# MAGASIN
+# ═══════════════════════════════════════════════════════════════════════════
+
+class MagasinAnnonces:
+    """Accès à la base d'annonces."""
+
+    def __init__(self, chemin: str | Path = FICHIER_ANNONCES):
+        self.chemin = Path(chemin)
+        self.chemin.parent.mkdir(parents=True, exist_ok=True)
+        self._connexion = sqlite3.connect(self.chemin, isolation_level=None)
+        self._connexion.execute("PRAGMA journal_mode=WAL")
+        self._connexion.execute("PRAGMA synchronous=NORMAL")
+        self._connexion.executescript(_SCHEMA)
+        # Bases créées avant l'ajout des coordonnées
+        colonnes = {ligne[1] for ligne in self._connexion.execute("PRAGMA table_info(annonces)")}
+        for champ in CHAMPS_POSITION:
+            if champ not in colonnes:
+                self._connexion.execute(f"ALTER TABLE annonces ADD COLUMN {champ} REAL")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+    def fermer(self) -> None:
+        self._connexion.close()
+
+    # ── Fraîcheur ────────────────────────────────────────────────────────────
+
+    def urls_a_rafraichir(self, urls: Iterable[str], ttl: float, maintenant: float | None = None) -> list[str]:
+        """
+        URLs absentes de la base ou récupérées il y a plus de ``ttl`` s,
+        dans l'ordre d'entrée et sans doublons.
+        """
+        limite = (maintenant or time.time()) - ttl
+        urls = list(dict.fromkeys(urls))
+        recentes = set()
+        for paquet in _paquets(urls):
+            recentes.update(url for (url,) in self._connexion.execute(
+                f"SELECT url FROM annonces WHERE recupere_le >= ? AND url IN ({', '.join('?' * len(paquet))})",
+                (limite, *paquet),
+            ))
+        return [url for url in urls if url not in recentes]
+
+    # ── Écriture par lots ────────────────────────────────────────────────────
+
+    def enregistrer_lot(self, resultats: Iterable[dict], maintenant: float | None = None) -> dict:
+        """
+        Insère ou met à jour un lot de résultats de ``extraire_donnees``.
+
+        Les extractions sans aucun champ utile (page inaccessible) sont
+        ignorées pour ne pas écraser un état connu. Une ligne d'historique
+        est ajoutée quand un prix est lu et diffère du dernier prix connu.
+        Retourne le décompte : nouvelles, modifiees, inchangees, ignorees.
+        """
+        maintenant = maintenant or time.time()
+        lignes = {}
+        ignorees = 0
+        for donnees in resultats:
+            if all(donnees.get(cle) is None for cle in CHAMPS_ANNONCE if cle != "plateforme"):
+                ignorees += 1
+                continue
+            lignes[donnees["url"]] = donnees  # la dernière extraction d'une URL l'emporte
+
+        urls = list(lignes)
+        connues = {}
+        for paquet in _paquets(urls):
+            # Prix de comparaison : le dernier de l'historique (une extraction sans prix n'en ajoute pas)
+            for url, prix, empreinte in self._connexion.execute(
+                "SELECT url, (SELECT h.prix FROM historique_prix h WHERE h.url = a.url "
+                "ORDER BY h.observe_le DESC LIMIT 1), empreinte "
+                f"FROM annonces a WHERE url IN ({', '.join('?' * len(paquet))})", paquet
+            ):
+                connues[url] = (prix, empreinte)
+
+        valeurs, historique = [], []
+        nouvelles = modifiees = 0
+        for url, donnees in lignes.items():
+            empreinte = empreinte_annonce(donnees)
+            valeurs.append((url, *(donnees.get(cle) for cle in CHAMPS_ANNONCE + CHAMPS_POSITION),
+                            empreinte, maintenant, maintenant, maintenant))
+            connue = connues.get(url)
+            if connue is None:
+                nouvelles += 1
+            elif connue[1] != empreinte:
+                modifiees += 1
+            prix = donnees.get("prix")
+            if prix is not None and (connue is None or connue[0] != prix):
+                historique.append((url, prix, maintenant))
+
+        colonnes = ", ".join(CHAMPS_ANNONCE + CHAMPS_POSITION)
+        # Un prix ou des coordonnées absents d'une extraction partielle n'effacent pas ceux connus
+        conserves = ("prix", *CHAMPS_POSITION)
+        mises_a_jour = ", ".join(
+            f"{cle} = COALESCE(excluded.{cle}, annonces.{cle})" if cle in conserves else f"{cle} = excluded.{cle}"
+            for cle in CHAMPS_ANNONCE + CHAMPS_POSITION
+        )
+        self._connexion.execute("BEGIN")
+        try:
+            self._connexion.executemany(
+                f"INSERT INTO annonces (url, {colonnes}, empreinte, premier_vu_le, recupere_le, modifie_le) "
+                f"VALUES ({', '.join('?' * (len(CHAMPS_ANNONCE) + len(CHAMPS_POSITION) + 5))}) "
+                f"ON CONFLICT(url) DO UPDATE SET {mises_a_jour}, "
+                "modifie_le = CASE WHEN annonces.empreinte != excluded.empreinte "
+                "THEN excluded.recupere_le ELSE annonces.modifie_le END, "
+                "empreinte = excluded.empreinte, recupere_le = excluded.recupere_le",
+                valeurs,
+            )
+            self._connexion.executemany(
+                "INSERT INTO historique_prix (url, prix, observe_le) VALUES (?, ?, ?)", historique
+            )
+            self._connexion.execute("COMMIT")
+        except BaseException:
+            self._connexion.execute("ROLLBACK")
+            raise
+        return {
+            "nouvelles": nouvelles,
+            "modifiees": modifiees,
+            "inchangees": len(lignes) - nouvelles - modifiees,
+            "ignorees": ignorees,
+        }
+
+    # ── Lecture ──────────────────────────────────────────────────────────────
+
+    def annonce(self, url: str) -> dict | None:
+        curseur = self._connexion.execute("SELECT * FROM annonces WHERE url = ?", (url,))
+        ligne = curseur.fetchone()
+        if ligne is None:
+            return None
+        return dict(zip([c[0] for c in curseur.description], ligne))
+
+    def historique_prix(self, url: str) -> list[tuple[float, float | None]]:
+        """Prix observés d'une annonce : [(date, prix), ...] chronologiques."""
+        return self._connexion.execute(
+            "SELECT observe_le, prix FROM historique_prix WHERE url = ? ORDER BY observe_le", (url,)
+        ).fetchall()
+
+    def annonces_localisees(self) -> list[tuple]:
+        """
+        Annonces géocodées : [(url, latitude, longitude, type_immeuble,
+        nb_logements, prix, revenus_bruts), ...].
+        """
+        return self._connexion.execute(
+            "SELECT url, latitude, longitude, type_immeuble, nb_logements, prix, revenus_bruts "
+            "FROM annonces WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+        ).fetchall()
+
+    def statistiques(self) -> dict:
+        nb_annonces, nb_plateformes = self._connexion.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT plateforme) FROM annonces"
+        ).fetchone()
+        nb_changements = self._connexion.execute(
+            "SELECT COUNT(*) - COUNT(DISTINCT url) FROM historique_prix"
+        ).fetchone()[0]
+        return {"annonces": nb_annonces, "plateformes": nb_plateformes, "changements_prix": nb_changements}
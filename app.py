@@ -1,315 +1,185 @@
 """
 🏠 Analyseur de Rentabilité Immobilière
 Application Streamlit pour analyser la rentabilité d'un immeuble résidentiel au Québec.
-Fichier unique regroupant tous les modules : finance, scraper, localisation et UI.
-"""
+Interface utilisateur : les calculs viennent des modules finance, location et scraper.
 
-import re
-from urllib.parse import urlparse
+Les dépendances lourdes (pandas, plotly, requests/lxml) ne sont importées qu'au
+moment où la fonctionnalité qui en a besoin est utilisée, pour accélérer le
+démarrage à froid (voir benchmarks/bench_demarrage.py).
+"""
 
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import numpy as np
-import requests
-from bs4 import BeautifulSoup
+import streamlit as st
 
-try:
-    import numpy_financial as npf
-    _HAS_NPF = True
-except ImportError:
-    _HAS_NPF = False
+from finance import (
+    AXES_SENSIBILITE,
+    BAREMES,
+    analyse_annee_1,
+    calculer_couts_initiaux,
+    calculer_indicateurs,
+    calculer_paiement_hypothecaire,
+    grille_sensibilite,
+    mise_de_fonds_minimale,
+    prix_maximal,
+    projection_10_ans,
+    revenus_minimaux,
+    simulation_monte_carlo,
+)
+from location import CRITERES, DOSSIER_PROFILS, calculer_score_localisation, charger_profil
+from secteurs import extraire_code_postal, obtenir_secteurs
 
 
 # ╔═══════════════════════════════════════════════════════════════════════════╗
-# ║                    MODULE FINANCE — CALCULS FINANCIERS                   ║
+# ║                    COUCHE DE CALCUL MÉMOÏSÉE                             ║
 # ╚═══════════════════════════════════════════════════════════════════════════╝
-
-# --- Barèmes droits de mutation Québec 2026 ---
-TRANCHES_MUTATION_QC_2026 = [
-    (62_900, 0.005), (315_000, 0.01), (float("inf"), 0.015),
-]
-TRANCHES_MUTATION_MTL_2026 = [
-    (62_900, 0.005), (315_000, 0.01), (500_000, 0.015),
-    (1_000_000, 0.02), (2_000_000, 0.025), (3_113_000, 0.035),
-    (float("inf"), 0.04),
-]
-TRANCHES_MUTATION_QCV_2026 = [
-    (62_900, 0.005), (315_000, 0.01), (500_000, 0.015),
-    (750_000, 0.025), (float("inf"), 0.03),
-]
-BAREMES = {
-    "Québec (général)": TRANCHES_MUTATION_QC_2026,
-    "Montréal": TRANCHES_MUTATION_MTL_2026,
-    "Ville de Québec": TRANCHES_MUTATION_QCV_2026,
-}
-
-
-def calculer_droits_mutation(prix: float, bareme: str = "Québec (général)") -> float:
-    tranches = BAREMES.get(bareme, TRANCHES_MUTATION_QC_2026)
-    taxe, seuil_prec = 0.0, 0.0
-    for seuil, taux in tranches:
-        if prix <= seuil_prec:
-            break
-        taxe += (min(prix, seuil) - seuil_prec) * taux
-        seuil_prec = seuil
-    return round(taxe, 2)
-
-
-def calculer_couts_initiaux(prix, mise_de_fonds_pct=20.0, frais_notaire=2000.0,
-    frais_inspection=800.0, frais_evaluation=500.0, frais_comptable=500.0,
-    travaux_initiaux=0.0, frais_financement=0.0, bareme_mutation="Québec (général)"):
-    mise_de_fonds = prix * (mise_de_fonds_pct / 100)
-    droits_mutation = calculer_droits_mutation(prix, bareme_mutation)
-    couts = {
-        "Mise de fonds": mise_de_fonds, "Droits de mutation": droits_mutation,
-        "Frais de notaire": frais_notaire, "Inspection": frais_inspection,
-        "Évaluation bancaire": frais_evaluation, "Honoraires comptables": frais_comptable,
-        "Travaux initiaux": travaux_initiaux, "Frais de financement": frais_financement,
-    }
-    couts["Total coûts initiaux"] = sum(couts.values())
-    return couts
-
-
-def calculer_paiement_hypothecaire(montant, taux_annuel, amortissement_annees=25):
-    if montant <= 0 or taux_annuel <= 0:
-        return 0.0
-    r = taux_annuel / 100 / 12
-    n = amortissement_annees * 12
-    return round(montant * (r * (1 + r) ** n) / ((1 + r) ** n - 1), 2)
-
-
-def tableau_amortissement(montant, taux_annuel, amortissement_annees=25, annees=10):
-    r = taux_annuel / 100 / 12
-    pmt = calculer_paiement_hypothecaire(montant, taux_annuel, amortissement_annees)
-    solde, tableau = montant, []
-    for annee in range(1, annees + 1):
-        int_an, cap_an = 0.0, 0.0
-        for _ in range(12):
-            interet = solde * r
-            capital = pmt - interet
-            int_an += interet
-            cap_an += capital
-            solde -= capital
-        tableau.append({"Année": annee, "Paiement annuel": round(pmt * 12, 2),
-            "Intérêts": round(int_an, 2), "Capital remboursé": round(cap_an, 2),
-            "Solde restant": round(max(solde, 0), 2)})
-    return tableau
-
-
-def analyse_annee_1(prix, revenus_bruts_annuels, taux_inoccupation=5.0,
-    taxes_municipales=0.0, taxes_scolaires=0.0, assurances=0.0, entretien=0.0,
-    gestion_pct=0.0, autres_depenses=0.0, mise_de_fonds_pct=20.0,
-    taux_interet=5.0, amortissement=25, couts_initiaux=None):
-    vacance = revenus_bruts_annuels * (taux_inoccupation / 100)
-    revenus_nets = revenus_bruts_annuels - vacance
-    frais_gestion = revenus_nets * (gestion_pct / 100)
-    depenses = taxes_municipales + taxes_scolaires + assurances + entretien + frais_gestion + autres_depenses
-    noi = revenus_nets - depenses
-    hypotheque = prix * (1 - mise_de_fonds_pct / 100)
-    service_dette_annuel = calculer_paiement_hypothecaire(hypotheque, taux_interet, amortissement) * 12
-    cashflow = noi - service_dette_annuel
-    mdf_totale = couts_initiaux.get("Total coûts initiaux", prix * (mise_de_fonds_pct / 100)) if couts_initiaux else prix * (mise_de_fonds_pct / 100)
-    csd = revenus_nets / service_dette_annuel if service_dette_annuel > 0 else 0
-    ltv = hypotheque / prix if prix > 0 else 0
+# Streamlit réexécute tout le script à chaque interaction. Les calculs et les
+# figures sont donc mis en cache, indexés par le tuple normalisé des entrées :
+# changer un critère de localisation ne recalcule ni la projection ni ses graphiques.
+
+TAILLE_CACHE = 32
+
+
+def _cle_calcul(**entrees):
+    """Tuple trié (nom, valeur) des entrées, nombres convertis en float."""
+    return tuple(sorted((k, float(v) if isinstance(v, (int, float, np.number)) else v) for k, v in entrees.items()))
+
+
+@st.cache_data(max_entries=TAILLE_CACHE, show_spinner=False)
+def _analyse_complete(cle):
+    p = dict(cle)
+    couts_init = calculer_couts_initiaux(prix=p["prix"], mise_de_fonds_pct=p["mise_de_fonds_pct"],
+        frais_notaire=p["frais_notaire"], frais_inspection=p["frais_inspection"], frais_evaluation=p["frais_evaluation"],
+        frais_comptable=p["frais_comptable"], travaux_initiaux=p["travaux_initiaux"], frais_financement=p["frais_financement"],
+        bareme_mutation=p["bareme_mutation"])
+    depenses_fixes = p["taxes_municipales"] + p["taxes_scolaires"] + p["assurances"] + p["entretien"] + p["autres_depenses"]
+    depenses_exploitation = depenses_fixes + p["revenus_bruts_annuels"] * (1 - p["taux_inoccupation"] / 100) * p["gestion_pct"] / 100
+    an1 = analyse_annee_1(prix=p["prix"], revenus_bruts_annuels=p["revenus_bruts_annuels"],
+        taux_inoccupation=p["taux_inoccupation"], taxes_municipales=p["taxes_municipales"],
+        taxes_scolaires=p["taxes_scolaires"], assurances=p["assurances"], entretien=p["entretien"],
+        gestion_pct=p["gestion_pct"], autres_depenses=p["autres_depenses"], mise_de_fonds_pct=p["mise_de_fonds_pct"],
+        taux_interet=p["taux_interet"], amortissement=int(p["amortissement"]), couts_initiaux=couts_init)
+    proj = projection_10_ans(prix=p["prix"], revenus_bruts_annuels=p["revenus_bruts_annuels"],
+        depenses_exploitation_an1=depenses_exploitation, noi_an1=an1["NOI"],
+        taux_inoccupation=p["taux_inoccupation"], mise_de_fonds_pct=p["mise_de_fonds_pct"],
+        taux_interet=p["taux_interet"], amortissement=int(p["amortissement"]), croissance_loyers=p["croissance_loyers"],
+        inflation_depenses=p["inflation_depenses"], appreciation_immeuble=p["appreciation_immeuble"],
+        mise_de_fonds_totale=couts_init["Total coûts initiaux"])
+    indicateurs = calculer_indicateurs(prix=p["prix"], noi=an1["NOI"], cashflow=an1["Cashflow"],
+        mise_de_fonds_totale=couts_init["Total coûts initiaux"], service_dette=an1["Service de dette"],
+        revenus_nets=an1["Revenus nets"], taux_interet=p["taux_interet"], hypotheque=an1["Hypothèque"])
     return {
-        "Revenus bruts": round(revenus_bruts_annuels, 2), "Vacance": round(vacance, 2),
-        "Revenus nets": round(revenus_nets, 2), "Depenses exploitation": round(depenses, 2),
-        "NOI": round(noi, 2), "Service de dette": round(service_dette_annuel, 2),
-        "Cashflow": round(cashflow, 2), "Hypothèque": round(hypotheque, 2),
-        "CSD": round(csd, 3), "LTV": round(ltv * 100, 1),
-        "Rendement mise de fonds (%)": round((cashflow / mdf_totale * 100) if mdf_totale > 0 else 0, 2),
-        "Cap Rate (%)": round((noi / prix * 100) if prix > 0 else 0, 2),
-        "Cash-on-Cash (%)": round((cashflow / mdf_totale * 100) if mdf_totale > 0 else 0, 2),
-        "Mise de fonds totale": round(mdf_totale, 2),
+        "couts_init": couts_init,
+        "depenses_fixes": depenses_fixes,
+        "depenses_exploitation": depenses_exploitation,
+        "frais_initiaux": couts_init["Total coûts initiaux"] - couts_init["Mise de fonds"] - couts_init["Droits de mutation"],
+        "an1": an1,
+        "proj": proj,
+        "indicateurs": indicateurs,
     }
 
 
-def projection_10_ans(prix, revenus_bruts_annuels, depenses_exploitation_an1, noi_an1,
-    taux_inoccupation=5.0, mise_de_fonds_pct=20.0, taux_interet=5.0, amortissement=25,
-    croissance_loyers=3.0, inflation_depenses=2.0, appreciation_immeuble=3.0,
-    mise_de_fonds_totale=0.0, annees=10):
-    hypotheque = prix * (1 - mise_de_fonds_pct / 100)
-    amor = tableau_amortissement(hypotheque, taux_interet, amortissement, annees)
-    projection, cashflow_cumule = [], 0.0
-    rev_bruts, dep, val_imm = revenus_bruts_annuels, depenses_exploitation_an1, prix
-    flux = [-mise_de_fonds_totale]
-    for i in range(annees):
-        if i > 0:
-            rev_bruts *= (1 + croissance_loyers / 100)
-            dep *= (1 + inflation_depenses / 100)
-        vac = rev_bruts * (taux_inoccupation / 100)
-        rev_nets = rev_bruts - vac
-        noi = rev_nets - dep
-        sd = amor[i]["Paiement annuel"]
-        cf = noi - sd
-        cashflow_cumule += cf
-        if i > 0:
-            val_imm *= (1 + appreciation_immeuble / 100)
-        solde_hyp = amor[i]["Solde restant"]
-        equite = val_imm - solde_hyp
-        projection.append({"Année": i+1, "Revenus bruts": round(rev_bruts, 2),
-            "Revenus nets": round(rev_nets, 2), "Dépenses": round(dep, 2),
-            "NOI": round(noi, 2), "Service de dette": round(sd, 2),
-            "Cashflow": round(cf, 2), "Cashflow cumulé": round(cashflow_cumule, 2),
-            "Valeur immeuble": round(val_imm, 2), "Solde hypothèque": round(solde_hyp, 2),
-            "Équité": round(equite, 2)})
-        flux.append(cf if i < annees - 1 else cf + val_imm - solde_hyp)
-    tri, van = None, None
-    if _HAS_NPF:
-        try:
-            t = npf.irr(flux)
-            if not np.isnan(t): tri = round(t * 100, 2)
-        except Exception: pass
-        try: van = round(npf.npv(taux_interet / 100, flux), 2)
-        except Exception: pass
-    rend_cum = None
-    if mise_de_fonds_totale > 0:
-        gain = cashflow_cumule + (val_imm - prix) + (hypotheque - projection[-1]["Solde hypothèque"])
-        rend_cum = round(gain / mise_de_fonds_totale * 100, 2)
-    return {"projection": projection, "TRI (%)": tri, "VAN ($)": van,
-        "Cashflow cumulé": round(cashflow_cumule, 2), "Équité finale": round(projection[-1]["Équité"], 2),
-        "Valeur projetée": round(val_imm, 2), "Rendement cumulé (%)": rend_cum}
-
-
-def calculer_indicateurs(prix, noi, cashflow, mise_de_fonds_totale, service_dette,
-    revenus_nets, taux_interet=5.0, hypotheque=0.0):
-    cap_rate = (noi / prix * 100) if prix > 0 else 0
-    coc = (cashflow / mise_de_fonds_totale * 100) if mise_de_fonds_totale > 0 else 0
-    csd = revenus_nets / service_dette if service_dette > 0 else 0
-    ltv = (hypotheque / prix * 100) if prix > 0 else 0
-    delai = (mise_de_fonds_totale / cashflow) if cashflow > 0 else float("inf")
-    grm = prix / (noi / (1 - 0.05)) if noi > 0 else 0
-    sens = {}
-    for delta in [-1.0, -0.5, 0.5, 1.0]:
-        nt = taux_interet + delta
-        if nt > 0:
-            sens[f"{nt:.1f}%"] = round(noi - calculer_paiement_hypothecaire(hypotheque, nt) * 12, 2)
-    return {"Cap Rate (%)": round(cap_rate, 2), "Cash-on-Cash (%)": round(coc, 2),
-        "CSD": round(csd, 3), "LTV (%)": round(ltv, 1),
-        "Délai de récupération (années)": round(delai, 1) if delai != float("inf") else "∞",
-        "GRM": round(grm, 2), "Sensibilité taux d'intérêt": sens}
-
-
-# ╔═══════════════════════════════════════════════════════════════════════════╗
-# ║                    MODULE SCRAPER — EXTRACTION DONNÉES                   ║
-# ╚═══════════════════════════════════════════════════════════════════════════╝
-
-HEADERS_HTTP = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    "Accept-Language": "fr-CA,fr;q=0.9,en;q=0.8",
-}
-
-def detecter_plateforme(url):
-    d = urlparse(url).netloc.lower()
-    if "centris" in d: return "centris"
-    elif "duproprio" in d: return "duproprio"
-    elif "lespacs" in d: return "lespacs"
-    return None
-
-def _nettoyer_prix(texte):
-    if not texte: return None
-    c = re.sub(r"[^\d,.]", "", texte).replace(",", "").replace(" ", "")
-    try: return float(c)
-    except: return None
-
-def _telecharger_page(url):
-    try:
-        r = requests.get(url, headers=HEADERS_HTTP, timeout=15)
-        r.raise_for_status()
-        return BeautifulSoup(r.text, "lxml")
-    except: return None
-
-def _scraper_generique(url, plateforme):
-    res = {"plateforme": plateforme, "url": url, "prix": None, "type_immeuble": None,
-        "nb_logements": None, "adresse": None, "ville": None, "revenus_bruts": None,
-        "depenses": None, "erreur": None}
-    soup = _telecharger_page(url)
-    if soup is None:
-        res["erreur"] = f"Impossible de charger la page {plateforme}. Veuillez saisir les données manuellement."
-        return res
-    prix_el = soup.find("span", class_=re.compile(r"price|prix", re.I))
-    if prix_el: res["prix"] = _nettoyer_prix(prix_el.get_text())
-    if res["prix"] is None:
-        meta = soup.find("meta", {"property": "og:price:amount"})
-        if meta: res["prix"] = _nettoyer_prix(meta.get("content", ""))
-    adr_el = soup.find(["h1", "h2"], class_=re.compile(r"address|adresse|listing-location", re.I))
-    if adr_el: res["adresse"] = adr_el.get_text(strip=True)
-    if res["adresse"] is None:
-        meta_t = soup.find("meta", {"property": "og:title"})
-        if meta_t: res["adresse"] = meta_t.get("content", "")
-    title = soup.find("title")
-    if title:
-        for mot in ["Duplex", "Triplex", "Quadruplex", "Quintuplex", "Immeuble", "Plex"]:
-            if mot.lower() in title.get_text().lower():
-                res["type_immeuble"] = mot
-                break
-    if res["prix"] is None and res["adresse"] is None:
-        res["erreur"] = f"Le scraping de {plateforme} a partiellement échoué. Veuillez compléter manuellement."
-    return res
-
-def extraire_donnees(url):
-    p = detecter_plateforme(url)
-    if p in ("centris", "duproprio"): return _scraper_generique(url, p.capitalize())
-    if p == "lespacs":
-        return {"plateforme": "LesPACs", "url": url, "prix": None, "type_immeuble": None,
-            "nb_logements": None, "adresse": None, "ville": None, "revenus_bruts": None,
-            "depenses": None, "erreur": "LesPACs n'est plus actif pour l'immobilier résidentiel. Saisie manuelle requise."}
-    return {"plateforme": "Inconnue", "url": url, "prix": None, "type_immeuble": None,
-        "nb_logements": None, "adresse": None, "ville": None, "revenus_bruts": None,
-        "depenses": None, "erreur": "Plateforme non reconnue. Plateformes supportées : Centris, DuProprio, LesPACs."}
-
-
-# ╔═══════════════════════════════════════════════════════════════════════════╗
-# ║                    MODULE LOCALISATION — SCORE /10                       ║
-# ╚═══════════════════════════════════════════════════════════════════════════╝
-
-CRITERES = {
-    "croissance_demographique": {"label": "📈 Croissance démographique",
-        "description": "La population du secteur est-elle en croissance ?", "poids": 1.5,
-        "options": {"Forte croissance (> 3%/an)": 10, "Croissance modérée (1-3%/an)": 7, "Stable": 5, "Déclin léger": 3, "Déclin important": 1}},
-    "niveau_loyers": {"label": "💰 Niveau des loyers",
-        "description": "Les loyers sont-ils compétitifs dans le secteur ?", "poids": 1.5,
-        "options": {"Très élevés (forte demande)": 10, "Au-dessus de la moyenne": 8, "Dans la moyenne": 6, "Sous la moyenne": 3, "Très bas": 1}},
-    "taux_inoccupation": {"label": "🏚️ Taux d'inoccupation",
-        "description": "Quel est le taux d'inoccupation du secteur ?", "poids": 2.0,
-        "options": {"Très faible (< 1%)": 10, "Faible (1-3%)": 8, "Modéré (3-5%)": 6, "Élevé (5-8%)": 3, "Très élevé (> 8%)": 1}},
-    "transport": {"label": "🚌 Transport en commun",
-        "description": "Accessibilité au transport en commun ?", "poids": 1.0,
-        "options": {"Excellent (métro/train à pied)": 10, "Bon (bus fréquent)": 7, "Moyen": 5, "Limité": 3, "Inexistant": 1}},
-    "ecoles": {"label": "🏫 Écoles et services",
-        "description": "Proximité des écoles, garderies et services ?", "poids": 1.0,
-        "options": {"Excellent (tout à pied)": 10, "Bon": 7, "Moyen": 5, "Limité": 3, "Très limité": 1}},
-    "commerces": {"label": "🛒 Commerces et commodités",
-        "description": "Accès aux commerces, épiceries, restaurants ?", "poids": 1.0,
-        "options": {"Excellent (quartier commercial)": 10, "Bon": 7, "Moyen": 5, "Limité": 3, "Très limité": 1}},
-    "securite": {"label": "🔒 Sécurité du quartier",
-        "description": "Le quartier est-il considéré sécuritaire ?", "poids": 1.5,
-        "options": {"Très sécuritaire": 10, "Sécuritaire": 8, "Moyen": 5, "Problématique": 3, "Dangereux": 1}},
-    "risque_locatif": {"label": "⚠️ Risque locatif",
-        "description": "Risque de mauvais payeurs ou de litiges ?", "poids": 1.5,
-        "options": {"Très faible": 10, "Faible": 8, "Modéré": 5, "Élevé": 3, "Très élevé": 1}},
-}
-
-def calculer_score_localisation(reponses):
-    details, total_p, total_w = [], 0.0, 0.0
-    for cid, info in CRITERES.items():
-        opt = reponses.get(cid)
-        if opt is None: continue
-        s = info["options"].get(opt, 5)
-        w = info["poids"]
-        total_p += s * w
-        total_w += w
-        details.append({"Critère": info["label"], "Réponse": opt, "Score": s, "Poids": w, "Score pondéré": round(s * w, 1)})
-    score = round(total_p / total_w, 1) if total_w > 0 else 0
-    if score >= 8.5: appr, coul = "🟢 Excellent emplacement", "#00c853"
-    elif score >= 7.0: appr, coul = "🟢 Bon emplacement", "#64dd17"
-    elif score >= 5.5: appr, coul = "🟡 Emplacement correct", "#ffd600"
-    elif score >= 4.0: appr, coul = "🟠 Emplacement à risque modéré", "#ff9100"
-    else: appr, coul = "🔴 Emplacement à risque élevé", "#ff1744"
-    vals = {info["label"]: info["options"].get(reponses.get(cid, ""), 0) for cid, info in CRITERES.items()}
-    return {"score_global": score, "appreciation": appr, "couleur": coul, "details": details, "valeurs_radar": vals}
+def _hypotheses_batch(cle):
+    """Paramètres communs aux moteurs vectorisés (objectifs, grille de sensibilité)."""
+    p, analyse = dict(cle), _analyse_complete(cle)
+    return dict(depenses_fixes=analyse["depenses_fixes"], gestion_pct=p["gestion_pct"],
+        taux_inoccupation=p["taux_inoccupation"], taux_interet=p["taux_interet"], amortissement=p["amortissement"],
+        frais_initiaux=analyse["frais_initiaux"], bareme_mutation=p["bareme_mutation"])
+
+
+@st.cache_data(max_entries=TAILLE_CACHE, show_spinner=False)
+def _figures_annee_1(cle):
+    analyse = _analyse_complete(cle)
+    couts_init, an1 = analyse["couts_init"], analyse["an1"]
+    fig_c = None
+    couts_df = pd.DataFrame([{"Poste": k, "Montant": v} for k, v in couts_init.items() if k != "Total coûts initiaux" and v > 0])
+    if not couts_df.empty:
+        fig_c = px.pie(couts_df, values="Montant", names="Poste", hole=0.45, color_discrete_sequence=px.colors.sequential.Tealgrn)
+        fig_c.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font=dict(color="white"), showlegend=True, margin=dict(t=20, b=20))
+    rev_dep = pd.DataFrame({"Catégorie": ["Revenus bruts", "Vacance", "Dépenses exploitation", "Service de dette", "Cashflow"],
+        "Montant": [an1["Revenus bruts"], -an1["Vacance"], -an1["Dépenses d'exploitation"], -an1["Service de dette"], an1["Cashflow"]]})
+    colors = ["#64ffda", "#ff6b6b", "#ff9100", "#ffd93d", "#00c853" if an1["Cashflow"] >= 0 else "#ff1744"]
+    fig_r = go.Figure(go.Bar(x=rev_dep["Catégorie"], y=rev_dep["Montant"], marker_color=colors,
+        text=[f"{v:,.0f} $" for v in rev_dep["Montant"]], textposition="outside"))
+    fig_r.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font=dict(color="white"),
+        yaxis=dict(gridcolor="rgba(255,255,255,0.05)"), margin=dict(t=20, b=20), height=400)
+    return fig_c, fig_r
+
+
+@st.cache_data(max_entries=TAILLE_CACHE, show_spinner=False)
+def _figures_projection(cle):
+    df_proj = pd.DataFrame(_analyse_complete(cle)["proj"]["projection"])
+    fig_cf = go.Figure()
+    fig_cf.add_trace(go.Bar(x=df_proj["Année"], y=df_proj["Cashflow"], name="Cashflow annuel", marker_color="#64ffda"))
+    fig_cf.add_trace(go.Scatter(x=df_proj["Année"], y=df_proj["Cashflow cumulé"], name="Cashflow cumulé", line=dict(color="#ffd93d", width=3), mode="lines+markers"))
+    fig_cf.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font=dict(color="white"),
+        yaxis=dict(gridcolor="rgba(255,255,255,0.05)"), legend=dict(orientation="h", y=-0.15), margin=dict(t=20, b=40), height=400)
+    fig_eq = go.Figure()
+    fig_eq.add_trace(go.Scatter(x=df_proj["Année"], y=df_proj["Valeur immeuble"], name="Valeur immeuble", fill="tozeroy", line=dict(color="#64ffda", width=2)))
+    fig_eq.add_trace(go.Scatter(x=df_proj["Année"], y=df_proj["Solde hypothèque"], name="Solde hypothèque", fill="tozeroy", line=dict(color="#ff6b6b", width=2)))
+    fig_eq.add_trace(go.Scatter(x=df_proj["Année"], y=df_proj["Équité"], name="Équité", line=dict(color="#ffd93d", width=3, dash="dash"), mode="lines+markers"))
+    fig_eq.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font=dict(color="white"),
+        yaxis=dict(gridcolor="rgba(255,255,255,0.05)"), legend=dict(orientation="h", y=-0.15), margin=dict(t=20, b=40), height=400)
+    fig_ev = go.Figure()
+    fig_ev.add_trace(go.Scatter(x=df_proj["Année"], y=df_proj["Revenus nets"], name="Revenus nets", line=dict(color="#64ffda", width=2), mode="lines+markers"))
+    fig_ev.add_trace(go.Scatter(x=df_proj["Année"], y=df_proj["Dépenses"], name="Dépenses", line=dict(color="#ff6b6b", width=2), mode="lines+markers"))
+    fig_ev.add_trace(go.Scatter(x=df_proj["Année"], y=df_proj["NOI"], name="NOI", line=dict(color="#ffd93d", width=3), mode="lines+markers"))
+    fig_ev.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font=dict(color="white"),
+        yaxis=dict(gridcolor="rgba(255,255,255,0.05)"), legend=dict(orientation="h", y=-0.15), margin=dict(t=20, b=40), height=400)
+    return fig_cf, fig_eq, fig_ev
+
+
+@st.cache_data(max_entries=TAILLE_CACHE, show_spinner=False)
+def _objectifs(cle, nb_logements, cible_csd, cible_coc, cible_cf):
+    p, hyp = dict(cle), _hypotheses_batch(cle)
+    lignes = []
+    for indicateur, cible, libelle in [("CSD", cible_csd, f"CSD ≥ {cible_csd:.2f}"),
+            ("Cash-on-Cash (%)", cible_coc, f"Cash-on-Cash ≥ {cible_coc:.1f} %"), ("Cashflow", cible_cf, f"Cashflow ≥ {cible_cf:,.0f} $")]:
+        p_max = prix_maximal(indicateur, cible, revenus_bruts_annuels=p["revenus_bruts_annuels"],
+            mise_de_fonds_pct=p["mise_de_fonds_pct"], **hyp)
+        r_min = revenus_minimaux(indicateur, cible, prix=p["prix"], mise_de_fonds_pct=p["mise_de_fonds_pct"], **hyp)
+        m_min = mise_de_fonds_minimale(indicateur, cible, prix=p["prix"], revenus_bruts_annuels=p["revenus_bruts_annuels"], **hyp)
+        lignes.append({"Objectif": libelle,
+            "Prix maximal": f"{p_max:,.0f} $" if not np.isnan(p_max) else "Inatteignable",
+            "Loyer moyen minimal": f"{r_min / (nb_logements * 12):,.0f} $/mois" if not np.isnan(r_min) else "Inatteignable",
+            "Mise de fonds minimale": f"{m_min:.2f} %" if not np.isnan(m_min) else "Inatteignable"})
+    return pd.DataFrame(lignes)
+
+
+@st.cache_data(max_entries=TAILLE_CACHE, show_spinner=False)
+def _simulation_mc(cle, nb_trajectoires, graine):
+    p, analyse = dict(cle), _analyse_complete(cle)
+    return simulation_monte_carlo(prix=p["prix"], revenus_bruts_annuels=p["revenus_bruts_annuels"],
+        depenses_exploitation_an1=analyse["depenses_exploitation"], taux_inoccupation=p["taux_inoccupation"],
+        mise_de_fonds_pct=p["mise_de_fonds_pct"], taux_interet=p["taux_interet"], amortissement=int(p["amortissement"]),
+        croissance_loyers=p["croissance_loyers"], inflation_depenses=p["inflation_depenses"],
+        appreciation_immeuble=p["appreciation_immeuble"], mise_de_fonds_totale=analyse["couts_init"]["Total coûts initiaux"],
+        nb_trajectoires=nb_trajectoires, seed=graine)
+
+
+@st.cache_data(max_entries=TAILLE_CACHE, show_spinner=False)
+def _figure_sensibilite(cle, axe_x, axe_y, mesure):
+    p = dict(cle)
+    plages = {
+        "taux_interet": np.linspace(max(0.25, p["taux_interet"] - 3), p["taux_interet"] + 3, 50),
+        "prix": np.linspace(p["prix"] * 0.75, p["prix"] * 1.25, 50),
+        "taux_inoccupation": np.linspace(0.0, 15.0, 50),
+        "revenus_bruts_annuels": np.linspace(p["revenus_bruts_annuels"] * 0.75, p["revenus_bruts_annuels"] * 1.25, 50),
+        "mise_de_fonds_pct": np.linspace(5.0, 50.0, 50),
+    }
+    hyp = {**_hypotheses_batch(cle), "prix": p["prix"], "revenus_bruts_annuels": p["revenus_bruts_annuels"],
+        "mise_de_fonds_pct": p["mise_de_fonds_pct"], "croissance_loyers": p["croissance_loyers"],
+        "inflation_depenses": p["inflation_depenses"], "appreciation_immeuble": p["appreciation_immeuble"]}
+    grille = grille_sensibilite(axe_x, plages[axe_x], axe_y, plages[axe_y], **hyp)
+    seuil = {"Cashflow": 0.0, "CSD": 1.2, "TRI (%)": 0.0}[mesure]
+    fig_s = go.Figure(go.Heatmap(x=grille["x"], y=grille["y"], z=grille[mesure], zmid=seuil,
+        colorscale=[[0, "#ff1744"], [0.5, "#ffd93d"], [1, "#00c853"]], colorbar=dict(title=mesure),
+        hovertemplate=f"{AXES_SENSIBILITE[axe_x]} : %{{x:,.2f}}<br>{AXES_SENSIBILITE[axe_y]} : %{{y:,.2f}}<br>{mesure} : %{{z:,.2f}}<extra></extra>"))
+    fig_s.add_trace(go.Scatter(x=[p[axe_x]], y=[p[axe_y]], mode="markers",
+        marker=dict(symbol="x", size=14, color="white"), name="Hypothèses actuelles", hoverinfo="skip"))
+    fig_s.update_layout(xaxis_title=AXES_SENSIBILITE[axe_x], yaxis_title=AXES_SENSIBILITE[axe_y],
+        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font=dict(color="white"),
+        margin=dict(t=20, b=40), height=500, showlegend=False)
+    return fig_s
 
 
 # ╔═══════════════════════════════════════════════════════════════════════════╗
@@ -357,8 +227,18 @@ with st.sidebar:
     appreciation_immeuble = st.slider("Appréciation annuelle de l'immeuble (%)", 0.0, 10.0, 3.0, 0.5)
     taux_inoccupation = st.slider("Taux d'inoccupation (%)", 0.0, 15.0, 5.0, 0.5)
     st.markdown("---")
+    st.markdown("### 🎲 Simulation")
+    mode_monte_carlo = st.checkbox("Mode Monte Carlo", value=False,
+        help="Tire des milliers de scénarios corrélés autour des hypothèses ci-dessus (loyers, dépenses, appréciation, inoccupation, taux).")
+    if mode_monte_carlo:
+        nb_trajectoires = st.select_slider("Nombre de trajectoires", options=[5_000, 10_000, 20_000, 50_000], value=20_000)
+        graine_mc = st.number_input("Graine aléatoire", min_value=0, value=42, step=1)
+    st.markdown("---")
     st.markdown("### 🏛️ Municipalité")
-    bareme_mutation = st.selectbox("Barème droits de mutation", list(BAREMES.keys()))
+    # Barème déduit du géocodage de l'annonce : appliqué avant la création du widget
+    if "bareme_suggere" in st.session_state:
+        st.session_state["bareme_mutation"] = st.session_state.pop("bareme_suggere")
+    bareme_mutation = st.selectbox("Barème droits de mutation", list(BAREMES.keys()), key="bareme_mutation")
     st.markdown("---")
     st.markdown("### ℹ️ À propos")
     st.caption("Application développée pour analyser la rentabilité d'immeubles résidentiels au Québec. Barèmes 2026.")
@@ -372,33 +252,98 @@ with col_url:
 with col_btn:
     btn_scrape = st.button("🔍 Analyser l'URL", use_container_width=True)
 
-donnees_scrapees = None
 if btn_scrape and url_input:
     with st.spinner("Extraction des données en cours..."):
-        donnees_scrapees = extraire_donnees(url_input)
+        from scraper import extraire_donnees  # requests/lxml : chargés seulement à la première extraction
+        donnees = extraire_donnees(url_input)
+        localisation = None
+        if donnees.get("adresse") or donnees.get("ville"):
+            from geocodage import obtenir_geocodeur
+            geocodeur = obtenir_geocodeur()
+            localisation = geocodeur.geocoder(donnees.get("adresse"), donnees.get("ville")) if geocodeur else None
+    if localisation is not None:
+        donnees["ville"] = donnees.get("ville") or localisation.municipalite
+        st.session_state["bareme_suggere"] = localisation.bareme
+    # Conservées entre les réexécutions : les valeurs par défaut des champs restent stables
+    st.session_state["donnees_scrapees"] = donnees
+    st.session_state["localisation"] = localisation
+    st.rerun()
+
+donnees_scrapees = st.session_state.get("donnees_scrapees")
+localisation = st.session_state.get("localisation")
+if donnees_scrapees:
     if donnees_scrapees.get("erreur"):
         st.warning(f"⚠️ {donnees_scrapees['erreur']}")
     else:
         st.success(f"✅ Données extraites de {donnees_scrapees.get('plateforme', 'la plateforme')}")
+    if localisation is not None:
+        st.caption(f"📍 Localisée : {localisation.municipalite}"
+                   f"{f' ({localisation.rta})' if localisation.rta else ''} — barème « {localisation.bareme} » appliqué.")
 
 prix_defaut = int(donnees_scrapees["prix"]) if donnees_scrapees and donnees_scrapees.get("prix") else 0
+logements_defaut = int(donnees_scrapees["nb_logements"]) if donnees_scrapees and donnees_scrapees.get("nb_logements") else 4
+loyer_defaut = 800
+if donnees_scrapees and donnees_scrapees.get("revenus_bruts"):
+    # Revenus bruts annoncés ramenés à un loyer mensuel moyen par logement
+    loyer_defaut = int(round(donnees_scrapees["revenus_bruts"] / logements_defaut / 12 / 5) * 5)
 
 st.markdown("### 📝 Données de l'immeuble")
 st.caption("Remplissez ou complétez les informations ci-dessous.")
 col1, col2, col3 = st.columns(3)
 with col1:
     prix_achat = st.number_input("💲 Prix d'achat ($)", min_value=0, value=prix_defaut, step=5000)
-    nb_logements = st.number_input("🏘️ Nombre de logements", min_value=1, value=4, step=1)
+    nb_logements = st.number_input("🏘️ Nombre de logements", min_value=1, value=logements_defaut, step=1)
 with col2:
-    loyer_moyen = st.number_input("💰 Loyer moyen par logement ($/mois)", min_value=0, value=800, step=50)
-    type_immeuble = st.selectbox("🏠 Type d'immeuble", ["Duplex", "Triplex", "Quadruplex", "Quintuplex", "6-plex", "Immeuble (7+ logements)", "Autre"])
+    loyer_moyen = st.number_input("💰 Loyer moyen par logement ($/mois)", min_value=0, value=loyer_defaut, step=50)
+    types_immeuble = ["Duplex", "Triplex", "Quadruplex", "Quintuplex", "6-plex", "Immeuble (7+ logements)", "Autre"]
+    type_scrape = donnees_scrapees.get("type_immeuble") if donnees_scrapees else None
+    type_immeuble = st.selectbox("🏠 Type d'immeuble", types_immeuble,
+        index=types_immeuble.index(type_scrape) if type_scrape in types_immeuble else 0)
 with col3:
     ville = st.text_input("📍 Ville / Quartier", value=donnees_scrapees.get("ville", "") if donnees_scrapees else "")
     adresse = st.text_input("🏡 Adresse", value=donnees_scrapees.get("adresse", "") if donnees_scrapees else "")
 
 revenus_bruts_annuels = loyer_moyen * nb_logements * 12
 
+# Comparables du marché : annonces voisines de la base locale (alimentée par crawler.py)
+# La position de l'annonce ne vaut que tant que l'adresse et la ville extraites ne sont pas modifiées
+extraites = (donnees_scrapees.get("adresse") or "", donnees_scrapees.get("ville") or "") if donnees_scrapees else None
+position = localisation if (adresse or "", ville or "") == extraites else None
+if position is None and (adresse or ville):
+    from geocodage import obtenir_geocodeur
+    geocodeur = obtenir_geocodeur()
+    position = geocodeur.geocoder(adresse, ville) if geocodeur else None
+if position is not None:
+    from comparables import obtenir_index_comparables
+    index_comparables = obtenir_index_comparables()
+    if index_comparables is not None:
+        marche = index_comparables.comparables(
+            position.latitude, position.longitude, None if type_immeuble == "Autre" else type_immeuble,
+            nb_logements, exclure=donnees_scrapees.get("url") if donnees_scrapees else None)
+        if marche.annonces:
+            resume = []
+            if marche.prix_par_porte:
+                ppp = marche.prix_par_porte
+                resume.append(f"prix par porte médian {ppp['p50']:,.0f} $ (P25–P75 : {ppp['p25']:,.0f} – {ppp['p75']:,.0f} $ ; "
+                              f"ici {prix_achat / nb_logements:,.0f} $)")
+            if marche.loyer_par_logement:
+                lpl = marche.loyer_par_logement
+                resume.append(f"loyer médian {lpl['p50']:,.0f} $/mois (P25–P75 : {lpl['p25']:,.0f} – {lpl['p75']:,.0f} $ ; "
+                              f"ici {loyer_moyen:,.0f} $)")
+            with st.expander(f"📊 Comparables du marché : {len(marche.annonces)} annonces à moins de "
+                             f"{marche.annonces[-1].distance_km:.1f} km"):
+                resume = " · ".join(resume)
+                st.caption(resume[:1].upper() + resume[1:] if resume else "Aucun prix ni loyer connu pour ces annonces.")
+                st.dataframe([
+                    {"Distance (km)": round(c.distance_km, 2), "Type": c.type_immeuble, "Logements": c.nb_logements,
+                     "Prix ($)": c.prix, "Prix par porte ($)": c.prix_par_porte,
+                     "Loyer par logement ($/mois)": c.loyer_par_logement, "Annonce": c.url}
+                    for c in marche.annonces
+                ], use_container_width=True, hide_index=True)
+
 st.markdown("### 💸 Dépenses d'exploitation annuelles")
+if donnees_scrapees and donnees_scrapees.get("depenses"):
+    st.caption(f"Dépenses totales indiquées dans l'annonce : {donnees_scrapees['depenses']:,.0f} $/an")
 col_d1, col_d2, col_d3 = st.columns(3)
 with col_d1:
     taxes_municipales = st.number_input("🏛️ Taxes municipales ($/an)", min_value=0, value=5000, step=100)
@@ -424,26 +369,21 @@ with col_c3:
 
 # --- CALCULS ET AFFICHAGE ---
 if prix_achat > 0 and revenus_bruts_annuels > 0:
-    couts_init = calculer_couts_initiaux(prix=prix_achat, mise_de_fonds_pct=mise_de_fonds_pct,
-        frais_notaire=frais_notaire, frais_inspection=frais_inspection, frais_evaluation=frais_evaluation,
-        frais_comptable=frais_comptable, travaux_initiaux=travaux_initiaux, frais_financement=frais_financement,
-        bareme_mutation=bareme_mutation)
-    depenses_exploitation = (taxes_municipales + taxes_scolaires + assurances + entretien
-        + (revenus_bruts_annuels * (1 - taux_inoccupation/100) * gestion_pct / 100) + autres_depenses)
-    an1 = analyse_annee_1(prix=prix_achat, revenus_bruts_annuels=revenus_bruts_annuels,
-        taux_inoccupation=taux_inoccupation, taxes_municipales=taxes_municipales,
-        taxes_scolaires=taxes_scolaires, assurances=assurances, entretien=entretien,
-        gestion_pct=gestion_pct, autres_depenses=autres_depenses, mise_de_fonds_pct=mise_de_fonds_pct,
-        taux_interet=taux_interet, amortissement=amortissement, couts_initiaux=couts_init)
-    proj = projection_10_ans(prix=prix_achat, revenus_bruts_annuels=revenus_bruts_annuels,
-        depenses_exploitation_an1=depenses_exploitation, noi_an1=an1["NOI"],
-        taux_inoccupation=taux_inoccupation, mise_de_fonds_pct=mise_de_fonds_pct,
-        taux_interet=taux_interet, amortissement=amortissement, croissance_loyers=croissance_loyers,
-        inflation_depenses=inflation_depenses, appreciation_immeuble=appreciation_immeuble,
-        mise_de_fonds_totale=couts_init["Total coûts initiaux"])
-    indicateurs = calculer_indicateurs(prix=prix_achat, noi=an1["NOI"], cashflow=an1["Cashflow"],
-        mise_de_fonds_totale=couts_init["Total coûts initiaux"], service_dette=an1["Service de dette"],
-        revenus_nets=an1["Revenus nets"], taux_interet=taux_interet, hypotheque=an1["Hypothèque"])
+    # Imports différés : pandas et plotly ne servent qu'à l'affichage des résultats
+    import pandas as pd
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    cle_analyse = _cle_calcul(prix=prix_achat, revenus_bruts_annuels=revenus_bruts_annuels,
+        taux_inoccupation=taux_inoccupation, taxes_municipales=taxes_municipales, taxes_scolaires=taxes_scolaires,
+        assurances=assurances, entretien=entretien, gestion_pct=gestion_pct, autres_depenses=autres_depenses,
+        mise_de_fonds_pct=mise_de_fonds_pct, taux_interet=taux_interet, amortissement=amortissement,
+        croissance_loyers=croissance_loyers, inflation_depenses=inflation_depenses,
+        appreciation_immeuble=appreciation_immeuble, frais_notaire=frais_notaire, frais_inspection=frais_inspection,
+        frais_evaluation=frais_evaluation, frais_comptable=frais_comptable, travaux_initiaux=travaux_initiaux,
+        frais_financement=frais_financement, bareme_mutation=bareme_mutation)
+    analyse = _analyse_complete(cle_analyse)
+    couts_init, an1, proj, indicateurs = analyse["couts_init"], analyse["an1"], analyse["proj"], analyse["indicateurs"]
 
     st.markdown('<hr class="section-divider">', unsafe_allow_html=True)
 
@@ -475,22 +415,21 @@ if prix_achat > 0 and revenus_bruts_annuels > 0:
         col_g1, col_g2 = st.columns(2)
         with col_g1:
             st.markdown("#### 💸 Répartition des coûts initiaux")
-            couts_df = pd.DataFrame([{"Poste": k, "Montant": v} for k, v in couts_init.items() if k != "Total coûts initiaux" and v > 0])
-            if not couts_df.empty:
-                fig_c = px.pie(couts_df, values="Montant", names="Poste", hole=0.45, color_discrete_sequence=px.colors.sequential.Tealgrn)
-                fig_c.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font=dict(color="white"), showlegend=True, margin=dict(t=20, b=20))
+            fig_c, fig_r = _figures_annee_1(cle_analyse)
+            if fig_c is not None:
                 st.plotly_chart(fig_c, use_container_width=True)
             st.markdown(f"**Total coûts initiaux : {couts_init['Total coûts initiaux']:,.2f} $**")
         with col_g2:
             st.markdown("#### 📊 Revenus vs Dépenses (Année 1)")
-            rev_dep = pd.DataFrame({"Catégorie": ["Revenus bruts", "Vacance", "Dépenses exploitation", "Service de dette", "Cashflow"],
-                "Montant": [an1["Revenus bruts"], -an1["Vacance"], -an1["Depenses exploitation"], -an1["Service de dette"], an1["Cashflow"]]})
-            colors = ["#64ffda", "#ff6b6b", "#ff9100", "#ffd93d", "#00c853" if an1["Cashflow"] >= 0 else "#ff1744"]
-            fig_r = go.Figure(go.Bar(x=rev_dep["Catégorie"], y=rev_dep["Montant"], marker_color=colors,
-                text=[f"{v:,.0f} $" for v in rev_dep["Montant"]], textposition="outside"))
-            fig_r.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font=dict(color="white"),
-                yaxis=dict(gridcolor="rgba(255,255,255,0.05)"), margin=dict(t=20, b=20), height=400)
             st.plotly_chart(fig_r, use_container_width=True)
+        st.markdown("---")
+        st.markdown("#### 🎯 Objectifs de négociation")
+        st.caption("Prix maximal, loyer minimal et mise de fonds minimale pour atteindre chaque cible à l'année 1")
+        co1, co2, co3 = st.columns(3)
+        with co1: cible_csd = st.number_input("CSD visé", min_value=0.5, value=1.20, step=0.05, format="%.2f")
+        with co2: cible_coc = st.number_input("Cash-on-Cash visé (%)", value=5.0, step=0.5)
+        with co3: cible_cf = st.number_input("Cashflow visé ($/an)", value=0, step=1000)
+        st.dataframe(_objectifs(cle_analyse, nb_logements, cible_csd, cible_coc, cible_cf), use_container_width=True, hide_index=True)
 
     # --- ONGLET 2: PROJECTION 10 ANS ---
     with tab2:
@@ -511,32 +450,41 @@ if prix_achat > 0 and revenus_bruts_annuels > 0:
             "Valeur immeuble": "{:,.0f} $", "Solde hypothèque": "{:,.0f} $", "Équité": "{:,.0f} $"}),
             use_container_width=True, hide_index=True)
         st.markdown("---")
+        fig_cf, fig_eq, fig_ev = _figures_projection(cle_analyse)
         col_p1, col_p2 = st.columns(2)
         with col_p1:
             st.markdown("#### 💵 Cashflow annuel et cumulé")
-            fig_cf = go.Figure()
-            fig_cf.add_trace(go.Bar(x=df_proj["Année"], y=df_proj["Cashflow"], name="Cashflow annuel", marker_color="#64ffda"))
-            fig_cf.add_trace(go.Scatter(x=df_proj["Année"], y=df_proj["Cashflow cumulé"], name="Cashflow cumulé", line=dict(color="#ffd93d", width=3), mode="lines+markers"))
-            fig_cf.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font=dict(color="white"),
-                yaxis=dict(gridcolor="rgba(255,255,255,0.05)"), legend=dict(orientation="h", y=-0.15), margin=dict(t=20, b=40), height=400)
             st.plotly_chart(fig_cf, use_container_width=True)
         with col_p2:
             st.markdown("#### 🏠 Valeur immeuble vs Hypothèque")
-            fig_eq = go.Figure()
-            fig_eq.add_trace(go.Scatter(x=df_proj["Année"], y=df_proj["Valeur immeuble"], name="Valeur immeuble", fill="tozeroy", line=dict(color="#64ffda", width=2)))
-            fig_eq.add_trace(go.Scatter(x=df_proj["Année"], y=df_proj["Solde hypothèque"], name="Solde hypothèque", fill="tozeroy", line=dict(color="#ff6b6b", width=2)))
-            fig_eq.add_trace(go.Scatter(x=df_proj["Année"], y=df_proj["Équité"], name="Équité", line=dict(color="#ffd93d", width=3, dash="dash"), mode="lines+markers"))
-            fig_eq.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font=dict(color="white"),
-                yaxis=dict(gridcolor="rgba(255,255,255,0.05)"), legend=dict(orientation="h", y=-0.15), margin=dict(t=20, b=40), height=400)
             st.plotly_chart(fig_eq, use_container_width=True)
         st.markdown("#### 📊 Évolution revenus nets vs dépenses")
-        fig_ev = go.Figure()
-        fig_ev.add_trace(go.Scatter(x=df_proj["Année"], y=df_proj["Revenus nets"], name="Revenus nets", line=dict(color="#64ffda", width=2), mode="lines+markers"))
-        fig_ev.add_trace(go.Scatter(x=df_proj["Année"], y=df_proj["Dépenses"], name="Dépenses", line=dict(color="#ff6b6b", width=2), mode="lines+markers"))
-        fig_ev.add_trace(go.Scatter(x=df_proj["Année"], y=df_proj["NOI"], name="NOI", line=dict(color="#ffd93d", width=3), mode="lines+markers"))
-        fig_ev.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font=dict(color="white"),
-            yaxis=dict(gridcolor="rgba(255,255,255,0.05)"), legend=dict(orientation="h", y=-0.15), margin=dict(t=20, b=40), height=400)
         st.plotly_chart(fig_ev, use_container_width=True)
+        if mode_monte_carlo:
+            st.markdown("---")
+            st.markdown("#### 🎲 Simulation Monte Carlo")
+            mc = _simulation_mc(cle_analyse, nb_trajectoires, int(graine_mc))
+            st.caption(f"{mc['Trajectoires']:,} trajectoires — percentiles P5 / P50 / P95")
+            mc1, mc2, mc3, mc4 = st.columns(4)
+            tri_mc = mc["TRI (%)"]
+            with mc1: st.metric("📈 TRI médian", f"{tri_mc['P50']:.2f} %" if tri_mc["P50"] is not None else "N/A",
+                delta=f"{tri_mc['P5']:.1f} % à {tri_mc['P95']:.1f} %" if tri_mc["P5"] is not None else None, delta_color="off")
+            with mc2: st.metric("💰 VAN médiane", f"{mc['VAN ($)']['P50']:,.0f} $",
+                delta=f"P(VAN < 0) = {mc['Probabilité VAN négative (%)']:.1f} %", delta_color="off")
+            with mc3: st.metric("🏠 Équité finale médiane", f"{mc['Équité finale']['P50']:,.0f} $",
+                delta=f"P5 : {mc['Équité finale']['P5']:,.0f} $", delta_color="off")
+            with mc4: st.metric("⚠️ Prob. cashflow négatif", f"{mc['Probabilité cashflow négatif (%)']:.1f} %",
+                help="Probabilité qu'au moins une année affiche un cashflow négatif")
+            col_mc1, col_mc2 = st.columns(2)
+            with col_mc1:
+                fig_mc = px.histogram(x=mc["distributions"]["TRI (%)"], nbins=60, color_discrete_sequence=["#64ffda"])
+                fig_mc.update_layout(xaxis_title="TRI (%)", yaxis_title="Trajectoires", paper_bgcolor="rgba(0,0,0,0)",
+                    plot_bgcolor="rgba(0,0,0,0)", font=dict(color="white"), yaxis=dict(gridcolor="rgba(255,255,255,0.05)"),
+                    margin=dict(t=20, b=40), height=350, showlegend=False)
+                st.plotly_chart(fig_mc, use_container_width=True)
+            with col_mc2:
+                df_mc = pd.DataFrame({k: mc[k] for k in ["TRI (%)", "VAN ($)", "Équité finale"]})
+                st.dataframe(df_mc.style.format("{:,.2f}", na_rep="N/A"), use_container_width=True)
 
     # --- ONGLET 3: LOCALISATION ---
     with tab3:
@@ -544,17 +492,48 @@ if prix_achat > 0 and revenus_bruts_annuels > 0:
         if ville:
             st.markdown(f"**Emplacement analysé :** {adresse}, {ville}" if adresse else f"**Secteur :** {ville}")
         st.markdown("Évaluez chaque critère pour obtenir un score de localisation global.")
+        code_postal_defaut = extraire_code_postal(adresse) or (localisation.rta if localisation and localisation.rta else "")
+        code_postal = st.text_input("📮 Code postal du secteur", value=code_postal_defaut,
+            placeholder="H2J 2L1",
+            help="Pré-remplit les critères à partir des données de secteur locales (donnees/secteurs.csv).")
+        secteurs = obtenir_secteurs()
+        secteur = secteurs.par_code_postal(code_postal) if secteurs and code_postal else None
+        if secteur is None and secteurs and localisation is not None and code_postal == code_postal_defaut:
+            # Secteur le plus proche de l'adresse géocodée
+            secteur = secteurs.plus_proche(localisation.latitude, localisation.longitude)
+        if secteur is not None:
+            # Pré-remplissage une seule fois par secteur : les choix manuels restent ensuite
+            if st.session_state.get("loc_secteur") != secteur.rta:
+                st.session_state["loc_secteur"] = secteur.rta
+                for cid, option in secteur.reponses.items():
+                    st.session_state[f"loc_{cid}"] = option
+            st.caption(f"Critères pré-remplis d'après le secteur {secteur.rta} — {secteur.municipalite}. Ajustez-les au besoin.")
+        elif code_postal:
+            st.caption("Aucune donnée locale pour ce code postal : évaluez les critères manuellement.")
         st.markdown("")
         reponses = {}
         critere_ids = list(CRITERES.keys())
         col_loc1, col_loc2 = st.columns(2)
         for i, cid in enumerate(critere_ids):
             info = CRITERES[cid]
+            options = list(info["options"].keys())
+            st.session_state.setdefault(f"loc_{cid}", options[2])
             col = col_loc1 if i % 2 == 0 else col_loc2
             with col:
-                reponses[cid] = st.selectbox(info["label"], options=list(info["options"].keys()), index=2, help=info["description"], key=f"loc_{cid}")
+                reponses[cid] = st.selectbox(info["label"], options=options, help=info["description"], key=f"loc_{cid}")
         st.markdown("---")
-        resultat_loc = calculer_score_localisation(reponses)
+        # Profils de poids calibrés sur données historiques (voir calibration.py)
+        profils = sorted(DOSSIER_PROFILS.glob("*.json"), reverse=True) if DOSSIER_PROFILS.is_dir() else []
+        poids_loc = None
+        if profils:
+            profil = st.selectbox("⚖️ Pondération des critères", [None, *profils],
+                format_func=lambda chemin: "Poids par défaut" if chemin is None else chemin.stem)
+            if profil is not None:
+                try:
+                    poids_loc = charger_profil(profil)
+                except (OSError, ValueError) as erreur:
+                    st.warning(f"⚠️ Profil illisible ({erreur}) : poids par défaut utilisés.")
+        resultat_loc = calculer_score_localisation(reponses, poids_loc)
         col_score, col_radar = st.columns([1, 2])
         with col_score:
             score = resultat_loc["score_global"]
@@ -590,7 +569,7 @@ if prix_achat > 0 and revenus_bruts_annuels > 0:
         with i6: st.metric("📐 GRM", f"{indicateurs['GRM']:.2f}")
         st.markdown("---")
         st.markdown("#### 📋 Récapitulatif complet")
-        dep_expl_val = an1["Depenses exploitation"]
+        dep_expl_val = an1["Dépenses d'exploitation"]
         recap_data = {"Indicateur": ["Prix d'achat", "Mise de fonds totale (avec frais)", "Hypothèque",
             "Paiement hypothécaire mensuel", "Revenus bruts annuels", "Revenus nets (après vacance)",
             "Dépenses d'exploitation", "NOI (revenu net d'exploitation)", "Service de dette annuel",
@@ -604,22 +583,15 @@ if prix_achat > 0 and revenus_bruts_annuels > 0:
                 f"{an1['Cashflow']/12:,.2f} $"]}
         st.dataframe(pd.DataFrame(recap_data), use_container_width=True, hide_index=True)
         st.markdown("---")
-        st.markdown("#### 🎛️ Sensibilité aux taux d'intérêt")
-        st.caption("Impact d'une variation du taux d'intérêt sur le cashflow annuel")
-        sensibilite = indicateurs["Sensibilité taux d'intérêt"]
-        if sensibilite:
-            taux_labels = list(sensibilite.keys())
-            cashflows_sens = list(sensibilite.values())
-            fig_s = go.Figure(go.Bar(x=taux_labels, y=cashflows_sens,
-                marker_color=["#64ffda" if cf >= 0 else "#ff6b6b" for cf in cashflows_sens],
-                text=[f"{cf:,.0f} $" for cf in cashflows_sens], textposition="outside"))
-            fig_s.update_layout(xaxis_title="Taux d'intérêt", yaxis_title="Cashflow annuel ($)",
-                paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", font=dict(color="white"),
-                yaxis=dict(gridcolor="rgba(255,255,255,0.05)"), margin=dict(t=20, b=40), height=400)
-            fig_s.add_hline(y=0, line_dash="dash", line_color="rgba(255,255,255,0.3)")
-            fig_s.add_vline(x=f"{taux_interet:.1f}%", line_dash="dot", line_color="#ffd93d",
-                annotation_text="Taux actuel", annotation_font_color="#ffd93d")
-            st.plotly_chart(fig_s, use_container_width=True)
+        st.markdown("#### 🎛️ Grille de sensibilité")
+        st.caption("Impact combiné de deux hypothèses sur le cashflow (an 1), le CSD ou le TRI — 50 × 50 scénarios")
+        axes = list(AXES_SENSIBILITE.keys())
+        cs1, cs2, cs3 = st.columns(3)
+        with cs1: axe_x = st.selectbox("Axe horizontal", axes, index=0, format_func=AXES_SENSIBILITE.get, key="sens_x")
+        with cs2: axe_y = st.selectbox("Axe vertical", [a for a in axes if a != axe_x], index=0, format_func=AXES_SENSIBILITE.get, key="sens_y")
+        with cs3: mesure_sens = st.selectbox("Indicateur", ["Cashflow", "CSD", "TRI (%)"], key="sens_mesure")
+        fig_s = _figure_sensibilite(cle_analyse, axe_x, axe_y, mesure_sens)
+        st.plotly_chart(fig_s, use_container_width=True)
 else:
     st.markdown("---")
     st.info("👆 Remplissez les données de l'immeuble ci-dessus pour lancer l'analyse.")
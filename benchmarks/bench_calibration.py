@@ -0,0 +1,88 @@
+"""
+Banc d'essai : calibration des poids du score de localisation (calibration.py).
+
+Génère N secteurs-périodes aux réponses aléatoires (dont des réponses
+manquantes et des options inconnues) et des cibles tirées de poids connus :
+inoccupation (continue) et logement vacant (0/1). Écrit le CSV, puis mesure
+la lecture, l'ajustement par moindres carrés et par régression logistique,
+et vérifie que les poids retrouvés sont proches des poids de génération.
+
+Usage :
+    python benchmarks/bench_calibration.py [--lignes 1000000] [--seed 0]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from calibration import SOMME_POIDS, calibrer, lire_historique  # noqa: E402
+from location import CRITERES, IDS_CRITERES, calculer_score_localisation_batch  # noqa: E402
+
+# Poids de génération (somme ramenée à SOMME_POIDS pour la comparaison)
+POIDS_REELS = np.array([2.5, 1.0, 3.0, 0.5, 0.8, 1.2, 1.5, 0.5])
+ECART_TOLERE = 0.15
+
+
+def generer_historique(chemin: Path, nb: int, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    colonnes, codes = {}, np.empty((nb, len(IDS_CRITERES)), dtype=np.int8)
+    for j, cid in enumerate(IDS_CRITERES):
+        options = np.array([*CRITERES[cid]["options"], "Option inconnue", None], dtype=object)
+        tirage = rng.random(nb)
+        choix = np.where(tirage < 0.02, len(options) - 2, np.where(tirage < 0.1, len(options) - 1,
+                                                                     rng.integers(0, len(options) - 2, nb)))
+        colonnes[cid] = options[choix]
+        codes[:, j] = np.where(choix == len(options) - 1, -1, choix)
+    # Score global tel que l'application le calcule : les réponses absentes en sont écartées
+    score = calculer_score_localisation_batch(codes, dict(zip(IDS_CRITERES, POIDS_REELS)))["score_global"]
+    colonnes["inoccupation_pct"] = np.round(12.0 - score + rng.normal(0, 1.0, nb), 2)
+    colonnes["vacant"] = (rng.random(nb) < 1 / (1 + np.exp(-(5.5 - score)))).astype(int)
+    pd.DataFrame(colonnes).to_csv(chemin, index=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lignes", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    attendus = POIDS_REELS / POIDS_REELS.sum() * SOMME_POIDS
+    echecs = 0
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = Path(dossier) / "historique.csv"
+        debut = time.perf_counter()
+        generer_historique(chemin, args.lignes, args.seed)
+        print(f"Jeu de données : {args.lignes:,} lignes, {chemin.stat().st_size / 2**20:.0f} Mo "
+              f"(généré en {time.perf_counter() - debut:.1f} s)")
+
+        for cible in ("inoccupation_pct", "vacant"):
+            debut = time.perf_counter()
+            codes, y = lire_historique(chemin, cible)
+            lecture = time.perf_counter() - debut
+            debut = time.perf_counter()
+            profil = calibrer(codes, y, cible)
+            ajustement = time.perf_counter() - debut
+            poids = np.array([profil["poids"][cid] for cid in IDS_CRITERES])
+            ecart = float(np.max(np.abs(poids - attendus)))
+            echecs += ecart > ECART_TOLERE
+            qualite = profil["qualite"]
+            print(f"\n{cible} ({profil['modele']}) : lecture {lecture:.2f} s, ajustement {ajustement:.2f} s"
+                  + (f" ({qualite['iterations']} itérations)" if "iterations" in qualite else ""))
+            print(f"  poids retrouvés : {' '.join(f'{p:.2f}' for p in poids)}")
+            print(f"  poids attendus  : {' '.join(f'{p:.2f}' for p in attendus)} (écart max {ecart:.3f})")
+            print(f"  corrélation du score avec la cible : {qualite['correlation_actuelle']:.3f} (poids actuels) "
+                  f"→ {qualite['correlation_calibree']:.3f} (calibrés)")
+
+    if echecs:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Banc d'essai : recherche de comparables (comparables.IndexComparables).
+
+Génère N annonces synthétiques réparties autour des secteurs de
+donnees/secteurs.csv (types, logements, prix et revenus plausibles), puis
+mesure :
+
+- la construction de l'index ;
+- la latence d'une recherche (type précisé ou non, filtre sur le nombre de
+  logements), percentiles P50 / P95 / max ;
+- l'exactitude sur un échantillon, contre une recherche exhaustive.
+
+Usage :
+    python benchmarks/bench_comparables.py [--annonces 1000000] [--requetes 5000] [--k 15] [--seed 0]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from comparables import DISTANCE_MAX_KM, ECART_LOGEMENTS, IndexComparables  # noqa: E402
+from secteurs import Secteurs  # noqa: E402
+
+# Type d'immeuble, nombre de logements (None : tiré de 7 à 40) et poids du tirage
+TYPES = [("Duplex", 2, 0.3), ("Triplex", 3, 0.25), ("Quadruplex", 4, 0.15), ("Quintuplex", 5, 0.08),
+         ("6-plex", 6, 0.07), ("Immeuble (7+ logements)", None, 0.1), (None, None, 0.05)]
+
+
+def generer_annonces(nb: int, seed: int) -> dict:
+    rng = np.random.default_rng(seed)
+    secteurs = Secteurs()
+    centre = rng.integers(len(secteurs), size=nb)
+    choix = rng.choice(len(TYPES), size=nb, p=[poids for _, _, poids in TYPES])
+    nb_logements = np.array([n or 0 for _, n, _ in TYPES], dtype=float)[choix]
+    grands = choix == 5
+    nb_logements[grands] = rng.integers(7, 41, size=int(grands.sum()))
+    nb_logements[choix == 6] = np.where(rng.random(int((choix == 6).sum())) < 0.5, np.nan, 4)
+    portes = np.where(np.isnan(nb_logements), 3, nb_logements)
+    prix = rng.lognormal(np.log(230_000), 0.3, nb) * portes
+    prix[rng.random(nb) < 0.05] = np.nan
+    revenus = rng.lognormal(np.log(1_050 * 12), 0.2, nb) * portes
+    revenus[rng.random(nb) < 0.3] = np.nan
+    return {
+        "urls": [f"https://exemple.test/annonce/{i}" for i in range(nb)],
+        "latitudes": secteurs.latitudes[centre] + rng.normal(0, 0.04, nb),
+        "longitudes": secteurs.longitudes[centre] + rng.normal(0, 0.06, nb),
+        "types": [TYPES[c][0] for c in choix.tolist()],
+        "nb_logements": nb_logements,
+        "prix": prix,
+        "revenus_bruts": revenus,
+    }
+
+
+def plus_proches_exhaustif(index: IndexComparables, latitude, longitude, type_immeuble, nb_logements, k):
+    distances = index._distances_km(latitude, longitude, np.arange(len(index)))
+    retenus = distances <= DISTANCE_MAX_KM
+    if type_immeuble is not None:
+        code = index.types.index(type_immeuble) if type_immeuble in index.types else -2
+        retenus &= index.codes_types == code
+    if nb_logements:
+        retenus &= np.abs(index.nb_logements - nb_logements) <= max(1.0, ECART_LOGEMENTS * nb_logements)
+    return np.sort(distances[retenus])[:k]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--annonces", type=int, default=1_000_000)
+    parser.add_argument("--requetes", type=int, default=5_000)
+    parser.add_argument("--k", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    annonces = generer_annonces(args.annonces, args.seed)
+    debut = time.perf_counter()
+    index = IndexComparables(**annonces)
+    print(f"Index : {len(index):,} annonces, {len(index._seaux):,} seaux, "
+          f"construit en {time.perf_counter() - debut:.2f} s")
+
+    rng = np.random.default_rng(args.seed + 1)
+    tirages = rng.integers(len(index), size=args.requetes)
+    requetes = []
+    for n, i in enumerate(tirages.tolist()):
+        latitude = index.latitudes[i] + rng.normal(0, 0.01)
+        longitude = index.longitudes[i] + rng.normal(0, 0.01)
+        type_immeuble = None if n % 3 == 0 else TYPES[n % 6][0]
+        nb_logements = None if n % 2 else (TYPES[n % 6][1] or 12)
+        requetes.append((latitude, longitude, type_immeuble, nb_logements))
+    # Points isolés : recherche jusqu'à la distance maximale
+    requetes += [(48.5, -71.0 - 0.01 * n, "Triplex", 3) for n in range(args.requetes // 50)]
+
+    index.comparables(*requetes[0], k=args.k)  # premier appel (chargements paresseux de numpy) hors mesure
+    durees = []
+    for requete in requetes:
+        debut = time.perf_counter()
+        index.comparables(*requete, k=args.k)
+        durees.append(time.perf_counter() - debut)
+    durees = np.array(durees) * 1000
+    print(f"Recherche ({len(requetes):,} requêtes, k = {args.k}) : P50 {np.percentile(durees, 50):.2f} ms, "
+          f"P95 {np.percentile(durees, 95):.2f} ms, max {durees.max():.2f} ms")
+
+    exemple = index.comparables(*requetes[1], k=args.k)
+    if exemple.prix_par_porte:
+        print(f"Exemple ({requetes[1][2]}) : {len(exemple.annonces)} comparables, prix par porte médian "
+              f"{exemple.prix_par_porte['p50']:,.0f} $ (P25–P75 {exemple.prix_par_porte['p25']:,.0f} – "
+              f"{exemple.prix_par_porte['p75']:,.0f} $)")
+
+    ecarts = 0
+    for requete in requetes[:200] + requetes[-5:]:
+        _, distances = index.plus_proches(*requete, k=args.k)
+        attendues = plus_proches_exhaustif(index, *requete, args.k)
+        ecarts += len(distances) != len(attendues) or not np.allclose(distances, attendues)
+    print(f"Écarts avec la recherche exhaustive : {ecarts}/205")
+    if ecarts:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Banc d'essai : temps de démarrage à froid de app.py.
+
+Exécute le script Streamlit en mode « bare » (sans serveur) dans un nouvel
+interpréteur, plusieurs fois, et mesure le temps total ainsi que les
+dépendances lourdes effectivement importées. L'état affiché est celui de
+l'accueil (aucune donnée saisie), comme à l'ouverture de l'application.
+
+Usage :
+    python benchmarks/bench_demarrage.py [--repetitions 5] [--reference <révision git>]
+
+Avec --reference, le app.py de cette révision est mesuré aussi (depuis un
+dossier temporaire contenant les modules de la même révision).
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+RACINE = Path(__file__).resolve().parent.parent
+
+MODULES_LOURDS = ["pandas", "plotly.express", "requests", "bs4", "lxml", "numpy_financial"]
+
+# Exécuté dans un interpréteur neuf : lance app.py et rapporte durée et imports
+_SONDE = """
+import json, runpy, sys, time, logging
+logging.disable(logging.CRITICAL)
+debut = time.perf_counter()
+runpy.run_path(sys.argv[1], run_name="__main__")
+duree = time.perf_counter() - debut
+print(json.dumps({"duree": duree, "modules": [m for m in sys.argv[2:] if m in sys.modules]}))
+"""
+
+
+def mesurer(chemin_app: Path, repetitions: int) -> tuple[list[float], list[str]]:
+    """Durées de démarrage (s) et modules lourds chargés."""
+    durees, modules = [], []
+    for _ in range(repetitions):
+        sortie = subprocess.run(
+            [sys.executable, "-c", _SONDE, str(chemin_app), *MODULES_LOURDS],
+            cwd=chemin_app.parent, capture_output=True, text=True, check=True,
+        )
+        mesure = json.loads(sortie.stdout.strip().splitlines()[-1])
+        durees.append(mesure["duree"])
+        modules = mesure["modules"]
+    return durees, modules
+
+
+def extraire_revision(revision: str, destination: Path) -> Path:
+    """Copie les fichiers .py racine d'une révision git dans ``destination``."""
+    fichiers = subprocess.run(
+        ["git", "ls-tree", "--name-only", revision], cwd=RACINE,
+        capture_output=True, text=True, check=True,
+    ).stdout.split()
+    for nom in fichiers:
+        if nom.endswith(".py"):
+            contenu = subprocess.run(
+                ["git", "show", f"{revision}:{nom}"], cwd=RACINE, capture_output=True, check=True,
+            ).stdout
+            (destination / nom).write_bytes(contenu)
+    return destination / "app.py"
+
+
+def afficher(titre: str, durees: list[float], modules: list[str]) -> float:
+    mediane = statistics.median(durees)
+    print(f"{titre:<12} médiane {mediane * 1000:7.0f} ms  (min {min(durees) * 1000:.0f} ms)"
+          f"  modules lourds : {', '.join(modules) or 'aucun'}")
+    return mediane
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repetitions", type=int, default=5)
+    parser.add_argument("--reference", help="révision git à comparer (ex. un commit antérieur)")
+    args = parser.parse_args()
+
+    actuel = afficher("Actuel", *mesurer(RACINE / "app.py", args.repetitions))
+
+    if args.reference:
+        with tempfile.TemporaryDirectory() as dossier:
+            app_reference = extraire_revision(args.reference, Path(dossier))
+            reference = afficher(args.reference[:12], *mesurer(app_reference, args.repetitions))
+        print(f"Gain : {(reference - actuel) * 1000:.0f} ms ({(1 - actuel / reference) * 100:.0f} %)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Banc d'essai : extraction ciblée lxml/XPath contre BeautifulSoup complet.
+
+Pour chaque page du corpus (benchmarks/pages/*.html), compare l'extracteur
+DOM de scraper.py (_extraire_dom, règles de la plateforme) à une version
+BeautifulSoup de référence, définie ici : résultats identiques, temps moyen
+par page et mémoire par arbre analysé.
+
+La mémoire est mesurée dans un interpréteur neuf par approche : hausse du
+RSS maximal pendant que N arbres de chaque page restent vivants, divisée
+par N (la mémoire de libxml2 n'est pas vue par tracemalloc).
+
+Usage :
+    python benchmarks/bench_extraction.py [--repetitions 50] [--copies 200]
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+from functools import partial
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+RACINE = Path(__file__).resolve().parent.parent
+PAGES = Path(__file__).resolve().parent / "pages"
+
+sys.path.insert(0, str(RACINE))
+
+import scraper  # noqa: E402
+
+# Règles de scraper.REGLES_EXTRACTION, classes compilées pour BeautifulSoup
+_REGLES_BS4 = {
+    plateforme: {
+        champ: ([(balise, re.compile(classes, re.I)) for balise, classes in regle["elements"]], regle["meta"])
+        for champ, regle in regles.items()
+    }
+    for plateforme, regles in scraper.REGLES_EXTRACTION.items()
+}
+
+
+def extraire_dom_bs4(html: str, plateforme: str) -> dict:
+    """Version BeautifulSoup de référence de ``scraper._extraire_dom`` (arbre complet)."""
+    champs = {"prix": None, "adresse": None, "type_immeuble": None, "nb_logements": None}
+    soup = BeautifulSoup(html, "lxml")
+
+    for champ, (elements, propriete) in _REGLES_BS4[plateforme].items():
+        noeud = next((n for balise, classes in elements if (n := soup.find(balise, class_=classes))), None)
+        if noeud:
+            champs[champ] = (scraper._nettoyer_prix(noeud.get_text()) if champ == "prix"
+                             else noeud.get_text(strip=True))
+        if champs[champ] is None and propriete:
+            meta = soup.find("meta", {"property": propriete})
+            if meta:
+                contenu = meta.get("content", "")
+                champs[champ] = scraper._nettoyer_prix(contenu) if champ == "prix" else contenu
+
+    title = soup.find("title")
+    if title:
+        champs["type_immeuble"], champs["nb_logements"] = scraper._classer_immeuble(title.get_text())
+    return champs
+
+
+EXTRACTEURS = {
+    plateforme: (partial(scraper._extraire_dom, plateforme=plateforme), partial(extraire_dom_bs4, plateforme=plateforme))
+    for plateforme in scraper.REGLES_EXTRACTION
+}
+
+# Exécuté dans un interpréteur neuf : garde N arbres vivants et rapporte le RSS
+_SONDE_MEMOIRE = """
+import resource, sys
+sys.path.insert(0, sys.argv[1])
+import scraper
+from bs4 import BeautifulSoup
+html = open(sys.argv[2], encoding="utf-8").read()
+copies = int(sys.argv[4])
+analyser = scraper._analyser if sys.argv[3] == "lxml" else (lambda h: BeautifulSoup(h, "lxml"))
+analyser("<p>échauffement</p>")
+avant = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+arbres = [analyser(html) for _ in range(copies)]
+apres = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+# ru_maxrss est en Kio sous Linux, en octets sous macOS
+print((apres - avant) * (1 if sys.platform == "darwin" else 1024) / copies)
+"""
+
+
+def chronometrer(extracteur, html: str, repetitions: int) -> float:
+    """Temps moyen (s) d'une extraction."""
+    debut = time.perf_counter()
+    for _ in range(repetitions):
+        extracteur(html)
+    return (time.perf_counter() - debut) / repetitions
+
+
+def memoire_par_arbre(page: Path, moteur: str, copies: int) -> float:
+    """Octets par arbre analysé (``moteur`` : "lxml" ou "bs4")."""
+    sortie = subprocess.run(
+        [sys.executable, "-c", _SONDE_MEMOIRE, str(RACINE), str(page), moteur, str(copies)],
+        capture_output=True, text=True, check=True,
+    )
+    return float(sortie.stdout.strip())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repetitions", type=int, default=50)
+    parser.add_argument("--copies", type=int, default=200)
+    args = parser.parse_args()
+
+    pages = sorted(PAGES.glob("*.html"))
+    if not pages:
+        sys.exit(f"Aucune page dans {PAGES}")
+
+    print(f"{'page':<34}{'taille':>9}{'lxml':>10}{'bs4':>10}{'gain':>7}{'mém. lxml':>12}{'mém. bs4':>11}  identique")
+    total_lxml = total_bs4 = 0.0
+    differences = 0
+    for page in pages:
+        html = page.read_text(encoding="utf-8")
+        plateforme = "duproprio" if page.name.startswith("duproprio") else "centris"
+        rapide, reference = EXTRACTEURS[plateforme]
+
+        identique = rapide(html) == reference(html)
+        differences += not identique
+        t_lxml = chronometrer(rapide, html, args.repetitions)
+        t_bs4 = chronometrer(reference, html, args.repetitions)
+        total_lxml += t_lxml
+        total_bs4 += t_bs4
+        m_lxml = memoire_par_arbre(page, "lxml", args.copies)
+        m_bs4 = memoire_par_arbre(page, "bs4", args.copies)
+        print(f"{page.name:<34}{len(html) / 1024:>7.1f}Ko{t_lxml * 1000:>8.2f}ms{t_bs4 * 1000:>8.2f}ms"
+              f"{t_bs4 / t_lxml:>6.1f}×{m_lxml / 1024:>10.0f}Ko{m_bs4 / 1024:>9.0f}Ko  {'oui' if identique else 'NON'}")
+
+    print(f"\nTotal corpus : lxml {total_lxml * 1000:.1f} ms, bs4 {total_bs4 * 1000:.1f} ms "
+          f"(× {total_bs4 / total_lxml:.1f})")
+    print(json.dumps({"pages": len(pages), "differences": differences}))
+    if differences:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
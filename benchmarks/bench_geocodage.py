@@ -0,0 +1,144 @@
+"""
+Banc d'essai : géocodage hors ligne (geocodage.Geocodeur).
+
+Génère un référentiel synthétique de tronçons de la taille d'un extrait
+provincial (rues fictives réparties entre les municipalités de
+donnees/municipalites.csv), construit l'index trié, puis mesure :
+
+- le temps de construction et la taille de l'index ;
+- la latence d'un géocodage (adresse complète, rue seule, municipalité) ;
+- la hausse du RSS à l'ouverture (l'index reste sur disque, lu par mmap).
+
+Vérifie aussi les adresses du corpus du scraper sur les vrais référentiels.
+
+Usage :
+    python benchmarks/bench_geocodage.py [--troncons 500000] [--requetes 20000] [--seed 0]
+"""
+
+import argparse
+import csv
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from geocodage import FICHIER_MUNICIPALITES, Geocodeur  # noqa: E402
+
+# (adresse, ville, municipalité attendue, barème attendu) ; toutes sont localisées à la rue
+CAS = [
+    ("5412, rue Saint-Denis, Montréal (Rosemont/La Petite-Patrie), Quartier Vieux-Rosemont", None, "Montréal", "Montréal"),
+    ("2250, av. du Mont-Royal Est", "Montréal", "Montréal", "Montréal"),
+    ("12, rue King Ouest,Sherbrooke", None, "Sherbrooke", "Québec (général)"),
+    ("Plex à vendre, 15 rue Laval, Gatineau", None, "Gatineau", "Québec (général)"),
+    ("880, rue Laviolette, Trois-Rivières (Centre-ville)", None, "Trois-Rivières", "Québec (général)"),
+    ("33, rue Côté, Lévis", None, "Lévis", "Québec (général)"),
+    ("41, rue Principale", "Granby", "Granby", "Québec (général)"),
+    ("100, 3e Avenue, Limoilou", None, "Québec", "Ville de Québec"),
+    ("App. 3, 5412 rue Saint-Denis, Montréal", None, "Montréal", "Montréal"),
+    ("5412 rue Saint-Denis Montréal", None, "Montréal", "Montréal"),
+    ("5412 rue Saint-Denis H2J 2L1", None, "Montréal", "Montréal"),
+    ("15 rue Laval J8X 1A1", None, "Gatineau", "Québec (général)"),
+]
+
+
+def rss_max_ko() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 if sys.platform == "darwin" else rss
+
+
+def nom_fictif(n: int) -> str:
+    """Nom de rue sans chiffres (les chiffres seraient lus comme numéro civique)."""
+    lettres = ""
+    while True:
+        n, reste = divmod(n, 26)
+        lettres += "abcdefghijklmnopqrstuvwxyz"[reste]
+        if n == 0:
+            return "des " + lettres.capitalize()
+
+
+def generer_referentiel(chemin: Path, nb_troncons: int, seed: int) -> list[tuple[str, str, int]]:
+    """Écrit ``nb_troncons`` tronçons fictifs ; retourne des (municipalité, rue, numéro) existants."""
+    rng = np.random.default_rng(seed)
+    with open(FICHIER_MUNICIPALITES, encoding="utf-8", newline="") as fichier:
+        municipalites = [(m["municipalite"], float(m["latitude"]), float(m["longitude"]), m["rta"])
+                         for m in csv.DictReader(fichier)]
+    types = ["rue", "avenue", "boulevard", "chemin"]
+    echantillon = []
+    with open(chemin, "w", encoding="utf-8", newline="") as sortie:
+        ecrivain = csv.writer(sortie)
+        ecrivain.writerow(["municipalite", "rue", "debut", "fin", "rta", "latitude_debut", "longitude_debut",
+                           "latitude_fin", "longitude_fin"])
+        for i in range(nb_troncons):
+            municipalite, latitude, longitude, rta = municipalites[rng.integers(len(municipalites))]
+            rue = f"{types[i % len(types)]} {nom_fictif(i // 4)}"
+            debut = int(rng.integers(1, 5000))
+            fin = debut + int(rng.integers(10, 500))
+            dlat, dlon = rng.normal(0, 0.05, 2)
+            ecrivain.writerow([municipalite, rue, debut, fin, rta, f"{latitude + dlat:.5f}", f"{longitude + dlon:.5f}",
+                               f"{latitude + dlat + 0.002:.5f}", f"{longitude + dlon + 0.002:.5f}"])
+            if len(echantillon) < 100_000:
+                echantillon.append((municipalite, rue, (debut + fin) // 2))
+    return echantillon
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--troncons", type=int, default=500_000)
+    parser.add_argument("--requetes", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    geocodeur = Geocodeur(dossier_index=Path(tempfile.mkdtemp()))
+    ecarts = []
+    for adresse, ville, municipalite, bareme in CAS:
+        resultat = geocodeur.geocoder(adresse, ville)
+        attendu = (municipalite, bareme, "adresse")
+        if resultat is None or (resultat.municipalite, resultat.bareme, resultat.precision) != attendu:
+            ecarts.append(f"{adresse} : attendu {'/'.join(attendu)}, obtenu {resultat}")
+    print(f"Corpus : {len(CAS) - len(ecarts)}/{len(CAS)} adresses conformes")
+    for ecart in ecarts:
+        print(f"  ✗ {ecart}")
+
+    with tempfile.TemporaryDirectory() as dossier:
+        dossier = Path(dossier)
+        source = dossier / "adresses.csv"
+        echantillon = generer_referentiel(source, args.troncons, args.seed)
+
+        rss_avant = rss_max_ko()
+        debut = time.perf_counter()
+        geocodeur = Geocodeur(fichier_adresses=source, dossier_index=dossier / "index")
+        construction = time.perf_counter() - debut
+        taille = sum(f.stat().st_size for f in (dossier / "index").iterdir())
+        print(f"\nIndex : {len(geocodeur.index):,} tronçons construits en {construction:.2f} s, {taille / 2**20:.0f} Mo")
+
+        debut = time.perf_counter()
+        geocodeur = Geocodeur(fichier_adresses=source, dossier_index=dossier / "index")
+        ouverture = time.perf_counter() - debut
+        print(f"Ouverture d'un index existant : {ouverture * 1000:.1f} ms")
+
+        rng = np.random.default_rng(args.seed + 1)
+        tirages = rng.integers(len(echantillon), size=args.requetes)
+        requetes = {
+            "adresse complète": [f"{n}, {rue}, {m}" for m, rue, n in (echantillon[i] for i in tirages)],
+            "rue sans numéro": [f"{rue}, {m}" for m, rue, _ in (echantillon[i] for i in tirages)],
+            "municipalité seule": [m for m, _, _ in (echantillon[i] for i in tirages)],
+        }
+        for nom, adresses in requetes.items():
+            debut = time.perf_counter()
+            resolues = sum(geocodeur.geocoder(adresse) is not None for adresse in adresses)
+            duree = (time.perf_counter() - debut) / len(adresses)
+            print(f"{nom:<20}: {duree * 1e6:6.1f} µs par adresse ({resolues}/{len(adresses)} résolues)")
+        print(f"Hausse du RSS maximal (construction comprise) : {(rss_max_ko() - rss_avant) / 1024:.0f} Mo")
+        geocodeur.index.fermer()
+
+    if ecarts:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
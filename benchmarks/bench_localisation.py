@@ -0,0 +1,80 @@
+"""
+Banc d'essai : score de localisation vectorisé contre la version par secteur.
+
+Génère N secteurs aux réponses aléatoires (dont des réponses manquantes et
+des options inconnues), puis compare calculer_score_localisation appelé
+en boucle à encoder_reponses + calculer_score_localisation_batch : temps
+et égalité des scores globaux et des appréciations.
+
+Usage :
+    python benchmarks/bench_localisation.py [--secteurs 50000] [--seed 0]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from location import (  # noqa: E402
+    CRITERES,
+    calculer_score_localisation,
+    calculer_score_localisation_batch,
+    encoder_reponses,
+)
+
+
+def generer_reponses(nb_secteurs: int, seed: int) -> list[dict]:
+    """Réponses de ``nb_secteurs`` secteurs : 10 % manquantes, 5 % d'options inconnues."""
+    rng = np.random.default_rng(seed)
+    secteurs = [{} for _ in range(nb_secteurs)]
+    for cid, info in CRITERES.items():
+        options = np.array([*info["options"], "Option inconnue"], dtype=object)
+        tirages = rng.random(nb_secteurs)
+        choix = np.where(tirages < 0.05, len(options) - 1, rng.integers(0, len(options) - 1, nb_secteurs))
+        for secteur, tirage, option in zip(secteurs, tirages, options[choix]):
+            if tirage >= 0.15 or tirage < 0.05:
+                secteur[cid] = option
+    return secteurs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--secteurs", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    reponses = generer_reponses(args.secteurs, args.seed)
+
+    debut = time.perf_counter()
+    reference = [calculer_score_localisation(r) for r in reponses]
+    t_boucle = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    codes = encoder_reponses(reponses)
+    t_encodage = time.perf_counter() - debut
+    debut = time.perf_counter()
+    resultats = calculer_score_localisation_batch(codes)
+    t_score = time.perf_counter() - debut
+
+    ecarts_score = int(np.sum(resultats["score_global"] != [r["score_global"] for r in reference]))
+    ecarts_appreciation = int(np.sum(resultats["appreciation"] != np.array([r["appreciation"] for r in reference], dtype=object)))
+
+    print(f"Secteurs : {args.secteurs:,}")
+    print(f"Boucle calculer_score_localisation : {t_boucle * 1000:8.1f} ms")
+    print(f"encoder_reponses                   : {t_encodage * 1000:8.1f} ms")
+    print(f"calculer_score_localisation_batch  : {t_score * 1000:8.1f} ms "
+          f"(× {t_boucle / t_score:.0f} ; × {t_boucle / (t_encodage + t_score):.0f} avec l'encodage)")
+    print(f"Écarts : score global {ecarts_score}, appréciation {ecarts_appreciation}")
+
+    classement = np.argsort(-resultats["score_global"], kind="stable")[:5]
+    print("Meilleurs secteurs : " + ", ".join(f"#{i} ({resultats['score_global'][i]:.1f})" for i in classement))
+    if ecarts_score or ecarts_appreciation:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
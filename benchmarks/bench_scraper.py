@@ -0,0 +1,197 @@
+"""
+Banc d'essai du scraper, hors ligne, sur le corpus de pages enregistrées.
+
+Lance benchmarks/serveur_local.py dans un autre processus, y fait passer la
+session du scraper (mandataire HTTP), puis mesure pour ``extraire_donnees`` :
+
+- l'exactitude : chaque page du corpus doit donner les champs de
+  benchmarks/pages/attendus.json ;
+- la latence téléchargement + analyse par page (min, médiane, p95) ;
+- le débit en lot (``extraire_donnees_batch``, pages/s) ;
+- la mémoire : RSS maximal du processus, et sa hausse sur la page énorme.
+
+Le cache disque est désactivé (sauf --cache) et le débit par domaine est
+illimité : on mesure le chemin chaud du scraper, pas la politesse.
+
+Usage :
+    python benchmarks/bench_scraper.py [--repetitions 20] [--lot 400] [--json resultats.json]
+                                       [--reference resultats.json] [--tolerance 25]
+                                       [--cache] [--arret-anticipe]
+
+Avec --reference, toute latence médiane ou tout débit dégradé de plus de
+--tolerance % par rapport à la référence fait échouer le banc (code 1).
+"""
+
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+DOSSIER = Path(__file__).resolve().parent
+PAGES = DOSSIER / "pages"
+ATTENDUS = PAGES / "attendus.json"
+
+sys.path.insert(0, str(DOSSIER.parent))
+
+import cache_http  # noqa: E402
+import politesse  # noqa: E402
+import scraper  # noqa: E402
+
+DOMAINES = {"centris": "http://www.centris.ca", "duproprio": "http://duproprio.com"}
+CHAMPS_VERIFIES = ("plateforme", "prix", "type_immeuble", "nb_logements", "adresse", "ville", "revenus_bruts", "depenses")
+
+
+def url_de(nom: str) -> str:
+    """URL servie par le serveur local pour une page du corpus (ou /enorme)."""
+    plateforme = "duproprio" if nom.startswith("duproprio") else "centris"
+    return f"{DOMAINES[plateforme]}/{nom}"
+
+
+def rss_max_ko() -> float:
+    """RSS maximal du processus (Ko)."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 if sys.platform == "darwin" else rss
+
+
+def resume(durees: list[float]) -> dict:
+    """Statistiques d'une série de durées (ms)."""
+    ms = sorted(d * 1000 for d in durees)
+    return {
+        "min": ms[0],
+        "mediane": statistics.median(ms),
+        "moyenne": statistics.fmean(ms),
+        "p95": ms[min(len(ms) - 1, round(0.95 * (len(ms) - 1)))],
+    }
+
+
+def demarrer_serveur() -> tuple[subprocess.Popen, str]:
+    processus = subprocess.Popen(
+        [sys.executable, str(DOSSIER / "serveur_local.py"), "--port", "0"],
+        stdout=subprocess.PIPE, text=True,
+    )
+    return processus, processus.stdout.readline().strip()
+
+
+def configurer(mandataire: str, avec_cache: bool, dossier_cache: str) -> None:
+    session = scraper.configurer_session(nb_reprises=0)
+    session.trust_env = False  # ignorer les HTTP_PROXY / NO_PROXY de l'environnement
+    session.proxies = {"http": mandataire}
+    politesse.configurer_politesse(debit=0)
+    cache_http.configurer_cache(Path(dossier_cache) / "pages.sqlite" if avec_cache else None)
+
+
+def verifier(pages: list[str]) -> list[str]:
+    """Pages dont l'extraction diffère des résultats attendus."""
+    attendus = json.loads(ATTENDUS.read_text(encoding="utf-8"))
+    ecarts = []
+    for nom in pages:
+        obtenu = scraper.extraire_donnees(url_de(nom))
+        obtenu = {cle: obtenu.get(cle) for cle in CHAMPS_VERIFIES}
+        if obtenu != attendus.get(nom):
+            ecarts.append(f"{nom} : attendu {attendus.get(nom)}, obtenu {obtenu}")
+    return ecarts
+
+
+def mesurer_latence(nom: str, repetitions: int, arret_anticipe: bool = False) -> dict:
+    url = url_de(nom)
+    scraper.extraire_donnees(url, arret_anticipe)  # réchauffe connexion et robots.txt
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        scraper.extraire_donnees(url, arret_anticipe)
+        durees.append(time.perf_counter() - debut)
+    return resume(durees)
+
+
+def mesurer_debit(pages: list[str], nb: int, concurrence: int, arret_anticipe: bool = False) -> float:
+    urls = [f"{url_de(pages[i % len(pages)])}?n={i}" for i in range(nb)]
+    debut = time.perf_counter()
+    nb_resultats = sum(1 for _ in scraper.extraire_donnees_batch(
+        urls, concurrence=concurrence, par_domaine=concurrence, arret_anticipe=arret_anticipe))
+    return nb_resultats / (time.perf_counter() - debut)
+
+
+def comparer(resultats: dict, reference: dict, tolerance: float) -> list[str]:
+    """Régressions au-delà de ``tolerance`` (%) par rapport à la référence."""
+    regressions = []
+    for nom, stats in resultats["latence_ms"].items():
+        avant = reference.get("latence_ms", {}).get(nom)
+        if avant and stats["mediane"] > avant["mediane"] * (1 + tolerance / 100):
+            regressions.append(f"latence {nom} : {avant['mediane']:.2f} → {stats['mediane']:.2f} ms")
+    avant = reference.get("debit_pages_s")
+    if avant and resultats["debit_pages_s"] < avant * (1 - tolerance / 100):
+        regressions.append(f"débit : {avant:.0f} → {resultats['debit_pages_s']:.0f} pages/s")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repetitions", type=int, default=20)
+    parser.add_argument("--lot", type=int, default=400, help="pages pour la mesure de débit")
+    parser.add_argument("--concurrence", type=int, default=8)
+    parser.add_argument("--enorme-ko", type=int, default=5000, help="taille de la page énorme")
+    parser.add_argument("--cache", action="store_true", help="mesurer avec le cache disque (chemin chaud)")
+    parser.add_argument("--arret-anticipe", action="store_true", help="arrêter chaque téléchargement à la région utile")
+    parser.add_argument("--json", help="fichier où écrire les résultats")
+    parser.add_argument("--reference", help="résultats JSON d'une exécution de référence")
+    parser.add_argument("--tolerance", type=float, default=25.0, help="dégradation tolérée (%%)")
+    args = parser.parse_args()
+
+    pages = sorted(p.stem for p in PAGES.glob("*.html"))
+    serveur, mandataire = demarrer_serveur()
+    try:
+        with tempfile.TemporaryDirectory() as dossier_cache:
+            configurer(mandataire, args.cache, dossier_cache)
+
+            ecarts = verifier(pages)
+            print(f"Exactitude : {len(pages) - len(ecarts)}/{len(pages)} pages conformes")
+            for ecart in ecarts:
+                print(f"  ✗ {ecart}")
+
+            print(f"\n{'page':<30}{'min':>9}{'médiane':>10}{'p95':>9}  (ms, {args.repetitions} répétitions)")
+            latences = {}
+            for nom in pages:
+                latences[nom] = stats = mesurer_latence(nom, args.repetitions, args.arret_anticipe)
+                print(f"{nom:<30}{stats['min']:>9.2f}{stats['mediane']:>10.2f}{stats['p95']:>9.2f}")
+
+            rss_avant = rss_max_ko()
+            nom_enorme = f"enorme?ko={args.enorme_ko}"
+            latences["enorme"] = stats = mesurer_latence(nom_enorme, max(3, args.repetitions // 5), args.arret_anticipe)
+            hausse_rss = rss_max_ko() - rss_avant
+            print(f"{'enorme (' + str(args.enorme_ko) + ' Ko)':<30}{stats['min']:>9.2f}{stats['mediane']:>10.2f}"
+                  f"{stats['p95']:>9.2f}   RSS +{hausse_rss / 1024:.0f} Mo")
+
+            debit = mesurer_debit(pages, args.lot, args.concurrence, args.arret_anticipe)
+            print(f"\nDébit en lot : {debit:.0f} pages/s ({args.lot} pages, concurrence {args.concurrence})")
+            print(f"RSS maximal : {rss_max_ko() / 1024:.0f} Mo")
+            telechargements = scraper.statistiques_telechargements()
+            print(f"Octets reçus : {telechargements['octets_reseau'] / 2**20:.0f} Mo, "
+                  f"pages plafonnées {telechargements['plafonnees']}, arrêts anticipés {telechargements['arrets_anticipes']}")
+    finally:
+        serveur.terminate()
+        serveur.wait()
+
+    resultats = {
+        "latence_ms": latences,
+        "debit_pages_s": debit,
+        "rss_max_mo": rss_max_ko() / 1024,
+        "rss_enorme_mo": hausse_rss / 1024,
+        "ecarts": ecarts,
+    }
+    if args.json:
+        Path(args.json).write_text(json.dumps(resultats, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    regressions = comparer(resultats, json.loads(Path(args.reference).read_text()), args.tolerance) if args.reference else []
+    for regression in regressions:
+        print(f"  ✗ régression {regression}")
+    if ecarts or regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Banc d'essai : recherche de secteurs (secteurs.Secteurs).
+
+Mesure le chargement de donnees/secteurs.csv, puis la recherche par code
+postal et par coordonnées (grille spatiale) sur des points aléatoires du
+sud du Québec, en vérifiant chaque secteur trouvé contre une recherche
+exhaustive.
+
+Usage :
+    python benchmarks/bench_secteurs.py [--points 20000] [--seed 0]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from secteurs import DISTANCE_MAX_KM, Secteurs  # noqa: E402
+
+
+def plus_proche_exhaustif(secteurs: Secteurs, latitude: float, longitude: float) -> str | None:
+    distances = [secteurs._distance_km(latitude, longitude, i) for i in range(len(secteurs))]
+    i = int(np.argmin(distances))
+    return secteurs.rta[i] if distances[i] <= DISTANCE_MAX_KM else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--points", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    debut = time.perf_counter()
+    secteurs = Secteurs()
+    print(f"Chargement : {len(secteurs)} secteurs en {(time.perf_counter() - debut) * 1000:.1f} ms")
+
+    codes = [f"{rta} 1A1" for rta in secteurs.rta] * max(1, args.points // len(secteurs))
+    debut = time.perf_counter()
+    trouves = sum(secteurs.par_code_postal(code) is not None for code in codes)
+    duree = (time.perf_counter() - debut) / len(codes)
+    print(f"Par code postal : {duree * 1e6:.1f} µs par recherche ({trouves}/{len(codes)} trouvés)")
+
+    rng = np.random.default_rng(args.seed)
+    points = np.column_stack([rng.uniform(45.0, 48.6, args.points), rng.uniform(-76.0, -68.0, args.points)])
+    debut = time.perf_counter()
+    resultats = [secteurs.plus_proche(latitude, longitude) for latitude, longitude in points.tolist()]
+    duree = (time.perf_counter() - debut) / len(points)
+    trouves = sum(r is not None for r in resultats)
+    print(f"Par coordonnées : {duree * 1e6:.1f} µs par recherche ({trouves}/{len(points)} à moins de {DISTANCE_MAX_KM:.0f} km)")
+
+    ecarts = sum(
+        (r.rta if r is not None else None) != plus_proche_exhaustif(secteurs, latitude, longitude)
+        for (latitude, longitude), r in zip(points.tolist(), resultats)
+    )
+    print(f"Écarts avec la recherche exhaustive : {ecarts}")
+    if ecarts:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
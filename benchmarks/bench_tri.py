@@ -0,0 +1,64 @@
+"""
+Banc d'essai : solveur TRI vectorisé (finance.calculer_tri_batch) contre npf.irr.
+
+Génère des séries de flux réalistes (mise de fonds, 10 cashflows annuels,
+revente la dernière année), puis compare temps de calcul et résultats.
+
+Usage :
+    python benchmarks/bench_tri.py [--series 100000] [--seed 0]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from finance import calculer_tri_batch  # noqa: E402
+
+
+def generer_flux(nb_series: int, seed: int) -> np.ndarray:
+    """Flux (11 périodes × séries) : -mise de fonds, cashflows, revente."""
+    rng = np.random.default_rng(seed)
+    mise_de_fonds = rng.uniform(50_000, 500_000, nb_series)
+    cashflows = rng.normal(5_000, 15_000, (10, nb_series))
+    cashflows[-1] += rng.uniform(0, 1_000_000, nb_series)
+    return np.vstack([-mise_de_fonds, cashflows])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--series", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    flux = generer_flux(args.series, args.seed)
+
+    debut = time.perf_counter()
+    tri = calculer_tri_batch(flux)
+    duree_batch = time.perf_counter() - debut
+    print(f"calculer_tri_batch : {args.series:,} séries en {duree_batch * 1000:,.1f} ms")
+
+    try:
+        import numpy_financial as npf
+    except ImportError:
+        print("numpy_financial absent : comparaison avec npf.irr ignorée.")
+        return
+
+    debut = time.perf_counter()
+    reference = np.array([npf.irr(flux[:, j]) for j in range(flux.shape[1])])
+    duree_npf = time.perf_counter() - debut
+    print(f"npf.irr (boucle)   : {args.series:,} séries en {duree_npf * 1000:,.1f} ms")
+    print(f"Accélération       : × {duree_npf / duree_batch:,.0f}")
+
+    deux_definis = ~np.isnan(tri) & ~np.isnan(reference)
+    ecart = np.abs(tri - reference)[deux_definis]
+    print(f"Écart max (défini des deux côtés) : {ecart.max() if ecart.size else 0:.2e}")
+    print(f"TRI indéfini : batch={np.isnan(tri).sum()}, npf={np.isnan(reference).sum()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Banc d'essai : détection du type d'immeuble dans les titres d'annonces.
+
+Compare l'ancienne boucle de mots-clés (une recherche par mot, après mise
+en minuscules, premier mot trouvé dans un ordre fixe) à l'expression
+compilée de scraper._classer_immeuble (une seule passe sur le titre en
+minuscules, priorité au nombre de logements explicite), sur les titres du corpus et des titres
+générés :
+
+- exactitude : type et nombre de logements attendus pour chaque titre ;
+- temps moyen par titre.
+
+Usage :
+    python benchmarks/bench_type_immeuble.py [--titres 20000] [--repetitions 5]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+RACINE = Path(__file__).resolve().parent.parent
+PAGES = Path(__file__).resolve().parent / "pages"
+
+sys.path.insert(0, str(RACINE))
+
+import scraper  # noqa: E402
+
+# (titre, type attendu, nombre de logements attendu)
+CAS = [
+    ("Triplex à vendre - Montréal (Rosemont) | Centris.ca", "Triplex", 3),
+    ("Immeuble à revenus - Triplex, Québec", "Triplex", 3),
+    ("Immeuble à revenus à vendre - Sherbrooke", "Autre", None),
+    ("Immeuble à revenus de 12 logements, Laval", "Immeuble (7+ logements)", 12),
+    ("Plex à vendre, 15 rue Laval, Gatineau", "Autre", None),
+    ("6-plex à vendre - Longueuil", "6-plex", 6),
+    ("Sixplex rénové, Verdun", "6-plex", 6),
+    ("8plex à vendre, Saint-Jérôme", "Immeuble (7+ logements)", 8),
+    ("Quintuplex - 5 unités résidentielles", "Quintuplex", 5),
+    ("Multiplex à vendre, Lévis", "Immeuble (7+ logements)", None),
+    ("Immeuble de 4 logements à vendre", "Quadruplex", 4),
+    ("DUPLEX À VENDRE | DuProprio", "Duplex", 2),
+    ("Condo à vendre - Montréal", None, None),
+    ("Maison unifamiliale, Perplexe (Québec)", None, None),
+]
+
+
+def ancienne_detection(titre: str) -> str | None:
+    """Détection d'avant l'expression compilée (référence)."""
+    for mot in ["Duplex", "Triplex", "Quadruplex", "Quintuplex", "Immeuble", "Plex"]:
+        if mot.lower() in titre.lower():
+            return mot
+    return None
+
+
+def titres_corpus() -> list[str]:
+    titres = []
+    for page in sorted(PAGES.glob("*.html")):
+        arbre = scraper._analyser(page.read_text(encoding="utf-8"))
+        titre = scraper._XP_TITRE(arbre) if arbre is not None else []
+        if titre:
+            titres.append(scraper._texte(titre[0]).strip())
+    return titres
+
+
+def titres_generes(nb: int, graine: int = 1) -> list[str]:
+    hasard = random.Random(graine)
+    villes = ["Montréal", "Québec", "Laval", "Gatineau", "Sherbrooke", "Trois-Rivières", "Lévis"]
+    modeles = [
+        "{type} à vendre - {ville} | Centris.ca",
+        "Immeuble à revenus - {type}, {ville}",
+        "{n} logements à vendre, {ville}",
+        "Maison à vendre, {ville} | DuProprio",
+        "{n}-plex rénové au centre-ville de {ville}",
+    ]
+    types = ["Duplex", "Triplex", "Quadruplex", "Quintuplex", "6-plex", "Plex", "Multiplex"]
+    return [
+        hasard.choice(modeles).format(type=hasard.choice(types), ville=hasard.choice(villes), n=hasard.randint(2, 24))
+        for _ in range(nb)
+    ]
+
+
+def chronometrer(fonction, titres: list[str], repetitions: int) -> float:
+    """Meilleur temps moyen par titre (s)."""
+    meilleur = float("inf")
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        for titre in titres:
+            fonction(titre)
+        meilleur = min(meilleur, (time.perf_counter() - debut) / len(titres))
+    return meilleur
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--titres", type=int, default=20_000, help="titres générés pour la mesure de temps")
+    parser.add_argument("--repetitions", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'titre':<56}{'ancien':>14}  {'nouveau':<28}")
+    erreurs_anciennes = erreurs = 0
+    for titre, type_attendu, nb_attendu in CAS:
+        ancien = ancienne_detection(titre)
+        obtenu = scraper._classer_immeuble(titre)
+        erreurs_anciennes += ancien != type_attendu
+        erreurs += obtenu != (type_attendu, nb_attendu)
+        marque = "" if obtenu == (type_attendu, nb_attendu) else "  ✗"
+        print(f"{titre[:55]:<56}{str(ancien):>14}  {str(obtenu):<28}{marque}")
+    print(f"\nTitres mal classés : ancien {erreurs_anciennes}/{len(CAS)} (libellés hors liste de l'application "
+          f"compris), nouveau {erreurs}/{len(CAS)}")
+
+    titres = titres_corpus() + titres_generes(args.titres)
+    t_ancien = chronometrer(ancienne_detection, titres, args.repetitions)
+    t_nouveau = chronometrer(scraper._classer_immeuble, titres, args.repetitions)
+    print(f"Temps par titre ({len(titres)} titres) : ancien {t_ancien * 1e6:.2f} µs, "
+          f"nouveau {t_nouveau * 1e6:.2f} µs (type et nombre de logements)")
+    if erreurs:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Serveur local qui rejoue le corpus de pages (benchmarks/pages) hors ligne.
+
+Il se comporte comme un mandataire HTTP (proxy) : la session du scraper lui
+envoie les URLs complètes (http://www.centris.ca/...), la détection de
+plateforme fonctionne donc comme en production, et chaque chemin est servi
+depuis le corpus, quel que soit le domaine :
+
+    /<nom>              benchmarks/pages/<nom>.html
+    /enorme?ko=5000     page Centris générée d'environ 5000 Ko
+    /lent/<nom>?ms=200  comme /<nom>, après un délai
+    /erreur             réponse 500
+    /robots.txt         tout est permis
+
+Les réponses portent un ETag (GET conditionnels → 304).
+
+Usage :
+    python benchmarks/serveur_local.py [--port 8765]
+
+puis, côté client : obtenir_session().proxies = {"http": "http://127.0.0.1:8765"}.
+"""
+
+import argparse
+import hashlib
+import http.server
+import sys
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+PAGES = Path(__file__).resolve().parent / "pages"
+ROBOTS = b"User-agent: *\nAllow: /\n"
+
+
+@lru_cache(maxsize=8)
+def page_enorme(kilo_octets: int) -> bytes:
+    """Page d'annonce Centris gonflée de fiches d'annonces similaires."""
+    entete = (
+        '<!DOCTYPE html><html lang="fr"><head><meta charset="utf-8">'
+        "<title>Immeuble à revenus à vendre - Montréal | Centris.ca</title>"
+        '<meta property="og:price:amount" content="3450000"></head><body>'
+        '<h2 class="address">4000, rue Sherbrooke Est, Montréal</h2>'
+        '<span class="price">3 450 000 $</span><section class="similar">'
+    )
+    fiches = []
+    taille = len(entete)
+    i = 0
+    while taille < kilo_octets * 1024:
+        fiche = (
+            f'<article class="card"><div class="card-body"><span class="price">{400_000 + i * 1000} $</span>'
+            f'<p class="card-address">{i}, rue Exemple, Montréal</p><ul><li>{2 + i % 5} logements</li></ul></div></article>'
+        )
+        fiches.append(fiche)
+        taille += len(fiche)
+        i += 1
+    return (entete + "".join(fiches) + "</section></body></html>").encode("utf-8")
+
+
+class GestionnaireCorpus(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # En-têtes et corps partent ensemble : sans cela, Nagle + ACK différé
+    # ajoutent ~40 ms par réponse et masquent le coût du scraper.
+    disable_nagle_algorithm = True
+    wbufsize = -1
+
+    def do_GET(self):
+        morceaux = urlparse(self.path)  # URL absolue (mandataire) ou simple chemin
+        requete = parse_qs(morceaux.query)
+        chemin = morceaux.path
+
+        if chemin == "/robots.txt":
+            return self._repondre(200, ROBOTS, "text/plain")
+        if chemin == "/erreur":
+            return self._repondre(500, b"erreur interne", "text/plain")
+        if chemin == "/enorme":
+            return self._repondre(200, page_enorme(int(requete.get("ko", ["5000"])[0])))
+        if chemin.startswith("/lent/"):
+            time.sleep(int(requete.get("ms", ["200"])[0]) / 1000)
+            chemin = chemin[len("/lent"):]
+
+        fichier = (PAGES / f"{chemin.strip('/')}.html").resolve()
+        if fichier.parent != PAGES or not fichier.is_file():
+            return self._repondre(404, b"introuvable", "text/plain")
+        self._repondre(200, fichier.read_bytes())
+
+    def _repondre(self, code: int, corps: bytes, type_contenu: str = "text/html") -> None:
+        etag = '"' + hashlib.sha1(corps).hexdigest()[:16] + '"'
+        if code == 200 and self.headers.get("If-None-Match") == etag:
+            code, corps = 304, b""
+        self.send_response(code)
+        self.send_header("Content-Type", f"{type_contenu}; charset=utf-8")
+        self.send_header("Content-Length", str(len(corps)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def log_message(self, *args):
+        pass
+
+
+class ServeurCorpus(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Un client qui coupe la connexion (lecture plafonnée, arrêt anticipé) est normal
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def demarrer(port: int = 0) -> ServeurCorpus:
+    """Démarre le serveur dans un thread ; l'adresse est dans ``server_address``."""
+    serveur = ServeurCorpus(("127.0.0.1", port), GestionnaireCorpus)
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    return serveur
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8765, help="0 = port libre choisi par le système")
+    args = parser.parse_args()
+    serveur = ServeurCorpus(("127.0.0.1", args.port), GestionnaireCorpus)
+    # Première ligne lue par bench_scraper.py pour connaître le port
+    print(f"http://127.0.0.1:{serveur.server_address[1]}", flush=True)
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+Cache disque des pages HTML téléchargées (annonces immobilières).
+
+Stockage SQLite :
+- ``blobs`` : contenu HTML compressé (zlib), adressé par son empreinte
+  SHA-256 — deux URLs servant la même page partagent un seul blob ;
+- ``reponses`` : une ligne par URL avec l'empreinte du contenu, les
+  validateurs HTTP (ETag, Last-Modified) et les horodatages utiles à la
+  fraîcheur (TTL) et à l'éviction LRU ;
+- ``extractions`` : champs déjà extraits d'un blob, par version
+  d'extracteur (voir scraper._extraire_avec_cache).
+
+Une entrée fraîche est servie sans réseau ; une entrée périmée est
+revalidée par GET conditionnel (If-None-Match / If-Modified-Since), et un
+304 ne transfère aucun corps de page.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# PARAMÈTRES
+# ═══════════════════════════════════════════════════════════════════════════
+
+DOSSIER_CACHE = Path(os.environ.get("APP_FINANCE_CACHE", Path.home() / ".cache" / "app_finance"))
+FICHIER_CACHE = DOSSIER_CACHE / "pages_http.sqlite"
+DUREE_FRAICHEUR = 6 * 3600          # secondes avant revalidation
+TAILLE_MAX = 200 * 1024 * 1024      # octets compressés avant éviction LRU
+NIVEAU_COMPRESSION = 6
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    empreinte   TEXT PRIMARY KEY,
+    contenu     BLOB NOT NULL,
+    taille      INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reponses (
+    url             TEXT PRIMARY KEY,
+    empreinte       TEXT NOT NULL REFERENCES blobs(empreinte),
+    etag            TEXT,
+    last_modified   TEXT,
+    stocke_le       REAL NOT NULL,
+    valide_le       REAL NOT NULL,
+    consulte_le     REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reponses_consulte_le ON reponses(consulte_le);
+CREATE INDEX IF NOT EXISTS reponses_empreinte ON reponses(empreinte);
+CREATE TABLE IF NOT EXISTS extractions (
+    empreinte   TEXT NOT NULL,
+    extracteur  TEXT NOT NULL,
+    version     TEXT NOT NULL,
+    champs      TEXT NOT NULL,
+    PRIMARY KEY (empreinte, version)
+);
+"""
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# CACHE
+# ═══════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class EntreeCache:
+    """Page en cache pour une URL."""
+    url: str
+    texte: str
+    empreinte: str
+    etag: str | None
+    last_modified: str | None
+    valide_le: float
+
+    def est_fraiche(self, duree_fraicheur: float, maintenant: float | None = None) -> bool:
+        """Vrai si la page a été validée il y a moins de ``duree_fraicheur`` s."""
+        return (maintenant or time.time()) - self.valide_le < duree_fraicheur
+
+    def entetes_conditionnels(self) -> dict:
+        """En-têtes du GET conditionnel de revalidation."""
+        entetes = {}
+        if self.etag:
+            entetes["If-None-Match"] = self.etag
+        if self.last_modified:
+            entetes["If-Modified-Since"] = self.last_modified
+        return entetes
+
+
+class CacheHTTP:
+    """
+    Cache HTML sur disque, utilisable depuis plusieurs threads.
+
+    Une seule connexion SQLite est partagée (WAL) et protégée par un verrou :
+    les écritures sont brèves comparées au temps réseau.
+    """
+
+    def __init__(
+        self,
+        chemin: str | Path = FICHIER_CACHE,
+        duree_fraicheur: float = DUREE_FRAICHEUR,
+        taille_max: int = TAILLE_MAX,
+    ):
+        self.chemin = Path(chemin)
+        self.duree_fraicheur = duree_fraicheur
+        self.taille_max = taille_max
+        self.chemin.parent.mkdir(parents=True, exist_ok=True)
+        self._verrou = threading.Lock()
+        self._connexion = sqlite3.connect(self.chemin, check_same_thread=False, isolation_level=None)
+        self._connexion.execute("PRAGMA journal_mode=WAL")
+        self._connexion.execute("PRAGMA synchronous=NORMAL")
+        self._connexion.executescript(_SCHEMA)
+        self._succes = self._revalidations = self._echecs = 0
+        self._versions_vues: set[tuple[str, str]] = set()
+
+    # ── Lecture ──────────────────────────────────────────────────────────────
+
+    def lire(self, url: str) -> EntreeCache | None:
+        """Entrée de ``url`` (fraîche ou non), ou None si absente."""
+        with self._verrou:
+            ligne = self._connexion.execute(
+                "SELECT r.empreinte, r.etag, r.last_modified, r.valide_le, b.contenu "
+                "FROM reponses r JOIN blobs b USING (empreinte) WHERE r.url = ?",
+                (url,),
+            ).fetchone()
+            if ligne is None:
+                self._echecs += 1
+                return None
+            self._connexion.execute("UPDATE reponses SET consulte_le = ? WHERE url = ?", (time.time(), url))
+        empreinte, etag, last_modified, valide_le, contenu = ligne
+        return EntreeCache(url, zlib.decompress(contenu).decode("utf-8"), empreinte, etag, last_modified, valide_le)
+
+    # ── Écriture ─────────────────────────────────────────────────────────────
+
+    def enregistrer(
+        self,
+        url: str,
+        texte: str,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> str:
+        """Stocke (ou remplace) la page de ``url`` ; retourne son empreinte."""
+        donnees = texte.encode("utf-8")
+        empreinte = hashlib.sha256(donnees).hexdigest()
+        maintenant = time.time()
+        with self._verrou:
+            connu = self._connexion.execute("SELECT 1 FROM blobs WHERE empreinte = ?", (empreinte,)).fetchone()
+            precedente = self._connexion.execute("SELECT empreinte FROM reponses WHERE url = ?", (url,)).fetchone()
+            self._connexion.execute("BEGIN")
+            try:
+                if connu is None:
+                    compresse = zlib.compress(donnees, NIVEAU_COMPRESSION)
+                    self._connexion.execute(
+                        "INSERT INTO blobs (empreinte, contenu, taille) VALUES (?, ?, ?)",
+                        (empreinte, compresse, len(compresse)),
+                    )
+                self._connexion.execute(
+                    "INSERT OR REPLACE INTO reponses "
+                    "(url, empreinte, etag, last_modified, stocke_le, valide_le, consulte_le) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (url, empreinte, etag, last_modified, maintenant, maintenant, maintenant),
+                )
+                if precedente is not None and precedente[0] != empreinte:
+                    self._supprimer_orphelins([precedente[0]])
+                self._connexion.execute("COMMIT")
+            except BaseException:
+                self._connexion.execute("ROLLBACK")
+                raise
+            if connu is None:
+                self._evincer()
+        return empreinte
+
+    def marquer_valide(self, url: str, etag: str | None = None, last_modified: str | None = None) -> None:
+        """Enregistre une revalidation réussie (réponse 304) : l'entrée redevient fraîche."""
+        with self._verrou:
+            self._connexion.execute(
+                "UPDATE reponses SET valide_le = ?, etag = COALESCE(?, etag), "
+                "last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (time.time(), etag, last_modified, url),
+            )
+            self._revalidations += 1
+
+    def compter_succes(self) -> None:
+        """Compte une page servie depuis le cache sans réseau."""
+        with self._verrou:
+            self._succes += 1
+
+    # ── Résultats d'extraction ───────────────────────────────────────────────
+
+    def lire_extraction(self, empreinte: str, version: str) -> dict | None:
+        """Champs extraits d'un HTML d'empreinte donnée par une version d'extracteur."""
+        with self._verrou:
+            ligne = self._connexion.execute(
+                "SELECT champs FROM extractions WHERE empreinte = ? AND version = ?", (empreinte, version)
+            ).fetchone()
+        return None if ligne is None else json.loads(ligne[0])
+
+    def enregistrer_extraction(self, empreinte: str, extracteur: str, version: str, champs: dict) -> None:
+        """
+        Stocke le résultat d'une extraction.
+
+        Au premier enregistrement d'une version, les résultats des autres
+        versions du même extracteur ne servent plus : ils sont purgés.
+        """
+        with self._verrou:
+            if (extracteur, version) not in self._versions_vues:
+                self._versions_vues.add((extracteur, version))
+                self._connexion.execute(
+                    "DELETE FROM extractions WHERE extracteur = ? AND version != ?", (extracteur, version)
+                )
+            self._connexion.execute(
+                "INSERT OR REPLACE INTO extractions (empreinte, extracteur, version, champs) VALUES (?, ?, ?, ?)",
+                (empreinte, extracteur, version, json.dumps(champs, ensure_ascii=False)),
+            )
+
+    # ── Éviction ─────────────────────────────────────────────────────────────
+
+    def _supprimer_orphelins(self, empreintes: list[str]) -> None:
+        # Un blob n'est supprimé que si plus aucune URL ne le référence
+        self._connexion.executemany(
+            "DELETE FROM blobs WHERE empreinte = ? "
+            "AND NOT EXISTS (SELECT 1 FROM reponses WHERE empreinte = blobs.empreinte)",
+            [(e,) for e in empreintes],
+        )
+        self._connexion.executemany(
+            "DELETE FROM extractions WHERE empreinte = ? "
+            "AND NOT EXISTS (SELECT 1 FROM blobs WHERE empreinte = extractions.empreinte)",
+            [(e,) for e in empreintes],
+        )
+
+    def _taille_totale(self) -> int:
+        return self._connexion.execute("SELECT COALESCE(SUM(taille), 0) FROM blobs").fetchone()[0]
+
+    def _evincer(self) -> None:
+        # Retire les URLs les moins récemment consultées jusqu'à repasser sous la limite.
+        # Un blob partagé par plusieurs URLs ne libère sa taille qu'avec sa dernière référence.
+        excedent = self._taille_totale() - self.taille_max
+        if excedent <= 0:
+            return
+        self._connexion.execute("BEGIN")
+        try:
+            retirees, references = [], {}
+            curseur = self._connexion.execute(
+                "SELECT r.url, r.empreinte, b.taille, "
+                "(SELECT COUNT(*) FROM reponses p WHERE p.empreinte = r.empreinte) "
+                "FROM reponses r JOIN blobs b USING (empreinte) ORDER BY r.consulte_le"
+            )
+            for url, empreinte, taille, nb_references in curseur:
+                retirees.append((url, empreinte))
+                references[empreinte] = references.get(empreinte, nb_references) - 1
+                if references[empreinte] == 0:
+                    excedent -= taille
+                    if excedent <= 0:
+                        break
+            curseur.close()
+            self._connexion.executemany("DELETE FROM reponses WHERE url = ?", [(url,) for url, _ in retirees])
+            self._supprimer_orphelins(list(references))
+            self._connexion.execute("COMMIT")
+        except BaseException:
+            self._connexion.execute("ROLLBACK")
+            raise
+
+    def vider(self) -> None:
+        """Supprime toutes les entrées."""
+        with self._verrou:
+            self._connexion.execute("DELETE FROM reponses")
+            self._connexion.execute("DELETE FROM blobs")
+            self._connexion.execute("DELETE FROM extractions")
+            self._connexion.execute("VACUUM")
+
+    # ── Suivi ────────────────────────────────────────────────────────────────
+
+    def statistiques(self) -> dict:
+        """Contenu du cache et compteurs depuis l'ouverture."""
+        with self._verrou:
+            nb_urls = self._connexion.execute("SELECT COUNT(*) FROM reponses").fetchone()[0]
+            nb_blobs = self._connexion.execute("SELECT COUNT(*) FROM blobs").fetchone()[0]
+            return {
+                "urls": nb_urls,
+                "blobs": nb_blobs,
+                "octets": self._taille_totale(),
+                "succes": self._succes,
+                "revalidations": self._revalidations,
+                "echecs": self._echecs,
+            }
+
+    def fermer(self) -> None:
+        with self._verrou:
+            self._connexion.close()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# CACHE PARTAGÉ DU MODULE
+# ═══════════════════════════════════════════════════════════════════════════
+
+_cache: CacheHTTP | None = None
+_cache_desactive = False
+_verrou_cache = threading.Lock()
+
+
+def configurer_cache(
+    chemin: str | Path | None = FICHIER_CACHE,
+    duree_fraicheur: float = DUREE_FRAICHEUR,
+    taille_max: int = TAILLE_MAX,
+) -> CacheHTTP | None:
+    """
+    (Re)crée le cache partagé. ``chemin=None`` désactive le cache.
+    """
+    global _cache, _cache_desactive
+    nouveau = None if chemin is None else CacheHTTP(chemin, duree_fraicheur, taille_max)
+    with _verrou_cache:
+        ancien, _cache = _cache, nouveau
+        _cache_desactive = nouveau is None
+    if ancien is not None:
+        ancien.fermer()
+    return nouveau
+
+
+def obtenir_cache() -> CacheHTTP | None:
+    """
+    Retourne le cache partagé, créé au premier appel.
+
+    Si le dossier de cache n'est pas accessible en écriture, le cache est
+    désactivé (les pages sont alors toujours téléchargées).
+    """
+    global _cache, _cache_desactive
+    if _cache is None and not _cache_desactive:
+        with _verrou_cache:
+            if _cache is None and not _cache_desactive:
+                try:
+                    _cache = CacheHTTP()
+                except (OSError, sqlite3.Error):
+                    _cache_desactive = True
+    return _cache
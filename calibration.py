@@ -0,0 +1,327 @@
+"""
+Calibration des poids du score de localisation sur des données historiques.
+
+Le jeu de données (CSV, une ligne par secteur et par période) décrit
+chaque secteur soit par les options de CRITERES (une colonne par critère,
+comme les réponses de l'application), soit par les indicateurs de
+donnees/secteurs.csv (voir secteurs.CLASSEMENT_CRITERES), et contient la
+cible observée ensuite : inoccupation, croissance réalisée des loyers,
+indicateur 0/1 de logement vacant, etc.
+
+Les scores par critère (1 à 10) sont régressés sur la cible, une réponse
+absente prenant la moyenne des scores répondus du critère (le score global
+l'écarte plutôt que de la compter neutre) :
+
+- moindres carrés (régularisés) pour une cible continue, résolus par les
+  équations normales : une seule passe X'X sur les données ;
+- régression logistique (IRLS, moindres carrés repondérés) pour une cible
+  0/1 ou seuillée avec --seuil : chaque itération est une passe matricielle.
+
+Le score global étant une moyenne pondérée des scores par critère, les
+poids retenus sont les coefficients orientés dans le sens favorable de la
+cible, ramenés à la somme des poids actuels. Le profil versionné écrit dans
+donnees/profils/ se relit avec location.charger_profil. Un million de
+lignes se calibrent en quelques secondes, lecture du CSV comprise (voir
+benchmarks/bench_calibration.py).
+
+Usage :
+    python calibration.py historique.csv --cible inoccupation_pct
+                          [--favorable hausse|baisse] [--modele auto|moindres_carres|logistique]
+                          [--seuil 3.0] [--regularisation 0.001] [--sortie profil.json]
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from location import (
+    CODE_ABSENT,
+    CODE_INCONNU,
+    CRITERES,
+    DOSSIER_PROFILS,
+    FORMAT_PROFIL,
+    IDS_CRITERES,
+    calculer_score_localisation_batch,
+    scores_criteres,
+    vecteur_poids,
+)
+from secteurs import CLASSEMENT_CRITERES, coder_indicateurs
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# PARAMÈTRES
+# ═══════════════════════════════════════════════════════════════════════════
+
+# Sens favorable des cibles usuelles (une valeur plus élevée est-elle meilleure ?)
+CIBLES_CONNUES = {
+    "inoccupation_pct": "baisse",
+    "vacant": "baisse",
+    "croissance_loyers_pct": "hausse",
+}
+
+MODELES = ("auto", "moindres_carres", "logistique")
+REGULARISATION = 1e-3       # pénalité ridge sur les coefficients standardisés
+POIDS_MIN = 0.1             # aucun critère répondu n'est ignoré tout à fait
+ITERATIONS_MAX = 50
+TOLERANCE = 1e-8
+
+# Les poids calibrés gardent l'échelle des poids fixés à la main
+SOMME_POIDS = float(vecteur_poids().sum())
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# LECTURE DES DONNÉES
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _codes_options(table) -> np.ndarray:
+    """Codes (comme encoder_reponses) des colonnes d'options d'un DataFrame, par catégories pandas."""
+    import pandas as pd
+
+    codes = np.full((len(table), len(IDS_CRITERES)), CODE_ABSENT, dtype=np.int8)
+    for j, cid in enumerate(IDS_CRITERES):
+        if cid in table:
+            colonne = table[cid]
+            rangs = pd.Categorical(colonne, categories=list(CRITERES[cid]["options"])).codes.astype(np.int8)
+            # -1 : cellule vide (réponse absente) ou option inconnue
+            codes[:, j] = np.where((rangs < 0) & colonne.notna().to_numpy(), CODE_INCONNU, rangs)
+    return codes
+
+
+def lire_historique(chemin: str | Path, cible: str) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Codes d'options (N × len(CRITERES)) et valeurs de ``cible`` des lignes
+    du CSV où la cible est renseignée.
+    """
+    import pandas as pd
+
+    entete = pd.read_csv(chemin, nrows=0).columns
+    if cible not in entete:
+        raise ValueError(f"Colonne cible absente du jeu de données : {cible}")
+    indicateurs = sorted({colonne for colonne, _, _ in CLASSEMENT_CRITERES.values()})
+    if all(colonne in entete for colonne in indicateurs):
+        table = pd.read_csv(chemin, usecols=[*indicateurs, cible])
+        table = table[table[cible].notna()]
+        codes = coder_indicateurs({colonne: table[colonne].to_numpy(float) for colonne in indicateurs})
+    else:
+        colonnes = [cid for cid in IDS_CRITERES if cid in entete]
+        if not colonnes:
+            raise ValueError("Le jeu de données ne contient ni les critères de CRITERES ni les indicateurs de secteurs.")
+        table = pd.read_csv(chemin, usecols=[*colonnes, cible], dtype={cid: "category" for cid in colonnes})
+        table = table[table[cible].notna()]
+        codes = _codes_options(table)
+    return codes, table[cible].to_numpy(float)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# AJUSTEMENT
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _moments(x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Moyennes et écarts-types des colonnes (1 pour une colonne constante)."""
+    moyennes = x.mean(axis=0)
+    ecarts = x.std(axis=0)
+    return moyennes, np.where(ecarts > 0, ecarts, 1.0)
+
+
+def ajuster_moindres_carres(x: np.ndarray, y: np.ndarray, regularisation: float = REGULARISATION) -> tuple[np.ndarray, dict]:
+    """
+    Coefficients (par point de score) de la régression ridge de ``y`` sur
+    les colonnes de ``x``, par les équations normales sur données centrées
+    réduites. Retourne aussi le R².
+    """
+    n = len(y)
+    moyennes, ecarts = _moments(x)
+    covariance = (x.T @ x) / n - np.outer(moyennes, moyennes)
+    covariance_y = (x.T @ y) / n - moyennes * y.mean()
+    correlations = covariance / np.outer(ecarts, ecarts)
+    beta = np.linalg.solve(correlations + regularisation * np.eye(len(ecarts)), covariance_y / ecarts)
+    coefficients = beta / ecarts
+
+    residus = y - y.mean() - (x - moyennes) @ coefficients
+    r2 = 1.0 - float(residus @ residus) / float(((y - y.mean()) ** 2).sum())
+    return coefficients, {"r2": r2}
+
+
+def ajuster_logistique(
+    x: np.ndarray,
+    y: np.ndarray,
+    regularisation: float = REGULARISATION,
+    iterations_max: int = ITERATIONS_MAX,
+    tolerance: float = TOLERANCE,
+) -> tuple[np.ndarray, dict]:
+    """
+    Coefficients (log-cote par point de score) de la régression logistique
+    de ``y`` (0/1) sur les colonnes de ``x``, par IRLS (Newton-Raphson) sur
+    données centrées réduites, avec pénalité ridge hors constante.
+    Retourne aussi la log-vraisemblance moyenne et le nombre d'itérations.
+    """
+    n = len(y)
+    moyennes, ecarts = _moments(x)
+    z = np.empty((n, x.shape[1] + 1))
+    z[:, 0] = 1.0
+    np.divide(x - moyennes, ecarts, out=z[:, 1:])
+
+    penalite = np.full(z.shape[1], regularisation * n)
+    penalite[0] = 0.0
+    beta = np.zeros(z.shape[1])
+    beta[0] = np.log((y.mean() + 0.5 / n) / (1 - y.mean() + 0.5 / n))
+    for iteration in range(1, iterations_max + 1):
+        p = 0.5 * (1.0 + np.tanh(0.5 * (z @ beta)))  # sigmoïde stable
+        hessienne = (z * (p * (1 - p))[:, None]).T @ z + np.diag(penalite)
+        gradient = z.T @ (y - p) - penalite * beta
+        pas = np.linalg.solve(hessienne, gradient)
+        beta += pas
+        if np.max(np.abs(pas)) < tolerance:
+            break
+
+    p = np.clip(0.5 * (1.0 + np.tanh(0.5 * (z @ beta))), 1e-12, 1 - 1e-12)
+    log_vraisemblance = float(np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)))
+    return beta[1:] / ecarts, {"log_vraisemblance": log_vraisemblance, "iterations": iteration}
+
+
+def poids_depuis_coefficients(coefficients: np.ndarray, favorable: str) -> np.ndarray:
+    """
+    Poids du score : coefficients orientés dans le sens favorable, les
+    contributions défavorables ramenées à POIDS_MIN, à la somme SOMME_POIDS.
+    """
+    contributions = np.maximum(coefficients if favorable == "hausse" else -coefficients, 0.0)
+    if contributions.sum() <= 0:
+        raise ValueError("Aucun critère n'améliore la cible dans le sens favorable : profil non calibrable.")
+    poids = np.maximum(contributions / contributions.sum() * SOMME_POIDS, POIDS_MIN)
+    return poids / poids.sum() * SOMME_POIDS
+
+
+def _correlation(codes: np.ndarray, y: np.ndarray, poids: dict | None, favorable: str) -> float:
+    """Corrélation du score global avec la cible, positive quand le score va dans le sens favorable."""
+    score = calculer_score_localisation_batch(codes, poids)["score_global"]
+    if score.std() == 0:
+        return 0.0
+    correlation = float(np.corrcoef(score, y)[0, 1])
+    return correlation if favorable == "hausse" else -correlation
+
+
+def _scores_imputes(codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Scores par critère, une réponse absente remplacée par la moyenne des
+    scores répondus du critère (5 si aucun ne l'est) : comme le score global,
+    qui l'écarte, elle ne tire pas le coefficient vers le score neutre.
+    Retourne aussi la part de réponses absentes par critère.
+    """
+    codes = np.asarray(codes)
+    x = scores_criteres(codes)
+    absentes = codes == CODE_ABSENT
+    nb_presentes = len(x) - absentes.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        moyennes = np.where(nb_presentes > 0, np.where(absentes, 0.0, x).sum(axis=0) / nb_presentes, 5.0)
+    np.copyto(x, moyennes, where=absentes)
+    return x, absentes.mean(axis=0)
+
+
+def calibrer(
+    codes: np.ndarray,
+    y: np.ndarray,
+    cible: str,
+    favorable: str | None = None,
+    modele: str = "auto",
+    seuil: float | None = None,
+    regularisation: float = REGULARISATION,
+) -> dict:
+    """
+    Profil de poids ajusté sur ``codes`` (voir encoder_reponses) et la cible
+    ``y``. ``modele`` « auto » choisit la régression logistique pour une
+    cible 0/1 ou seuillée (``seuil`` : y > seuil vaut 1).
+    """
+    favorable = favorable or CIBLES_CONNUES.get(cible)
+    if favorable not in ("hausse", "baisse"):
+        raise ValueError(f"Sens favorable inconnu pour {cible} : préciser « hausse » ou « baisse ».")
+    if modele not in MODELES:
+        raise ValueError(f"Modèle inconnu : choisir parmi {', '.join(MODELES)}")
+    y = np.asarray(y, dtype=float)
+    if seuil is not None:
+        y = (y > seuil).astype(float)
+    if len(y) < 2 or y.std() == 0:
+        raise ValueError("La cible est constante : rien à calibrer.")
+    if modele == "auto":
+        modele = "logistique" if np.isin(y, (0.0, 1.0)).all() else "moindres_carres"
+    elif modele == "logistique" and not np.isin(y, (0.0, 1.0)).all():
+        raise ValueError("La régression logistique demande une cible 0/1 (ou --seuil).")
+
+    x, taux_manquants = _scores_imputes(codes)
+    if modele == "logistique":
+        coefficients, qualite = ajuster_logistique(x, y, regularisation)
+    else:
+        coefficients, qualite = ajuster_moindres_carres(x, y, regularisation)
+    poids = dict(zip(IDS_CRITERES, np.round(poids_depuis_coefficients(coefficients, favorable), 3).tolist()))
+
+    qualite["correlation_actuelle"] = _correlation(codes, y, None, favorable)
+    qualite["correlation_calibree"] = _correlation(codes, y, poids, favorable)
+    maintenant = datetime.now()
+    return {
+        "format": FORMAT_PROFIL,
+        # À la microseconde : deux calibrations successives ne partagent pas de version
+        "version": maintenant.strftime("%Y%m%d-%H%M%S-%f"),
+        "cree_le": maintenant.isoformat(timespec="seconds"),
+        "cible": cible,
+        "favorable": favorable,
+        "seuil": seuil,
+        "modele": modele,
+        "regularisation": regularisation,
+        "n": len(y),
+        "valeurs_manquantes": "moyenne_par_critere",
+        "taux_manquants": dict(zip(IDS_CRITERES, np.round(taux_manquants, 4).tolist())),
+        "poids": poids,
+        "coefficients": dict(zip(IDS_CRITERES, coefficients.tolist())),
+        "qualite": qualite,
+    }
+
+
+def ecrire_profil(profil: dict, chemin: str | Path | None = None) -> Path:
+    """Écrit le profil (par défaut dans DOSSIER_PROFILS, nommé d'après la cible et la version)."""
+    chemin = Path(chemin) if chemin else DOSSIER_PROFILS / f"poids_{profil['cible']}_{profil['version']}.json"
+    chemin.parent.mkdir(parents=True, exist_ok=True)
+    temporaire = chemin.with_suffix(".tmp")
+    with open(temporaire, "w", encoding="utf-8") as sortie:
+        json.dump(profil, sortie, ensure_ascii=False, indent=2)
+    os.replace(temporaire, chemin)
+    return chemin
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("donnees", help="CSV historique (critères ou indicateurs, et la cible)")
+    parser.add_argument("--cible", required=True, help="colonne observée (ex. inoccupation_pct, croissance_loyers_pct)")
+    parser.add_argument("--favorable", choices=("hausse", "baisse"), help="sens favorable de la cible")
+    parser.add_argument("--modele", choices=MODELES, default="auto")
+    parser.add_argument("--seuil", type=float, help="cible binaire : 1 si la valeur dépasse ce seuil")
+    parser.add_argument("--regularisation", type=float, default=REGULARISATION)
+    parser.add_argument("--sortie", help="fichier du profil (défaut : donnees/profils/)")
+    args = parser.parse_args()
+
+    try:
+        debut = time.perf_counter()
+        codes, y = lire_historique(args.donnees, args.cible)
+        lecture = time.perf_counter() - debut
+        debut = time.perf_counter()
+        profil = calibrer(codes, y, args.cible, args.favorable, args.modele, args.seuil, args.regularisation)
+        ajustement = time.perf_counter() - debut
+    except ValueError as erreur:
+        parser.error(str(erreur))
+    profil["source"] = str(args.donnees)
+    chemin = ecrire_profil(profil, args.sortie)
+
+    print(f"{profil['n']:,} lignes lues en {lecture:.1f} s, {profil['modele']} ajusté en {ajustement:.2f} s")
+    for cid, poids in profil["poids"].items():
+        print(f"  {CRITERES[cid]['label']:<32} {CRITERES[cid]['poids']:5.2f} → {poids:5.2f}")
+    qualite = profil["qualite"]
+    print(f"Corrélation du score avec {args.cible} (sens favorable) : "
+          f"{qualite['correlation_actuelle']:.3f} → {qualite['correlation_calibree']:.3f}")
+    print(f"Profil écrit : {chemin}")
+
+
+if __name__ == "__main__":
+    main()
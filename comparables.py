@@ -0,0 +1,283 @@
+"""
+Comparables du marché : annonces voisines de même type, tirées de la base
+locale (voir annonces.MagasinAnnonces et crawler.py).
+
+Pour un immeuble (coordonnées, type, nombre de logements), on cherche les
+k annonces géocodées les plus proches et on résume leur prix par porte et
+leur loyer mensuel par logement (moyenne et percentiles), pour situer le
+prix d'achat et le loyer saisis dans l'application.
+
+L'index est une grille de seaux (type d'immeuble, cellule) rangés à la
+suite dans un seul tableau d'indices : une recherche ne lit que les seaux
+du type demandé, par anneaux de cellules autour du point, et s'arrête dès
+que l'anneau suivant ne peut plus contenir d'annonce plus proche que la
+k-ième trouvée. Sur un million d'annonces, une recherche prend moins
+d'une milliseconde (voir benchmarks/bench_comparables.py).
+"""
+
+import math
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from annonces import FICHIER_ANNONCES, MagasinAnnonces
+from secteurs import RAYON_TERRE_KM, cellules_anneau
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# PARAMÈTRES
+# ═══════════════════════════════════════════════════════════════════════════
+
+PAS_GRILLE = 0.01           # degrés par cellule (≈ 1 km de latitude)
+DISTANCE_MAX_KM = 10.0      # au-delà, une annonce n'est plus un comparable
+K_COMPARABLES = 15
+ECART_LOGEMENTS = 0.5       # écart relatif toléré sur le nombre de logements
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+# Code de type des seaux regroupant tous les types (type non précisé)
+_TOUS_TYPES = -1
+
+
+def distribution(valeurs: np.ndarray) -> dict | None:
+    """Effectif, moyenne et percentiles des valeurs connues (None s'il n'y en a aucune)."""
+    valeurs = valeurs[~np.isnan(valeurs)]
+    if not len(valeurs):
+        return None
+    centiles = np.percentile(valeurs, PERCENTILES)
+    return {"n": len(valeurs), "moyenne": float(valeurs.mean()),
+            **{f"p{p}": float(v) for p, v in zip(PERCENTILES, centiles)}}
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# INDEX
+# ═══════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class Comparable:
+    url: str
+    distance_km: float
+    type_immeuble: str | None
+    nb_logements: int | None
+    prix: float | None
+    prix_par_porte: float | None
+    loyer_par_logement: float | None  # $/mois
+
+
+@dataclass
+class Comparables:
+    """Comparables trouvés (du plus proche au plus éloigné) et leurs distributions."""
+
+    annonces: list[Comparable] = field(default_factory=list)
+    prix_par_porte: dict | None = None
+    loyer_par_logement: dict | None = None
+
+
+def _ou_none(valeur: float) -> float | None:
+    return None if math.isnan(valeur) else valeur
+
+
+class IndexComparables:
+    """Annonces géocodées rangées en seaux (type, cellule de grille)."""
+
+    def __init__(self, urls, latitudes, longitudes, types, nb_logements, prix, revenus_bruts,
+                 pas: float = PAS_GRILLE):
+        self.pas = pas
+        latitudes = np.asarray(latitudes, dtype=float)
+        longitudes = np.asarray(longitudes, dtype=float)
+        nb_logements = np.asarray(nb_logements, dtype=float)
+        prix = np.asarray(prix, dtype=float)
+        revenus_bruts = np.asarray(revenus_bruts, dtype=float)
+
+        # Seules les annonces qui renseignent un prix ou des revenus sont utiles
+        utiles = ~np.isnan(latitudes) & ~np.isnan(longitudes) & ~(np.isnan(prix) & np.isnan(revenus_bruts))
+        garder = np.flatnonzero(utiles)
+        self.urls = [urls[i] for i in garder.tolist()]
+        types = [types[i] for i in garder.tolist()]
+        self.latitudes = latitudes[garder]
+        self.longitudes = longitudes[garder]
+        self.nb_logements = nb_logements[garder]
+        self.prix = prix[garder]
+        portes = np.where(self.nb_logements > 0, self.nb_logements, np.nan)
+        self.prix_par_porte = self.prix / portes
+        self.loyer_par_logement = revenus_bruts[garder] / portes / 12
+
+        # Types connus codés 0..T-1 ; type absent : T (seulement dans les seaux « tous types »)
+        self.types = sorted({t for t in types if t})
+        self._codes_types = {t: i for i, t in enumerate(self.types)}
+        self.codes_types = np.fromiter((self._codes_types.get(t, len(self.types)) for t in types),
+                                       dtype=np.int16, count=len(types))
+
+        lignes = np.floor(self.latitudes / pas).astype(np.int64)
+        colonnes = np.floor(self.longitudes / pas).astype(np.int64)
+        # Deux rangements à la suite : par (type, cellule), puis par cellule seule
+        par_type = np.lexsort((colonnes, lignes, self.codes_types))
+        par_cellule = np.lexsort((colonnes, lignes))
+        self._ordre = np.concatenate([par_type, par_cellule]).astype(np.int32)
+        codes = np.concatenate([self.codes_types[par_type], np.full(len(par_cellule), _TOUS_TYPES, dtype=np.int16)])
+        lignes, colonnes = lignes[self._ordre], colonnes[self._ordre]
+
+        nouveau_seau = np.ones(len(codes), dtype=bool)
+        nouveau_seau[1:] = (codes[1:] != codes[:-1]) | (lignes[1:] != lignes[:-1]) | (colonnes[1:] != colonnes[:-1])
+        debuts = np.flatnonzero(nouveau_seau)
+        fins = np.append(debuts[1:], len(codes))
+        self._seaux = {
+            (code, ligne, colonne): (debut, fin)
+            for code, ligne, colonne, debut, fin in zip(codes[debuts].tolist(), lignes[debuts].tolist(),
+                                                        colonnes[debuts].tolist(), debuts.tolist(), fins.tolist())
+        }
+
+    @classmethod
+    def depuis_magasin(cls, magasin: MagasinAnnonces, pas: float = PAS_GRILLE) -> "IndexComparables":
+        lignes = magasin.annonces_localisees()
+        colonnes = list(zip(*lignes)) if lignes else [()] * 7
+        urls, latitudes, longitudes, types, nb_logements, prix, revenus_bruts = colonnes
+        return cls(urls, np.array(latitudes, dtype=float), np.array(longitudes, dtype=float), types,
+                   np.array(nb_logements, dtype=float), np.array(prix, dtype=float),
+                   np.array(revenus_bruts, dtype=float), pas=pas)
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    # ── Recherche ────────────────────────────────────────────────────────────
+
+    def plus_proches(
+        self,
+        latitude: float,
+        longitude: float,
+        type_immeuble: str | None = None,
+        nb_logements: int | None = None,
+        k: int = K_COMPARABLES,
+        distance_max: float = DISTANCE_MAX_KM,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Indices et distances (km) des ``k`` annonces les plus proches, du
+        type demandé (tous types si None) et dont le nombre de logements
+        s'écarte d'au plus ECART_LOGEMENTS de ``nb_logements`` (si fourni).
+        """
+        if type_immeuble is None:
+            code = _TOUS_TYPES
+        elif type_immeuble in self._codes_types:
+            code = self._codes_types[type_immeuble]
+        else:
+            return np.empty(0, dtype=np.int32), np.empty(0)
+
+        ligne, colonne = math.floor(latitude / self.pas), math.floor(longitude / self.pas)
+        # Côté le plus court d'une cellule (km) dans tout le rayon de recherche
+        latitude_max = min(abs(latitude) + distance_max / 110.0 + self.pas, 89.0)
+        km_par_cellule = math.radians(self.pas) * RAYON_TERRE_KM * math.cos(math.radians(latitude_max))
+        anneaux_max = math.ceil(distance_max / km_par_cellule) + 1
+
+        indices, distances = [], []
+        trouves, k_ieme = 0, distance_max
+        for anneau in range(anneaux_max + 1):
+            if trouves >= k and (anneau - 1) * km_par_cellule > k_ieme:
+                break
+            plages = [self._seaux.get((code, *cellule)) for cellule in cellules_anneau(ligne, colonne, anneau)]
+            morceaux = [self._ordre[plage[0]:plage[1]] for plage in plages if plage is not None]
+            if not morceaux:
+                continue
+            candidats = np.concatenate(morceaux)
+            d = self._distances_km(latitude, longitude, candidats)
+            retenus = d <= distance_max
+            if nb_logements:
+                retenus &= np.abs(self.nb_logements[candidats] - nb_logements) <= max(1.0, ECART_LOGEMENTS * nb_logements)
+            if retenus.any():
+                indices.append(candidats[retenus])
+                distances.append(d[retenus])
+                trouves += int(retenus.sum())
+                if trouves >= k:
+                    k_ieme = float(np.partition(np.concatenate(distances), k - 1)[k - 1])
+
+        if not indices:
+            return np.empty(0, dtype=np.int32), np.empty(0)
+        indices, distances = np.concatenate(indices), np.concatenate(distances)
+        ordre = np.argsort(distances, kind="stable")[:k]
+        return indices[ordre], distances[ordre]
+
+    def _distances_km(self, latitude: float, longitude: float, indices: np.ndarray) -> np.ndarray:
+        """Distances équirectangulaires du point aux annonces ``indices``."""
+        latitudes = self.latitudes[indices]
+        phi = np.radians((latitude + latitudes) / 2)
+        dx = np.radians(longitude - self.longitudes[indices]) * np.cos(phi)
+        dy = np.radians(latitude - latitudes)
+        return RAYON_TERRE_KM * np.hypot(dx, dy)
+
+    # ── Résultats ────────────────────────────────────────────────────────────
+
+    def comparables(
+        self,
+        latitude: float,
+        longitude: float,
+        type_immeuble: str | None = None,
+        nb_logements: int | None = None,
+        k: int = K_COMPARABLES,
+        distance_max: float = DISTANCE_MAX_KM,
+        exclure: str | None = None,
+    ) -> Comparables:
+        """
+        Comparables de l'immeuble et distributions de leur prix par porte et
+        de leur loyer par logement. ``exclure`` : URL de l'annonce analysée,
+        qui ne doit pas servir de comparable à elle-même.
+        """
+        indices, distances = self.plus_proches(latitude, longitude, type_immeuble, nb_logements,
+                                               k + (exclure is not None), distance_max)
+        if exclure is not None:
+            garder = np.array([self.urls[i] != exclure for i in indices.tolist()], dtype=bool)
+            indices, distances = indices[garder][:k], distances[garder][:k]
+
+        annonces = [
+            Comparable(
+                url=self.urls[i],
+                distance_km=distance,
+                type_immeuble=self.types[self.codes_types[i]] if self.codes_types[i] < len(self.types) else None,
+                nb_logements=None if math.isnan(self.nb_logements[i]) else int(self.nb_logements[i]),
+                prix=_ou_none(float(self.prix[i])),
+                prix_par_porte=_ou_none(float(self.prix_par_porte[i])),
+                loyer_par_logement=_ou_none(float(self.loyer_par_logement[i])),
+            )
+            for i, distance in zip(indices.tolist(), distances.tolist())
+        ]
+        return Comparables(
+            annonces=annonces,
+            prix_par_porte=distribution(self.prix_par_porte[indices]),
+            loyer_par_logement=distribution(self.loyer_par_logement[indices]),
+        )
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# INDEX PARTAGÉ DU MODULE
+# ═══════════════════════════════════════════════════════════════════════════
+
+_index: IndexComparables | None = None
+_version_index: tuple | None = None
+_verrou_index = threading.Lock()
+
+
+def _version_base(chemin: Path) -> tuple | None:
+    """Dates de modification de la base et de son journal WAL (None si la base est absente)."""
+    if not chemin.is_file():
+        return None
+    wal = chemin.with_name(chemin.name + "-wal")
+    return str(chemin.resolve()), chemin.stat().st_mtime_ns, wal.stat().st_mtime_ns if wal.is_file() else 0
+
+
+def obtenir_index_comparables(chemin: str | Path = FICHIER_ANNONCES) -> IndexComparables | None:
+    """
+    Index des annonces de la base ``chemin``, reconstruit quand la base a
+    changé depuis le dernier appel (None si la base est absente ou si
+    aucune annonce n'est géocodée).
+    """
+    global _index, _version_index
+    chemin = Path(chemin)
+    with _verrou_index:
+        version = _version_base(chemin)
+        if version is None:
+            return None
+        if version != _version_index:
+            with MagasinAnnonces(chemin) as magasin:
+                _index = IndexComparables.depuis_magasin(magasin)
+            _version_index = version
+        return _index if len(_index) else None
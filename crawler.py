@@ -0,0 +1,128 @@
+"""
+Suivi de marché : récupère une liste d'annonces et alimente la base locale.
+
+Seules les annonces absentes de la base ou plus vieilles que le TTL sont
+téléchargées ; les résultats sont enregistrés par lots transactionnels
+(voir annonces.MagasinAnnonces) au fil de l'extraction parallèle. Chaque
+adresse est géocodée hors ligne (voir geocodage.py) pour que l'annonce
+serve de comparable (voir comparables.py).
+
+Usage :
+    python crawler.py URL [URL ...] [--fichier urls.txt] [--base ~/.cache/app_finance/annonces.sqlite]
+                      [--ttl-heures 24] [--concurrence 8] [--par-domaine 4] [--lot 500]
+"""
+
+import argparse
+import sys
+import time
+from collections.abc import Iterable, Iterator
+
+from annonces import FICHIER_ANNONCES, MagasinAnnonces
+
+
+def lire_urls(urls: Iterable[str], fichiers: Iterable[str]) -> Iterator[str]:
+    """URLs passées en argument puis lues dans les fichiers (une par ligne, # = commentaire)."""
+    yield from urls
+    for fichier in fichiers:
+        flux = sys.stdin if fichier == "-" else open(fichier, encoding="utf-8")
+        with flux:
+            for ligne in flux:
+                ligne = ligne.strip()
+                if ligne and not ligne.startswith("#"):
+                    yield ligne
+
+
+def localiser(resultat: dict, geocodeur) -> dict:
+    """Ajoute latitude et longitude au résultat quand son adresse se géocode."""
+    if geocodeur is not None and resultat.get("adresse"):
+        localisation = geocodeur.geocoder(resultat["adresse"], resultat.get("ville"))
+        if localisation is not None:
+            resultat["latitude"] = localisation.latitude
+            resultat["longitude"] = localisation.longitude
+    return resultat
+
+
+def explorer(
+    urls: Iterable[str],
+    magasin: MagasinAnnonces,
+    ttl: float = 24 * 3600,
+    concurrence: int = 8,
+    par_domaine: int = 4,
+    taille_lot: int = 500,
+    rapporter=None,
+) -> dict:
+    """
+    Rafraîchit les annonces périmées parmi ``urls`` et retourne le bilan.
+
+    ``rapporter(bilan)`` est appelé après chaque lot enregistré. Une
+    extraction en échec compte parmi les « ignorees » ; si l'exploration est
+    interrompue, les résultats déjà reçus sont enregistrés avant de sortir.
+    """
+    from geocodage import obtenir_geocodeur
+    from scraper import extraire_donnees_batch
+
+    urls = list(dict.fromkeys(urls))
+    a_faire = magasin.urls_a_rafraichir(urls, ttl)
+    bilan = {"a_jour": len(urls) - len(a_faire), "a_rafraichir": len(a_faire),
+             "nouvelles": 0, "modifiees": 0, "inchangees": 0, "ignorees": 0}
+
+    geocodeur = obtenir_geocodeur()
+    lot = []
+
+    def enregistrer() -> None:
+        for cle, valeur in magasin.enregistrer_lot(lot).items():
+            bilan[cle] += valeur
+        lot.clear()
+        if rapporter is not None:
+            rapporter(bilan)
+
+    try:
+        for resultat in extraire_donnees_batch(a_faire, concurrence=concurrence, par_domaine=par_domaine):
+            try:
+                resultat = localiser(resultat, geocodeur)
+            except Exception:
+                pass  # l'annonce est gardée, sans coordonnées
+            lot.append(resultat)
+            if len(lot) >= taille_lot:
+                enregistrer()
+    finally:
+        if lot:
+            enregistrer()
+    return bilan
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("urls", nargs="*", help="URLs d'annonces à suivre")
+    parser.add_argument("--fichier", action="append", default=[], help="fichier d'URLs (une par ligne, - = entrée standard)")
+    parser.add_argument("--base", default=str(FICHIER_ANNONCES), help="base SQLite des annonces")
+    parser.add_argument("--ttl-heures", type=float, default=24.0, help="âge au-delà duquel une annonce est re-téléchargée")
+    parser.add_argument("--concurrence", type=int, default=8)
+    parser.add_argument("--par-domaine", type=int, default=4)
+    parser.add_argument("--lot", type=int, default=500, help="annonces par transaction")
+    args = parser.parse_args()
+
+    urls = list(dict.fromkeys(lire_urls(args.urls, args.fichier)))
+    if not urls:
+        parser.error("aucune URL fournie")
+
+    debut = time.perf_counter()
+
+    def rapporter(bilan: dict) -> None:
+        traitees = bilan["nouvelles"] + bilan["modifiees"] + bilan["inchangees"] + bilan["ignorees"]
+        print(f"  {traitees}/{bilan['a_rafraichir']} annonces ({time.perf_counter() - debut:.0f} s)", flush=True)
+
+    with MagasinAnnonces(args.base) as magasin:
+        bilan = explorer(urls, magasin, ttl=args.ttl_heures * 3600, concurrence=args.concurrence,
+                         par_domaine=args.par_domaine, taille_lot=args.lot, rapporter=rapporter)
+        stats = magasin.statistiques()
+
+    print(f"{len(urls)} URLs : {bilan['a_jour']} à jour, {bilan['a_rafraichir']} récupérées en "
+          f"{time.perf_counter() - debut:.1f} s")
+    print(f"  nouvelles {bilan['nouvelles']}, modifiées {bilan['modifiees']}, "
+          f"inchangées {bilan['inchangees']}, échecs {bilan['ignorees']}")
+    print(f"Base : {stats['annonces']} annonces, {stats['changements_prix']} changements de prix")
+
+
+if __name__ == "__main__":
+    main()
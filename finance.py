@@ -5,15 +5,6 @@ Inclut : droits de mutation, analyse année 1, projection 10 ans, indicateurs.
 
 import numpy as np
 
-# ---------------------------------------------------------------------------
-# Tentative d'import de numpy_financial (optionnel)
-# ---------------------------------------------------------------------------
-try:
-    import numpy_financial as npf
-    _HAS_NPF = True
-except ImportError:
-    _HAS_NPF = False
-
 
 # ═══════════════════════════════════════════════════════════════════════════
 # 1. DROITS DE MUTATION (TAXE DE BIENVENUE) — QUÉBEC 2026
@@ -67,6 +58,84 @@ def calculer_droits_mutation(prix: float, bareme: str = "Québec (général)") -
     return round(taxe, 2)
 
 
+def _arrondir_cents(valeurs) -> np.ndarray:
+    """
+    Arrondit un tableau au cent, exactement comme ``round(x, 2)``.
+
+    ``np.round`` multiplie par 100 avant d'arrondir, ce qui déplace les
+    demi-cents (fréquents : prix entiers × 0.005) d'un côté ou de l'autre.
+    On récupère ici l'erreur exacte du produit (TwoProduct de Dekker) pour
+    trancher les égalités comme le fait Python sur la valeur binaire exacte.
+    """
+    x = np.asarray(valeurs, dtype=float)
+    y = np.asarray(x * 100.0)
+    n = np.array(np.rint(y))
+    egalites = np.abs(y - n) == 0.5
+    if np.any(egalites):
+        xe = x[egalites]
+        c = 134_217_729.0 * xe  # 2**27 + 1 : découpage de Dekker
+        x_haut = c - (c - xe)
+        x_bas = xe - x_haut
+        ye = y[egalites]
+        erreur = (x_haut * 100.0 - ye) + x_bas * 100.0
+        ecart = ye - n[egalites]
+        n[egalites] += ((ecart == 0.5) & (erreur > 0)).astype(float) - ((ecart == -0.5) & (erreur < 0))
+    return n / 100.0
+
+
+def _table_cumulative(tranches: list[tuple[float, float]]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Prépare un barème pour le calcul vectorisé.
+
+    Retourne (seuils inférieurs, taux, taxe cumulée au seuil inférieur).
+    La taxe cumulée est accumulée tranche par tranche dans le même ordre que
+    ``calculer_droits_mutation`` afin d'obtenir des résultats identiques.
+    """
+    bornes, taux, cumuls = [], [], []
+    taxe = 0.0
+    seuil_precedent = 0.0
+    for seuil, t in tranches:
+        bornes.append(seuil_precedent)
+        taux.append(t)
+        cumuls.append(taxe)
+        taxe += (seuil - seuil_precedent) * t
+        seuil_precedent = seuil
+    return np.array(bornes), np.array(taux), np.array(cumuls)
+
+
+_TABLES_MUTATION = {nom: _table_cumulative(tranches) for nom, tranches in BAREMES.items()}
+
+
+def calculer_droits_mutation_batch(prix, baremes="Québec (général)") -> np.ndarray:
+    """
+    Version vectorisée de ``calculer_droits_mutation`` pour un lot de prix.
+
+    Args:
+        prix: tableau de prix (ou scalaire).
+        baremes: nom de barème unique, ou tableau de noms de même longueur
+            que ``prix``. Un nom inconnu retombe sur le barème général,
+            comme pour la version scalaire.
+
+    Returns:
+        Tableau des droits de mutation, arrondis au cent.
+    """
+    prix = np.asarray(prix, dtype=float)
+    noms = np.broadcast_to(np.asarray(baremes, dtype=object), prix.shape)
+    taxes = np.zeros(prix.shape)
+
+    for nom in set(noms.ravel().tolist()):
+        masque = noms == nom
+        bornes, taux, cumuls = _TABLES_MUTATION.get(nom, _TABLES_MUTATION["Québec (général)"])
+        p = prix[masque]
+        # Tranche dans laquelle tombe chaque prix (bornes inférieures exclusives)
+        k = np.searchsorted(bornes, p, side="left") - 1
+        dans_bareme = k >= 0
+        k = np.maximum(k, 0)
+        taxes[masque] = np.where(dans_bareme, cumuls[k] + (p - bornes[k]) * taux[k], 0.0)
+
+    return _arrondir_cents(taxes)
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # 2. COÛTS INITIAUX NON RÉCURRENTS
 # ═══════════════════════════════════════════════════════════════════════════
@@ -120,6 +189,76 @@ def calculer_paiement_hypothecaire(
     return round(paiement, 2)
 
 
+def calculer_paiement_hypothecaire_batch(
+    montant,
+    taux_annuel,
+    amortissement_annees=25,
+) -> np.ndarray:
+    """Version vectorisée de ``calculer_paiement_hypothecaire`` (arrondie au cent)."""
+    montant, taux_annuel, amortissement_annees = np.broadcast_arrays(
+        np.asarray(montant, dtype=float),
+        np.asarray(taux_annuel, dtype=float),
+        np.asarray(amortissement_annees, dtype=float),
+    )
+    actif = (montant > 0) & (taux_annuel > 0)
+    taux_mensuel = np.where(actif, taux_annuel, 1.0) / 100 / 12
+    facteur = (1 + taux_mensuel) ** (amortissement_annees * 12)
+    paiement = montant * (taux_mensuel * facteur) / (facteur - 1)
+    return np.where(actif, _arrondir_cents(paiement), 0.0)
+
+
+def tableau_amortissement_batch(
+    montant,
+    taux_annuel,
+    amortissement_annees=25,
+    annees: int = 10,
+) -> dict[str, np.ndarray]:
+    """
+    Tableau d'amortissement annuel pour un lot de prêts, en colonnes.
+
+    Le solde après m paiements est obtenu par la formule fermée de l'annuité
+    (B_m = P(1+r)^m - A((1+r)^m - 1)/r) évaluée sur un index d'années, au lieu
+    d'itérer mois par mois.
+
+    Args:
+        montant, taux_annuel, amortissement_annees: scalaires ou tableaux
+            diffusables (broadcast) entre eux, un élément par prêt.
+        annees: nombre d'années du tableau.
+
+    Returns:
+        dict {colonne: tableau de forme (annees, *forme des prêts)} avec les
+        mêmes colonnes que ``tableau_amortissement``, arrondies au cent.
+    """
+    montant, taux_annuel, amortissement_annees = np.broadcast_arrays(
+        np.asarray(montant, dtype=float),
+        np.asarray(taux_annuel, dtype=float),
+        np.asarray(amortissement_annees, dtype=float),
+    )
+    paiement = calculer_paiement_hypothecaire_batch(montant, taux_annuel, amortissement_annees)
+    taux_mensuel = taux_annuel / 100 / 12
+
+    # Nombre de paiements effectués à la fin de chaque année (0 = départ)
+    mois = (12 * np.arange(annees + 1, dtype=float)).reshape((-1,) + (1,) * montant.ndim)
+    croissance = (1 + taux_mensuel) ** mois
+    sans_interet = taux_mensuel == 0
+    diviseur = np.where(sans_interet, 1.0, taux_mensuel)
+    soldes = np.where(
+        sans_interet,
+        montant - paiement * mois,
+        montant * croissance - paiement * (croissance - 1) / diviseur,
+    )
+
+    capital = soldes[:-1] - soldes[1:]
+    paiement_annuel = np.broadcast_to(_arrondir_cents(paiement * 12), capital.shape)
+    return {
+        "Année": np.arange(1, annees + 1),
+        "Paiement annuel": paiement_annuel,
+        "Intérêts": _arrondir_cents(paiement * 12 - capital),
+        "Capital remboursé": _arrondir_cents(capital),
+        "Solde restant": _arrondir_cents(np.maximum(soldes[1:], 0)),
+    }
+
+
 def tableau_amortissement(
     montant: float,
     taux_annuel: float,
@@ -127,29 +266,17 @@ def tableau_amortissement(
     annees: int = 10,
 ) -> list[dict]:
     """Génère un tableau d'amortissement annuel sur N années."""
-    taux_mensuel = taux_annuel / 100 / 12
-    paiement_mensuel = calculer_paiement_hypothecaire(
-        montant, taux_annuel, amortissement_annees
-    )
-    solde = montant
-    tableau = []
-    for annee in range(1, annees + 1):
-        interet_annuel = 0.0
-        capital_annuel = 0.0
-        for _ in range(12):
-            interet = solde * taux_mensuel
-            capital = paiement_mensuel - interet
-            interet_annuel += interet
-            capital_annuel += capital
-            solde -= capital
-        tableau.append({
-            "Année": annee,
-            "Paiement annuel": round(paiement_mensuel * 12, 2),
-            "Intérêts": round(interet_annuel, 2),
-            "Capital remboursé": round(capital_annuel, 2),
-            "Solde restant": round(max(solde, 0), 2),
-        })
-    return tableau
+    colonnes = tableau_amortissement_batch(montant, taux_annuel, amortissement_annees, annees)
+    return [
+        {
+            "Année": int(colonnes["Année"][i]),
+            "Paiement annuel": float(colonnes["Paiement annuel"][i]),
+            "Intérêts": float(colonnes["Intérêts"][i]),
+            "Capital remboursé": float(colonnes["Capital remboursé"][i]),
+            "Solde restant": float(colonnes["Solde restant"][i]),
+        }
+        for i in range(annees)
+    ]
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -229,10 +356,167 @@ def analyse_annee_1(
     }
 
 
+def analyse_annee_1_batch(
+    prix,
+    revenus_bruts_annuels,
+    depenses_fixes=0.0,
+    gestion_pct=0.0,
+    taux_inoccupation=5.0,
+    mise_de_fonds_pct=20.0,
+    taux_interet=5.0,
+    amortissement=25,
+    frais_initiaux=0.0,
+    bareme_mutation="Québec (général)",
+) -> dict[str, np.ndarray]:
+    """
+    Version vectorisée des principaux résultats de ``analyse_annee_1``.
+
+    Les dépenses hors gestion sont regroupées dans ``depenses_fixes`` et la
+    mise de fonds totale est reconstituée comme dans ``calculer_couts_initiaux``
+    (mise de fonds + droits de mutation + ``frais_initiaux``).
+    """
+    prix = np.asarray(prix, dtype=float)
+    revenus_bruts_annuels = np.asarray(revenus_bruts_annuels, dtype=float)
+    mise_de_fonds_pct = np.asarray(mise_de_fonds_pct, dtype=float)
+
+    revenus_nets = revenus_bruts_annuels - revenus_bruts_annuels * (np.asarray(taux_inoccupation) / 100)
+    depenses = depenses_fixes + revenus_nets * (np.asarray(gestion_pct) / 100)
+    noi = revenus_nets - depenses
+    hypotheque = prix * (1 - mise_de_fonds_pct / 100)
+    service_dette = calculer_paiement_hypothecaire_batch(hypotheque, taux_interet, amortissement) * 12
+    cashflow = noi - service_dette
+    mise_de_fonds_totale = (
+        prix * (mise_de_fonds_pct / 100)
+        + calculer_droits_mutation_batch(prix, bareme_mutation)
+        + frais_initiaux
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        csd = np.where(service_dette > 0, revenus_nets / service_dette, 0.0)
+        cash_on_cash = np.where(mise_de_fonds_totale > 0, cashflow / mise_de_fonds_totale * 100, 0.0)
+
+    return {
+        "Revenus nets": revenus_nets,
+        "Dépenses d'exploitation": depenses,
+        "NOI": noi,
+        "Service de dette": service_dette,
+        "Cashflow": cashflow,
+        "CSD": csd,
+        "Cash-on-Cash (%)": cash_on_cash,
+        "Mise de fonds totale": mise_de_fonds_totale,
+    }
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # 5. PROJECTION 10 ANS
 # ═══════════════════════════════════════════════════════════════════════════
 
+# Taux candidats pour encadrer le TRI avant l'affinage (Newton protégé)
+_GRILLE_TRI = np.array([
+    -0.99, -0.95, -0.9, -0.8, -0.7, -0.6, -0.5, -0.4, -0.3, -0.2, -0.15, -0.1,
+    -0.05, -0.02, 0.0, 0.02, 0.04, 0.06, 0.08, 0.1, 0.125, 0.15, 0.2, 0.25,
+    0.3, 0.4, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0, 100.0,
+])
+
+
+def _van_et_derivee(taux: np.ndarray, flux: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """VAN de chaque colonne de ``flux`` à son propre taux, et sa dérivée."""
+    t = np.arange(flux.shape[0], dtype=float)[:, np.newaxis]
+    actualisation = (1 + taux) ** -t
+    van = np.sum(flux * actualisation, axis=0)
+    derivee = np.sum(-t * flux * actualisation, axis=0) / (1 + taux)
+    return van, derivee
+
+
+def calculer_van_batch(taux, flux) -> np.ndarray:
+    """
+    VAN de séries de flux (axe 0 = temps, premier flux non actualisé),
+    même convention que ``npf.npv``. ``taux`` est une fraction (0.05 = 5 %),
+    scalaire ou une valeur par série.
+    """
+    flux = np.asarray(flux, dtype=float)
+    t = np.arange(flux.shape[0]).reshape((-1,) + (1,) * (flux.ndim - 1))
+    return np.sum(flux / (1 + np.asarray(taux, dtype=float)) ** t, axis=0)
+
+
+def calculer_tri_batch(
+    flux,
+    estimation=0.0,
+    tolerance: float = 1e-10,
+    max_iterations: int = 100,
+) -> np.ndarray:
+    """
+    TRI de séries de flux, toutes résolues en même temps (sans numpy_financial).
+
+    Pour chaque série, un intervalle où la VAN change de signe est cherché sur
+    une grille de taux, en retenant celui le plus proche de ``estimation``.
+    La racine est ensuite affinée par Newton, avec repli sur la bissection
+    dès qu'un pas sort de l'intervalle : la convergence est garantie.
+
+    Args:
+        flux: tableau (périodes,) ou (périodes, séries), axe 0 = temps.
+        estimation: taux de départ (fraction), scalaire ou un par série —
+            par exemple le cap rate, proche du TRI pour un immeuble.
+        tolerance: écart relatif visé sur le taux.
+        max_iterations: nombre maximal d'itérations d'affinage.
+
+    Returns:
+        TRI en fraction (0.08 = 8 %), NaN si la série n'a pas de TRI.
+    """
+    flux = np.asarray(flux, dtype=float)
+    forme = flux.shape[1:]
+    flux = flux.reshape(flux.shape[0], -1)
+    n = flux.shape[1]
+    estimation = np.broadcast_to(np.asarray(estimation, dtype=float), forme).reshape(-1)
+    tri = np.full(n, np.nan)
+
+    # 1. Encadrement : VAN évaluée sur la grille pour toutes les séries
+    t = np.arange(flux.shape[0], dtype=float)
+    actualisation = (1 + _GRILLE_TRI[:, np.newaxis]) ** -t  # (grille, périodes)
+    van_grille = actualisation @ flux  # (grille, séries)
+    signe = np.sign(van_grille)
+    changement = signe[:-1] * signe[1:] <= 0
+    changement &= ~np.isnan(van_grille[:-1]) & ~np.isnan(van_grille[1:])
+    changement &= np.any(flux != 0, axis=0)
+
+    bas_grille, haut_grille = _GRILLE_TRI[:-1, np.newaxis], _GRILLE_TRI[1:, np.newaxis]
+    distance = np.maximum(bas_grille - estimation, 0) + np.maximum(estimation - haut_grille, 0)
+    k = np.argmin(np.where(changement, distance, np.inf), axis=0)
+    actif = changement[k, np.arange(n)]
+
+    colonnes = np.flatnonzero(actif)
+    k = k[colonnes]
+    bas, haut = _GRILLE_TRI[k], _GRILLE_TRI[k + 1]
+    van_bas = van_grille[k, colonnes]
+    f = flux[:, colonnes]
+    x = np.clip(estimation[colonnes], bas, haut)
+
+    # 2. Affinage : Newton protégé par bissection sur les séries non convergées
+    for _ in range(max_iterations):
+        if colonnes.size == 0:
+            break
+        van, derivee = _van_et_derivee(x, f)
+        meme_signe = np.sign(van) == np.sign(van_bas)
+        bas = np.where(meme_signe, x, bas)
+        van_bas = np.where(meme_signe, van, van_bas)
+        haut = np.where(meme_signe, haut, x)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_newton = x - van / derivee
+        hors_intervalle = ~((x_newton > bas) & (x_newton < haut))
+        x_suivant = np.where(hors_intervalle, (bas + haut) / 2, x_newton)
+
+        converge = (van == 0) | (np.abs(x_suivant - x) <= tolerance * (1 + np.abs(x)))
+        tri[colonnes[converge]] = np.where(van[converge] == 0, x[converge], x_suivant[converge])
+
+        garder = ~converge
+        colonnes, f = colonnes[garder], f[:, garder]
+        x, bas, haut, van_bas = x_suivant[garder], bas[garder], haut[garder], van_bas[garder]
+
+    tri[colonnes] = x
+    return tri.reshape(forme)
+
+
 def projection_10_ans(
     prix: float,
     revenus_bruts_annuels: float,
@@ -298,24 +582,14 @@ def projection_10_ans(
             # Dernière année : cashflow + produit de la vente (valeur - solde hypo)
             flux_tresorerie.append(cashflow + valeur_immeuble - solde_hypotheque)
 
-    # Calcul TRI
+    # Calcul TRI (estimation de départ : cap rate de l'an 1)
     tri = None
-    if _HAS_NPF:
-        try:
-            tri_val = npf.irr(flux_tresorerie)
-            if not np.isnan(tri_val):
-                tri = round(tri_val * 100, 2)
-        except Exception:
-            pass
+    tri_val = calculer_tri_batch(flux_tresorerie, estimation=noi_an1 / prix if prix > 0 else 0.0)
+    if not np.isnan(tri_val):
+        tri = round(float(tri_val) * 100, 2)
 
     # Calcul VAN (taux d'actualisation = taux d'intérêt)
-    van = None
-    if _HAS_NPF:
-        try:
-            van_val = npf.npv(taux_interet / 100, flux_tresorerie)
-            van = round(van_val, 2)
-        except Exception:
-            pass
+    van = round(float(calculer_van_batch(taux_interet / 100, flux_tresorerie)), 2)
 
     # Rendement cumulé
     rendement_cumule = None
@@ -335,6 +609,133 @@ def projection_10_ans(
     }
 
 
+def _projeter_matrices(
+    prix: np.ndarray,
+    revenus_bruts_annuels: np.ndarray,
+    depenses_exploitation_an1: np.ndarray,
+    taux_inoccupation: np.ndarray,
+    indice_loyers: np.ndarray,
+    indice_depenses: np.ndarray,
+    indice_valeur: np.ndarray,
+    amor: dict[str, np.ndarray],
+    hypotheque: np.ndarray,
+    mise_de_fonds_totale: np.ndarray,
+    taux_actualisation: np.ndarray,
+) -> dict:
+    """
+    Cœur vectorisé de la projection : toutes les entrées annuelles sont des
+    matrices (années, ...) et les entrées par immeuble sont diffusées dessus.
+
+    Les indices (loyers, dépenses, valeur) valent 1 la première année et
+    portent la croissance cumulée les années suivantes.
+    """
+    revenus_bruts = revenus_bruts_annuels * indice_loyers
+    revenus_nets = revenus_bruts - revenus_bruts * (taux_inoccupation / 100)
+    depenses = depenses_exploitation_an1 * indice_depenses
+    noi = revenus_nets - depenses
+    service_dette = amor["Paiement annuel"]
+    cashflow = noi - service_dette
+    cashflow_cumule = np.cumsum(cashflow, axis=0)
+    valeur_immeuble = prix * indice_valeur
+    solde_hypotheque = amor["Solde restant"]
+    equite = valeur_immeuble - solde_hypotheque
+
+    # Flux pour TRI/VAN : mise de fonds, cashflows, puis produit de la vente
+    flux = np.concatenate([-mise_de_fonds_totale[np.newaxis], cashflow], axis=0)
+    flux[-1] += valeur_immeuble[-1] - solde_hypotheque[-1]
+
+    van = calculer_van_batch(taux_actualisation / 100, flux)
+
+    gain_total = (
+        cashflow_cumule[-1] + (valeur_immeuble[-1] - prix) + (hypotheque - solde_hypotheque[-1])
+    )
+    avec_mdf = mise_de_fonds_totale > 0
+    rendement_cumule = np.where(
+        avec_mdf, gain_total / np.where(avec_mdf, mise_de_fonds_totale, 1.0) * 100, np.nan
+    )
+
+    return {
+        "Revenus bruts": revenus_bruts,
+        "Revenus nets": revenus_nets,
+        "Dépenses": depenses,
+        "NOI": noi,
+        "Service de dette": service_dette,
+        "Cashflow": cashflow,
+        "Cashflow cumulé": cashflow_cumule,
+        "Valeur immeuble": valeur_immeuble,
+        "Solde hypothèque": solde_hypotheque,
+        "Équité": equite,
+        "flux": flux,
+        "VAN ($)": van,
+        "Rendement cumulé (%)": rendement_cumule,
+    }
+
+
+def projection_batch(
+    prix,
+    revenus_bruts_annuels,
+    depenses_exploitation_an1,
+    taux_inoccupation=5.0,
+    mise_de_fonds_pct=20.0,
+    taux_interet=5.0,
+    amortissement=25,
+    croissance_loyers=3.0,
+    inflation_depenses=2.0,
+    appreciation_immeuble=3.0,
+    mise_de_fonds_totale=0.0,
+    annees: int = 10,
+) -> dict:
+    """
+    Projection sur N années pour un portefeuille d'immeubles en un seul appel.
+
+    Chaque paramètre accepte un scalaire ou un tableau (une valeur par
+    immeuble) ; les paramètres sont diffusés (broadcast) entre eux. Mêmes
+    hypothèses que ``projection_10_ans``.
+
+    Returns:
+        dict avec :
+        - "Année" : index des années (1..N) ;
+        - une matrice années × immeubles pour chaque colonne de
+          ``projection_10_ans`` (NOI, Cashflow, Équité, Solde hypothèque, ...) ;
+        - "TRI (%)", "VAN ($)", "Rendement cumulé (%)" : un tableau par
+          immeuble (NaN lorsque l'indicateur est indéfini).
+    """
+    (
+        prix, revenus_bruts_annuels, depenses_exploitation_an1, taux_inoccupation,
+        mise_de_fonds_pct, taux_interet, amortissement, croissance_loyers,
+        inflation_depenses, appreciation_immeuble, mise_de_fonds_totale,
+    ) = np.broadcast_arrays(*(
+        np.asarray(v, dtype=float) for v in (
+            prix, revenus_bruts_annuels, depenses_exploitation_an1, taux_inoccupation,
+            mise_de_fonds_pct, taux_interet, amortissement, croissance_loyers,
+            inflation_depenses, appreciation_immeuble, mise_de_fonds_totale,
+        )
+    ))
+
+    hypotheque = prix * (1 - mise_de_fonds_pct / 100)
+    amor = tableau_amortissement_batch(hypotheque, taux_interet, amortissement, annees)
+
+    # Exposant de croissance : 0 la première année, puis 1, 2, ...
+    i = np.arange(annees, dtype=float).reshape((-1,) + (1,) * prix.ndim)
+    resultat = _projeter_matrices(
+        prix,
+        revenus_bruts_annuels,
+        depenses_exploitation_an1,
+        taux_inoccupation,
+        (1 + croissance_loyers / 100) ** i,
+        (1 + inflation_depenses / 100) ** i,
+        (1 + appreciation_immeuble / 100) ** i,
+        amor,
+        hypotheque,
+        mise_de_fonds_totale,
+        taux_interet,
+    )
+    cap_rate = np.divide(resultat["NOI"][0], prix, out=np.zeros_like(prix), where=prix > 0)
+    resultat["TRI (%)"] = calculer_tri_batch(resultat.pop("flux"), estimation=cap_rate) * 100
+    resultat["Année"] = np.arange(1, annees + 1)
+    return resultat
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # 6. INDICATEURS FINANCIERS SUPPLÉMENTAIRES
 # ═══════════════════════════════════════════════════════════════════════════
@@ -368,14 +769,13 @@ def calculer_indicateurs(
     # Multiplicateur de revenus bruts (GRM)
     grm = prix / (noi / (1 - 0.05)) if noi > 0 else 0  # Approximation
 
-    # Sensibilité aux taux d'intérêt
-    sensibilite = {}
-    for delta in [-1.0, -0.5, 0.5, 1.0]:
-        nouveau_taux = taux_interet + delta
-        if nouveau_taux > 0:
-            nouveau_paiement = calculer_paiement_hypothecaire(hypotheque, nouveau_taux) * 12
-            nouveau_cashflow = noi - nouveau_paiement
-            sensibilite[f"{nouveau_taux:.1f}%"] = round(nouveau_cashflow, 2)
+    # Sensibilité aux taux d'intérêt (coupe 1-D ; voir grille_sensibilite pour la 2-D)
+    nouveaux_taux = taux_interet + np.array([-1.0, -0.5, 0.5, 1.0])
+    nouveaux_taux = nouveaux_taux[nouveaux_taux > 0]
+    nouveaux_cashflows = noi - calculer_paiement_hypothecaire_batch(hypotheque, nouveaux_taux) * 12
+    sensibilite = {
+        f"{t:.1f}%": round(float(cf), 2) for t, cf in zip(nouveaux_taux, nouveaux_cashflows)
+    }
 
     return {
         "Cap Rate (%)": round(cap_rate, 2),
@@ -386,3 +786,345 @@ def calculer_indicateurs(
         "GRM": round(grm, 2),
         "Sensibilité taux d'intérêt": sensibilite,
     }
+
+
+# Paramètres pouvant servir d'axe à la grille de sensibilité
+AXES_SENSIBILITE = {
+    "taux_interet": "Taux d'intérêt (%)",
+    "prix": "Prix d'achat ($)",
+    "taux_inoccupation": "Taux d'inoccupation (%)",
+    "revenus_bruts_annuels": "Revenus bruts annuels ($)",
+    "mise_de_fonds_pct": "Mise de fonds (%)",
+}
+
+
+def grille_sensibilite(
+    axe_x: str,
+    valeurs_x,
+    axe_y: str,
+    valeurs_y,
+    prix: float,
+    revenus_bruts_annuels: float,
+    depenses_fixes: float,
+    gestion_pct: float = 0.0,
+    taux_inoccupation: float = 5.0,
+    mise_de_fonds_pct: float = 20.0,
+    taux_interet: float = 5.0,
+    amortissement: int = 25,
+    croissance_loyers: float = 3.0,
+    inflation_depenses: float = 2.0,
+    appreciation_immeuble: float = 3.0,
+    frais_initiaux: float = 0.0,
+    bareme_mutation: str = "Québec (général)",
+    annees: int = 10,
+) -> dict:
+    """
+    Sensibilité du cashflow, du CSD et du TRI sur une grille 2-D d'hypothèses.
+
+    Les deux axes sont choisis parmi AXES_SENSIBILITE ; toutes les cellules
+    sont calculées ensemble par diffusion (broadcast) dans ``projection_batch``.
+    Les frais de gestion et la mise de fonds totale (mise de fonds, droits de
+    mutation et ``frais_initiaux``) sont recalculés pour chaque cellule.
+
+    Args:
+        depenses_fixes: dépenses d'exploitation de l'an 1 hors frais de gestion.
+        frais_initiaux: coûts initiaux hors mise de fonds et droits de mutation.
+
+    Returns:
+        dict avec "x", "y" (valeurs des axes) et des matrices (len(y), len(x))
+        pour "Cashflow", "CSD" et "TRI (%)" (an 1 pour cashflow et CSD).
+    """
+    if axe_x not in AXES_SENSIBILITE or axe_y not in AXES_SENSIBILITE:
+        raise ValueError(f"Axe inconnu : choisir parmi {', '.join(AXES_SENSIBILITE)}")
+    if axe_x == axe_y:
+        raise ValueError("Les deux axes de la grille doivent être différents.")
+
+    valeurs_x = np.asarray(valeurs_x, dtype=float)
+    valeurs_y = np.asarray(valeurs_y, dtype=float)
+    hypotheses = {
+        "prix": prix,
+        "revenus_bruts_annuels": revenus_bruts_annuels,
+        "taux_inoccupation": taux_inoccupation,
+        "mise_de_fonds_pct": mise_de_fonds_pct,
+        "taux_interet": taux_interet,
+    }
+    hypotheses[axe_x] = valeurs_x[np.newaxis, :]
+    hypotheses[axe_y] = valeurs_y[:, np.newaxis]
+    p = {k: np.broadcast_to(np.asarray(v, dtype=float), (valeurs_y.size, valeurs_x.size))
+         for k, v in hypotheses.items()}
+
+    revenus_nets = p["revenus_bruts_annuels"] * (1 - p["taux_inoccupation"] / 100)
+    depenses = depenses_fixes + revenus_nets * (gestion_pct / 100)
+    mise_de_fonds_totale = (
+        p["prix"] * (p["mise_de_fonds_pct"] / 100)
+        + calculer_droits_mutation_batch(p["prix"], bareme_mutation)
+        + frais_initiaux
+    )
+
+    proj = projection_batch(
+        p["prix"], p["revenus_bruts_annuels"], depenses,
+        taux_inoccupation=p["taux_inoccupation"],
+        mise_de_fonds_pct=p["mise_de_fonds_pct"],
+        taux_interet=p["taux_interet"],
+        amortissement=amortissement,
+        croissance_loyers=croissance_loyers,
+        inflation_depenses=inflation_depenses,
+        appreciation_immeuble=appreciation_immeuble,
+        mise_de_fonds_totale=mise_de_fonds_totale,
+        annees=annees,
+    )
+    service_dette = proj["Service de dette"][0]
+    csd = np.divide(
+        proj["Revenus nets"][0], service_dette,
+        out=np.zeros_like(service_dette), where=service_dette > 0,
+    )
+
+    return {
+        "axe_x": axe_x,
+        "axe_y": axe_y,
+        "x": valeurs_x,
+        "y": valeurs_y,
+        "Cashflow": proj["Cashflow"][0],
+        "CSD": csd,
+        "TRI (%)": proj["TRI (%)"],
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 7. SIMULATION MONTE CARLO
+# ═══════════════════════════════════════════════════════════════════════════
+
+# Facteurs aléatoires, dans cet ordre : croissance des loyers, inflation des
+# dépenses, appréciation, inoccupation et taux d'intérêt (tous en %).
+FACTEURS_MC = (
+    "croissance_loyers",
+    "inflation_depenses",
+    "appreciation_immeuble",
+    "taux_inoccupation",
+    "taux_interet",
+)
+
+# Écarts-types annuels par défaut (points de %)
+VOLATILITES_MC = {
+    "croissance_loyers": 1.5,
+    "inflation_depenses": 1.0,
+    "appreciation_immeuble": 4.0,
+    "taux_inoccupation": 2.0,
+    "taux_interet": 1.0,
+}
+
+# Corrélations par défaut entre facteurs (ordre de FACTEURS_MC)
+CORRELATIONS_MC = np.array([
+    [1.0, 0.5, 0.4, -0.4, 0.2],
+    [0.5, 1.0, 0.3, 0.0, 0.3],
+    [0.4, 0.3, 1.0, -0.3, -0.3],
+    [-0.4, 0.0, -0.3, 1.0, 0.1],
+    [0.2, 0.3, -0.3, 0.1, 1.0],
+])
+
+PERCENTILES_MC = (5, 25, 50, 75, 95)
+
+
+def _indice_cumule(taux_annuels: np.ndarray) -> np.ndarray:
+    """Indice de croissance (années, ...) : 1 l'an 1, puis produit cumulé."""
+    indice = np.ones_like(taux_annuels)
+    indice[1:] = np.cumprod(1 + taux_annuels[1:] / 100, axis=0)
+    return indice
+
+
+def _resume_distribution(valeurs: np.ndarray) -> dict:
+    """Percentiles et moyenne d'une distribution (NaN ignorés)."""
+    if np.all(np.isnan(valeurs)):
+        return {**{f"P{p}": None for p in PERCENTILES_MC}, "Moyenne": None}
+    quantiles = np.nanpercentile(valeurs, PERCENTILES_MC)
+    resume = {f"P{p}": round(float(q), 2) for p, q in zip(PERCENTILES_MC, quantiles)}
+    resume["Moyenne"] = round(float(np.nanmean(valeurs)), 2)
+    return resume
+
+
+def simulation_monte_carlo(
+    prix: float,
+    revenus_bruts_annuels: float,
+    depenses_exploitation_an1: float,
+    taux_inoccupation: float = 5.0,
+    mise_de_fonds_pct: float = 20.0,
+    taux_interet: float = 5.0,
+    amortissement: int = 25,
+    croissance_loyers: float = 3.0,
+    inflation_depenses: float = 2.0,
+    appreciation_immeuble: float = 3.0,
+    mise_de_fonds_totale: float = 0.0,
+    annees: int = 10,
+    nb_trajectoires: int = 20_000,
+    volatilites: dict | None = None,
+    correlations: np.ndarray | None = None,
+    seed: int | None = None,
+) -> dict:
+    """
+    Projection stochastique : les hypothèses de ``projection_10_ans`` deviennent
+    les moyennes de facteurs aléatoires corrélés.
+
+    Chaque trajectoire tire, pour chaque année, des chocs gaussiens corrélés
+    (décomposition de Cholesky) sur la croissance des loyers, l'inflation des
+    dépenses, l'appréciation et l'inoccupation. Le taux d'intérêt est tiré
+    une fois par trajectoire (taux fixe sur l'horizon). Toutes les
+    trajectoires sont évaluées ensemble sur des matrices années × trajectoires.
+
+    Args:
+        volatilites: écarts-types annuels par facteur (voir VOLATILITES_MC).
+        correlations: matrice de corrélation dans l'ordre de FACTEURS_MC.
+        seed: graine du générateur, pour des résultats reproductibles.
+
+    Returns:
+        dict avec les percentiles de TRI, VAN et équité finale, les
+        probabilités de cashflow négatif, et les distributions brutes.
+    """
+    volatilites = {**VOLATILITES_MC, **(volatilites or {})}
+    correlations = CORRELATIONS_MC if correlations is None else np.asarray(correlations, dtype=float)
+    rng = np.random.default_rng(seed)
+
+    moyennes = np.array([
+        croissance_loyers, inflation_depenses, appreciation_immeuble,
+        taux_inoccupation, taux_interet,
+    ])
+    ecarts = np.array([volatilites[f] for f in FACTEURS_MC])
+    chocs = rng.standard_normal((annees, nb_trajectoires, len(FACTEURS_MC)))
+    tirages = moyennes + (chocs @ np.linalg.cholesky(correlations).T) * ecarts
+
+    loyers, depenses, appreciation, inoccupation = (tirages[..., k] for k in range(4))
+    inoccupation = np.clip(inoccupation, 0.0, 100.0)
+    taux = np.maximum(tirages[0, :, 4], 0.0)
+
+    hypotheque = np.full(nb_trajectoires, prix * (1 - mise_de_fonds_pct / 100))
+    amor = tableau_amortissement_batch(hypotheque, taux, amortissement, annees)
+    resultat = _projeter_matrices(
+        np.float64(prix),
+        np.float64(revenus_bruts_annuels),
+        np.float64(depenses_exploitation_an1),
+        inoccupation,
+        _indice_cumule(loyers),
+        _indice_cumule(depenses),
+        _indice_cumule(appreciation),
+        amor,
+        hypotheque,
+        np.full(nb_trajectoires, float(mise_de_fonds_totale)),
+        taux,
+    )
+
+    cap_rate = resultat["NOI"][0] / prix if prix > 0 else 0.0
+    tri = calculer_tri_batch(resultat["flux"], estimation=cap_rate) * 100
+    van = resultat["VAN ($)"]
+    equite_finale = resultat["Équité"][-1]
+    cashflow_negatif = resultat["Cashflow"] < 0
+
+    return {
+        "Trajectoires": nb_trajectoires,
+        "TRI (%)": _resume_distribution(tri),
+        "VAN ($)": _resume_distribution(van),
+        "Équité finale": _resume_distribution(equite_finale),
+        "Probabilité cashflow négatif (%)": round(float(np.mean(np.any(cashflow_negatif, axis=0))) * 100, 2),
+        "Probabilité cashflow négatif par année (%)": np.round(np.mean(cashflow_negatif, axis=1) * 100, 2),
+        "Probabilité VAN négative (%)": round(float(np.mean(van < 0)) * 100, 2),
+        "distributions": {
+            "TRI (%)": tri,
+            "VAN ($)": van,
+            "Équité finale": equite_finale,
+        },
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 8. RECHERCHE D'OBJECTIF (NÉGOCIATION)
+# ═══════════════════════════════════════════════════════════════════════════
+
+# Indicateurs pouvant servir de cible ; l'objectif est « indicateur ≥ cible »
+INDICATEURS_OBJECTIF = ("CSD", "Cashflow", "Cash-on-Cash (%)")
+
+# Intervalles de recherche et précision par défaut de chaque variable
+BORNES_OBJECTIF = {
+    "prix": (1_000.0, 50_000_000.0, 1.0),
+    "revenus_bruts_annuels": (0.0, 10_000_000.0, 1.0),
+    "mise_de_fonds_pct": (0.0, 100.0, 0.01),
+}
+
+
+def _marge_objectif(resultats: dict, indicateur: str, cible) -> np.ndarray:
+    """
+    Écart à l'objectif (≥ 0 si atteint), exprimé sans division pour rester
+    monotone : le CSD et le cash-on-cash sont ramenés au cashflow.
+    """
+    cible = np.asarray(cible, dtype=float)
+    if indicateur == "CSD":
+        return resultats["Revenus nets"] - cible * resultats["Service de dette"]
+    if indicateur == "Cashflow":
+        return resultats["Cashflow"] - cible
+    if indicateur == "Cash-on-Cash (%)":
+        return resultats["Cashflow"] - cible / 100 * resultats["Mise de fonds totale"]
+    raise ValueError(f"Indicateur inconnu : choisir parmi {', '.join(INDICATEURS_OBJECTIF)}")
+
+
+def _resoudre_objectif(variable: str, indicateur: str, cible, maximiser: bool,
+                       bornes: tuple | None, hypotheses: dict) -> np.ndarray:
+    """
+    Bissection vectorisée sur ``variable`` pour que ``indicateur ≥ cible``.
+
+    L'écart à l'objectif est monotone en la variable, avec un seul
+    changement de signe. On vérifie d'abord les bornes de l'intervalle :
+    si l'objectif est déjà atteint à la borne la plus favorable, elle est
+    retournée ; s'il ne l'est nulle part, le résultat est NaN.
+    """
+    cible = np.asarray(cible, dtype=float)
+    bas, haut, precision = bornes or BORNES_OBJECTIF[variable]
+
+    def marge(valeur):
+        return _marge_objectif(analyse_annee_1_batch(**{**hypotheses, variable: valeur}), indicateur, cible)
+
+    forme = np.broadcast_shapes(*(np.shape(v) for v in hypotheses.values()), np.shape(cible))
+    bas = np.full(forme, bas, dtype=float)
+    haut = np.full(forme, haut, dtype=float)
+    ok_bas, ok_haut = marge(bas) >= 0, marge(haut) >= 0
+
+    # Borne « favorable » : la plus haute pour un maximum, la plus basse pour un minimum.
+    # Si elle ne respecte pas l'objectif mais l'autre oui, on cherche la frontière entre les deux.
+    if maximiser:
+        deja_atteint, faisable, infaisable, ok_autre = ok_haut, bas, haut, ok_bas
+    else:
+        deja_atteint, faisable, infaisable, ok_autre = ok_bas, haut, bas, ok_haut
+    jamais_atteint = ~deja_atteint & ~ok_autre
+
+    iterations = int(np.ceil(np.log2(max(np.max(haut - bas), precision) / precision)))
+    for _ in range(iterations):
+        milieu = (faisable + infaisable) / 2
+        ok = marge(milieu) >= 0
+        faisable = np.where(ok, milieu, faisable)
+        infaisable = np.where(ok, infaisable, milieu)
+
+    solution = np.where(deja_atteint, haut if maximiser else bas, faisable)
+    return np.where(jamais_atteint, np.nan, solution)
+
+
+def prix_maximal(indicateur: str, cible, bornes: tuple | None = None, **hypotheses) -> np.ndarray:
+    """
+    Prix d'achat maximal pour lequel ``indicateur ≥ cible`` à l'an 1.
+
+    Args:
+        indicateur: "CSD", "Cashflow" ($/an) ou "Cash-on-Cash (%)".
+        cible: valeur visée (scalaire ou une par annonce).
+        bornes: (min, max, précision) de la recherche ; BORNES_OBJECTIF par défaut.
+        **hypotheses: paramètres de ``analyse_annee_1_batch`` autres que le
+            prix ; des tableaux permettent de traiter un lot d'annonces.
+
+    Returns:
+        Prix maximal par annonce (NaN si la cible est inatteignable).
+    """
+    return _resoudre_objectif("prix", indicateur, cible, True, bornes, hypotheses)
+
+
+def revenus_minimaux(indicateur: str, cible, bornes: tuple | None = None, **hypotheses) -> np.ndarray:
+    """Revenus bruts annuels minimaux pour que ``indicateur ≥ cible`` (voir ``prix_maximal``)."""
+    return _resoudre_objectif("revenus_bruts_annuels", indicateur, cible, False, bornes, hypotheses)
+
+
+def mise_de_fonds_minimale(indicateur: str, cible, bornes: tuple | None = None, **hypotheses) -> np.ndarray:
+    """Mise de fonds minimale (% du prix) pour que ``indicateur ≥ cible`` (voir ``prix_maximal``)."""
+    return _resoudre_objectif("mise_de_fonds_pct", indicateur, cible, False, bornes, hypotheses)
@@ -0,0 +1,379 @@
+"""
+Géocodage hors ligne des adresses extraites des annonces.
+
+Référentiels (extraits illustratifs, au format d'Adresses Québec) :
+
+- donnees/adresses.csv : un tronçon de rue par ligne (municipalité, rue,
+  premier et dernier numéro civique, RTA, coordonnées aux deux bouts) ;
+- donnees/municipalites.csv : municipalité, variantes de nom
+  (arrondissements, anciennes villes), barème de droits de mutation, RTA
+  et centroïde.
+
+Au premier usage, les tronçons sont triés par clé normalisée
+(« nom de rue|municipalité ») dans un fichier d'index du dossier de cache,
+accompagné du tableau des positions de ses lignes. Les deux fichiers sont
+ouverts par mmap et interrogés par recherche dichotomique sur le préfixe de
+la clé : seules les pages touchées sont lues, même pour un référentiel
+provincial de plusieurs millions de tronçons. L'index est reconstruit dès
+que le référentiel change (son nom contient l'empreinte du fichier source).
+"""
+
+import csv
+import hashlib
+import mmap
+import os
+import re
+import threading
+import unicodedata
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+
+from cache_http import DOSSIER_CACHE
+from finance import BAREMES
+from secteurs import retirer_code_postal
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# PARAMÈTRES
+# ═══════════════════════════════════════════════════════════════════════════
+
+DOSSIER_DONNEES = Path(__file__).resolve().parent / "donnees"
+FICHIER_ADRESSES = DOSSIER_DONNEES / "adresses.csv"
+FICHIER_MUNICIPALITES = DOSSIER_DONNEES / "municipalites.csv"
+DOSSIER_INDEX = DOSSIER_CACHE / "geocodage"
+
+BAREME_PAR_DEFAUT = "Québec (général)"
+
+# Types de voie : retirés du nom pour former la clé (« 15 Laval » trouve la rue Laval)
+TYPES_VOIE = {
+    "rue", "avenue", "boulevard", "chemin", "route", "rang", "place", "montee", "cote",
+    "terrasse", "promenade", "croissant", "impasse", "allee", "carre", "square", "autoroute",
+}
+_ABREVIATIONS = {
+    "av": "avenue", "ave": "avenue", "boul": "boulevard", "bd": "boulevard", "blvd": "boulevard",
+    "ch": "chemin", "rte": "route", "mtee": "montee", "pl": "place", "prom": "promenade",
+    "st": "saint", "ste": "sainte", "mt": "mont", "e": "est", "o": "ouest", "n": "nord", "s": "sud",
+}
+_ARTICLES = {"de", "du", "des", "la", "le", "les", "l", "d"}
+
+_RE_NON_ALPHANUM = re.compile(r"[^a-z0-9]+")
+_RE_PARENTHESES = re.compile(r"\([^)]*\)")
+# Numéro civique (éventuellement une plage « 12-14 » ou un suffixe « 12A ») suivi de la voie
+_RE_ADRESSE = re.compile(r"\b(\d{1,6})[a-z]?(?:\s*[-–]\s*\d{1,6}[a-z]?)?\b\s*,?\s*([^,]+)", re.I)
+# Désignation de logement (« App. 3, », « unité 2 », « #4 ») : son numéro n'est pas le numéro civique
+_RE_UNITE = re.compile(
+    r"(?:\b(?:app(?:artement)?|appt|apt|unit[ée]|logement|log|suite|bureau|local)\b\.?|#)\s*\d{1,6}[a-z]?\b\s*,?",
+    re.I,
+)
+
+
+def _mots(texte: str) -> list[str]:
+    """Mots en minuscules, sans accents ni ponctuation, abréviations développées."""
+    texte = unicodedata.normalize("NFKD", texte).encode("ascii", "ignore").decode("ascii").lower()
+    return [_ABREVIATIONS.get(mot, mot) for mot in _RE_NON_ALPHANUM.split(texte) if mot]
+
+
+def normaliser_voie(voie: str) -> tuple[str | None, str]:
+    """(type de voie ou None, nom normalisé) : « av. du Mont-Royal E. » → ("avenue", "mont royal est")."""
+    mots = _mots(voie)
+    type_voie = next((mot for mot in mots if mot in TYPES_VOIE), None)
+    if type_voie is not None:
+        mots.remove(type_voie)
+    return type_voie, " ".join(mot for mot in mots if mot not in _ARTICLES)
+
+
+def normaliser_municipalite(nom: str) -> str:
+    """« Montréal (Rosemont/La Petite-Patrie) » → « montreal »."""
+    return " ".join(_mots(_RE_PARENTHESES.sub(" ", nom)))
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# INDEX TRIÉ (MMAP)
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _chemins_index(source: Path, dossier: Path) -> tuple[Path, Path]:
+    """Fichiers d'index propres à l'état actuel de ``source`` (chemin, taille, date)."""
+    etat = source.stat()
+    signature = f"{source.resolve()}|{etat.st_size}|{etat.st_mtime_ns}"
+    empreinte = hashlib.sha256(signature.encode("utf-8")).hexdigest()[:16]
+    return dossier / f"{source.stem}-{empreinte}.idx", dossier / f"{source.stem}-{empreinte}.pos"
+
+
+def construire_index(source: Path, fichier_index: Path, fichier_positions: Path) -> int:
+    """
+    Trie les tronçons de ``source`` par clé et écrit l'index (une ligne
+    « clé\\tchamps… » par tronçon) et les positions des lignes (uint64).
+    Retourne le nombre de tronçons.
+    """
+    lignes = []
+    with open(source, encoding="utf-8", newline="") as fichier:
+        for troncon in csv.DictReader(fichier):
+            type_voie, nom = normaliser_voie(troncon["rue"])
+            cle = f"{nom}|{normaliser_municipalite(troncon['municipalite'])}"
+            champs = (
+                cle, type_voie or "", troncon["municipalite"], troncon["rue"], troncon["debut"], troncon["fin"],
+                troncon["rta"], troncon["latitude_debut"], troncon["longitude_debut"],
+                troncon["latitude_fin"], troncon["longitude_fin"],
+            )
+            lignes.append("\t".join(champs).encode("utf-8") + b"\n")
+    lignes.sort()
+
+    positions = array("Q")
+    fichier_index.parent.mkdir(parents=True, exist_ok=True)
+    temporaire = fichier_index.with_suffix(".tmp")
+    with open(temporaire, "wb") as sortie:
+        position = 0
+        for ligne in lignes:
+            positions.append(position)
+            sortie.write(ligne)
+            position += len(ligne)
+    os.replace(temporaire, fichier_index)
+    temporaire = fichier_positions.with_suffix(".tmp")
+    with open(temporaire, "wb") as sortie:
+        positions.tofile(sortie)
+    os.replace(temporaire, fichier_positions)
+    return len(lignes)
+
+
+@dataclass
+class Troncon:
+    municipalite: str
+    rue: str
+    type_voie: str | None
+    debut: int
+    fin: int
+    rta: str
+    latitude_debut: float
+    longitude_debut: float
+    latitude_fin: float
+    longitude_fin: float
+
+    def position(self, numero: int | None) -> tuple[float, float]:
+        """Coordonnées interpolées le long du tronçon (son milieu si le numéro est inconnu)."""
+        if numero is None or self.fin <= self.debut:
+            t = 0.5
+        else:
+            t = min(1.0, max(0.0, (numero - self.debut) / (self.fin - self.debut)))
+        return (
+            self.latitude_debut + t * (self.latitude_fin - self.latitude_debut),
+            self.longitude_debut + t * (self.longitude_fin - self.longitude_debut),
+        )
+
+    def ecart(self, numero: int | None) -> int:
+        """Distance (en numéros civiques) du numéro à la plage du tronçon."""
+        if numero is None:
+            return 0
+        return max(self.debut - numero, numero - self.fin, 0)
+
+
+class IndexTroncons:
+    """Index trié des tronçons, lu par mmap."""
+
+    def __init__(self, source: Path = FICHIER_ADRESSES, dossier: Path = DOSSIER_INDEX):
+        fichier_index, fichier_positions = _chemins_index(Path(source), Path(dossier))
+        if not (fichier_index.is_file() and fichier_positions.is_file()):
+            construire_index(Path(source), fichier_index, fichier_positions)
+        self._donnees = self._projeter(fichier_index)
+        # Vue typée sur les positions (entiers 64 bits natifs), sans copie
+        self._positions = memoryview(self._projeter(fichier_positions)).cast("Q")
+
+    @staticmethod
+    def _projeter(chemin: Path):
+        """Fichier projeté en mémoire en lecture seule (mmap refuse un fichier vide)."""
+        if chemin.stat().st_size == 0:
+            return b""
+        with open(chemin, "rb") as fichier:
+            return mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def _cle(self, i: int) -> bytes:
+        debut = self._positions[i]
+        return self._donnees[debut:self._donnees.find(b"\t", debut)]
+
+    def _rang(self, cle: bytes) -> int:
+        """Premier rang dont la clé est ≥ ``cle``."""
+        bas, haut = 0, len(self._positions)
+        while bas < haut:
+            milieu = (bas + haut) // 2
+            if self._cle(milieu) < cle:
+                bas = milieu + 1
+            else:
+                haut = milieu
+        return bas
+
+    def _troncon(self, i: int) -> Troncon:
+        debut = self._positions[i]
+        ligne = self._donnees[debut:self._donnees.find(b"\n", debut)].decode("utf-8")
+        _, type_voie, municipalite, rue, premier, dernier, rta, lat1, lon1, lat2, lon2 = ligne.split("\t")
+        return Troncon(municipalite, rue, type_voie or None, int(premier), int(dernier), rta,
+                       float(lat1), float(lon1), float(lat2), float(lon2))
+
+    def troncons(self, nom: str, municipalite: str | None = None) -> list[Troncon]:
+        """Tronçons d'une rue (nom normalisé), dans une municipalité (normalisée) ou partout."""
+        prefixe = f"{nom}|{municipalite}" if municipalite else f"{nom}|"
+        prefixe = prefixe.encode("utf-8")
+        premier = self._rang(prefixe)
+        # Clés ASCII sans tabulation : avec une municipalité, seule la clé
+        # exacte précède prefixe + "\t" ; sans, toute clé du préfixe précède prefixe + 0xFF
+        dernier = self._rang(prefixe + (b"\t" if municipalite else b"\xff"))
+        return [self._troncon(i) for i in range(premier, dernier)]
+
+    def fermer(self) -> None:
+        projection = self._positions.obj
+        self._positions.release()
+        for fichier in (projection, self._donnees):
+            if isinstance(fichier, mmap.mmap):
+                fichier.close()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# GÉOCODEUR
+# ═══════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class Localisation:
+    """Résultat du géocodage ; ``precision`` : "adresse", "rue" ou "municipalite"."""
+
+    municipalite: str
+    rta: str | None
+    latitude: float
+    longitude: float
+    bareme: str
+    precision: str
+
+
+class Geocodeur:
+    """Résout une adresse libre en municipalité, RTA, coordonnées et barème."""
+
+    def __init__(
+        self,
+        fichier_adresses: Path = FICHIER_ADRESSES,
+        fichier_municipalites: Path = FICHIER_MUNICIPALITES,
+        dossier_index: Path = DOSSIER_INDEX,
+    ):
+        self.index = IndexTroncons(fichier_adresses, dossier_index)
+        self._municipalites: dict[str, dict] = {}
+        self._par_rta: dict[str, dict] = {}
+        with open(fichier_municipalites, encoding="utf-8", newline="") as fichier:
+            for ligne in csv.DictReader(fichier):
+                bareme = ligne["bareme"] if ligne["bareme"] in BAREMES else BAREME_PAR_DEFAUT
+                municipalite = {
+                    "nom": ligne["municipalite"],
+                    "cle": normaliser_municipalite(ligne["municipalite"]),
+                    "bareme": bareme,
+                    "rta": ligne["rta"] or None,
+                    "latitude": float(ligne["latitude"]),
+                    "longitude": float(ligne["longitude"]),
+                }
+                for nom in [ligne["municipalite"], *ligne["alias"].split(";")]:
+                    if nom.strip():
+                        # Le nom officiel l'emporte sur un alias homonyme
+                        self._municipalites.setdefault(normaliser_municipalite(nom), municipalite)
+                if municipalite["rta"]:
+                    self._par_rta.setdefault(municipalite["rta"], municipalite)
+
+    def municipalite(self, nom: str) -> dict | None:
+        """Municipalité (nom, barème, RTA, centroïde) d'un nom ou d'un arrondissement."""
+        return self._municipalites.get(normaliser_municipalite(nom))
+
+    def _separer_municipalite(self, voie: str) -> tuple[str, str | None]:
+        """
+        Voie et municipalité qui la suit sans virgule (« rue Saint-Denis
+        Montréal ») ; le nom de rue n'est jamais vidé (« rue Laval » reste entière).
+        """
+        mots = voie.split()
+        for fin in range(1, len(mots)):
+            suite = " ".join(mots[fin:])
+            if self.municipalite(suite) is not None and normaliser_voie(" ".join(mots[:fin]))[1]:
+                return " ".join(mots[:fin]), suite
+        return voie, None
+
+    def geocoder(self, adresse: str | None, ville: str | None = None) -> Localisation | None:
+        """
+        Géocode une adresse d'annonce (« 5412, rue Saint-Denis, Montréal
+        (Rosemont) »). ``ville`` (si connue) est essayée avant les parties de
+        l'adresse pour trouver la municipalité, puis la RTA du code postal.
+        """
+        code_postal, adresse = retirer_code_postal(_RE_UNITE.sub(" ", adresse or ""))
+        rta = code_postal[:3] if code_postal else None
+        correspondance = _RE_ADRESSE.search(adresse)
+        numero, voie, reste, commune = None, None, adresse, None
+        if correspondance is not None:
+            numero, voie = int(correspondance[1]), correspondance[2]
+            reste = adresse[correspondance.end():]
+        elif normaliser_voie(adresse.split(",")[0])[0] is not None:
+            # Rue sans numéro civique (« rue Saint-Denis, Montréal »)
+            voie, _, reste = adresse.partition(",")
+        if voie is not None:
+            voie, commune = self._separer_municipalite(voie)
+
+        candidates = [ville] if ville else []
+        candidates += [commune] + reste.split(",") + adresse.split(",")
+        municipalite = next((m for nom in candidates if nom and (m := self.municipalite(nom))), None)
+        if municipalite is None and rta is not None:
+            municipalite = self._par_rta.get(rta)
+
+        troncon = None
+        if voie is not None:
+            type_voie, nom = normaliser_voie(voie)
+            troncons = self.index.troncons(nom, municipalite["cle"] if municipalite else None)
+            if type_voie is not None:
+                troncons = [t for t in troncons if t.type_voie in (type_voie, None)] or troncons
+            # Sans municipalité, une rue homonyme de plusieurs villes reste ambiguë, sauf
+            # si la RTA du code postal la départage (le numéro civique choisit le tronçon)
+            villes = {t.municipalite for t in troncons}
+            if rta is not None and len(villes) > 1:
+                troncons = [t for t in troncons if t.rta == rta] or troncons
+                villes = {t.municipalite for t in troncons}
+            if troncons and (municipalite is not None or len(villes) == 1):
+                troncon = min(troncons, key=lambda t: t.ecart(numero))
+                if municipalite is None:
+                    municipalite = self.municipalite(troncon.municipalite)
+
+        if troncon is not None:
+            latitude, longitude = troncon.position(numero)
+            return Localisation(
+                municipalite=troncon.municipalite,
+                rta=troncon.rta or rta,  # celle du tronçon, d'où viennent les coordonnées
+                latitude=latitude,
+                longitude=longitude,
+                bareme=municipalite["bareme"] if municipalite else BAREME_PAR_DEFAUT,
+                precision="adresse" if numero is not None and troncon.ecart(numero) == 0 else "rue",
+            )
+        if municipalite is not None:
+            return Localisation(
+                municipalite=municipalite["nom"],
+                rta=rta or municipalite["rta"],
+                latitude=municipalite["latitude"],
+                longitude=municipalite["longitude"],
+                bareme=municipalite["bareme"],
+                precision="municipalite",
+            )
+        return None
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# GÉOCODEUR PARTAGÉ DU MODULE
+# ═══════════════════════════════════════════════════════════════════════════
+
+_geocodeur: Geocodeur | None = None
+_verrou_geocodeur = threading.Lock()
+
+
+def obtenir_geocodeur() -> Geocodeur | None:
+    """
+    Géocodeur des référentiels de donnees/, créé au premier appel (None si
+    un référentiel manque ou si l'index ne peut pas être écrit).
+    """
+    global _geocodeur
+    if _geocodeur is None:
+        with _verrou_geocodeur:
+            if _geocodeur is None and FICHIER_ADRESSES.is_file() and FICHIER_MUNICIPALITES.is_file():
+                try:
+                    _geocodeur = Geocodeur()
+                except OSError:
+                    return None
+    return _geocodeur
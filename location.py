@@ -1,8 +1,17 @@
 """
 Module d'analyse de localisation pour l'évaluation immobilière.
 Score de localisation basé sur des critères saisis par l'utilisateur.
+
+Les poids de CRITERES sont fixés à la main ; calibration.py les ajuste sur
+des données historiques et écrit un profil de poids versionné, que
+``charger_profil`` relit pour le passer en ``poids`` aux fonctions de score.
 """
 
+import json
+from pathlib import Path
+
+import numpy as np
+
 
 # ═══════════════════════════════════════════════════════════════════════════
 # CRITÈRES ET PONDÉRATIONS
@@ -108,16 +117,98 @@ CRITERES = {
 }
 
 
+# Appréciation qualitative : catégories du pire au meilleur emplacement et
+# score global minimal de chacune au-delà de la première
+APPRECIATIONS = (
+    ("🔴 Emplacement à risque élevé", "#ff1744"),
+    ("🟠 Emplacement à risque modéré", "#ff9100"),
+    ("🟡 Emplacement correct", "#ffd600"),
+    ("🟢 Bon emplacement", "#64dd17"),
+    ("🟢 Excellent emplacement", "#00c853"),
+)
+SEUILS_APPRECIATION = np.array([4.0, 5.5, 7.0, 8.5])
+
+
+# Profils de poids (voir calibration.py)
+FORMAT_PROFIL = 1
+DOSSIER_PROFILS = Path(__file__).resolve().parent / "donnees" / "profils"
+
+
+def _poids_valide(valeur) -> bool:
+    """Nombre réel (pas un booléen) fini et positif ou nul."""
+    if isinstance(valeur, bool) or not isinstance(valeur, (int, float)):
+        return False
+    return bool(np.isfinite(valeur)) and valeur >= 0
+
+
+def charger_profil(chemin: str | Path) -> dict[str, float]:
+    """
+    Poids {critere_id: poids} d'un profil écrit par calibration.py.
+
+    Lève ValueError si le fichier n'est pas un profil de ce format, si un
+    critère manque, si un poids n'est pas un nombre positif ou si tous sont
+    nuls.
+    """
+    with open(chemin, encoding="utf-8") as fichier:
+        profil = json.load(fichier)
+    if not isinstance(profil, dict) or profil.get("format") != FORMAT_PROFIL:
+        format_lu = profil.get("format") if isinstance(profil, dict) else None
+        raise ValueError(f"Format de profil non pris en charge : {format_lu!r} (attendu {FORMAT_PROFIL})")
+    poids = profil.get("poids")
+    if not isinstance(poids, dict):
+        raise ValueError("Le profil ne contient pas de poids par critère.")
+    manquants = [cid for cid in CRITERES if cid not in poids]
+    if manquants:
+        raise ValueError(f"Poids manquants dans le profil : {', '.join(manquants)}")
+    valeurs = [poids[cid] for cid in CRITERES]
+    if not all(_poids_valide(v) for v in valeurs):
+        raise ValueError("Les poids d'un profil doivent être des nombres positifs.")
+    if not any(valeurs):
+        raise ValueError("Les poids d'un profil ne peuvent pas être tous nuls.")
+    return {cid: float(poids[cid]) for cid in CRITERES}
+
+
+def _arrondir_dixieme(valeurs) -> np.ndarray:
+    """
+    Arrondit un tableau au dixième, exactement comme ``round(x, 1)``.
+
+    ``np.round`` multiplie par 10 avant d'arrondir et tranche mal les
+    demi-dixièmes (4.55) ; l'erreur exacte du produit (TwoProduct de Dekker)
+    départage les égalités comme Python sur la valeur binaire exacte.
+    """
+    x = np.asarray(valeurs, dtype=float)
+    y = np.asarray(x * 10.0)
+    n = np.array(np.rint(y))
+    egalites = np.abs(y - n) == 0.5
+    if np.any(egalites):
+        xe = x[egalites]
+        c = 134_217_729.0 * xe  # 2**27 + 1 : découpage de Dekker
+        x_haut = c - (c - xe)
+        x_bas = xe - x_haut
+        ye = y[egalites]
+        erreur = (x_haut * 10.0 - ye) + x_bas * 10.0
+        ecart = ye - n[egalites]
+        n[egalites] += ((ecart == 0.5) & (erreur > 0)).astype(float) - ((ecart == -0.5) & (erreur < 0))
+    return n / 10.0
+
+
+def _categorie(score_global):
+    """Indice dans APPRECIATIONS du score global (scalaire ou tableau)."""
+    return np.searchsorted(SEUILS_APPRECIATION, score_global, side="right")
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # CALCUL DU SCORE
 # ═══════════════════════════════════════════════════════════════════════════
 
-def calculer_score_localisation(reponses: dict[str, str]) -> dict:
+def calculer_score_localisation(reponses: dict[str, str], poids: dict[str, float] | None = None) -> dict:
     """
     Calcule le score de localisation à partir des réponses de l'utilisateur.
 
     Args:
         reponses: dict {critere_id: option_choisie}
+        poids: dict {critere_id: poids} (voir charger_profil) ; par défaut,
+            les poids de CRITERES.
 
     Returns:
         dict avec le score global, les scores par critère, et une appréciation.
@@ -132,37 +223,21 @@ def calculer_score_localisation(reponses: dict[str, str]) -> dict:
             continue
 
         score = critere_info["options"].get(option, 5)
-        poids = critere_info["poids"]
+        poids_critere = critere_info["poids"] if poids is None else poids[critere_id]
 
-        total_pondere += score * poids
-        total_poids += poids
+        total_pondere += score * poids_critere
+        total_poids += poids_critere
 
         scores_details.append({
             "Critère": critere_info["label"],
             "Réponse": option,
             "Score": score,
-            "Poids": poids,
-            "Score pondéré": round(score * poids, 1),
+            "Poids": poids_critere,
+            "Score pondéré": round(score * poids_critere, 1),
         })
 
     score_global = round(total_pondere / total_poids, 1) if total_poids > 0 else 0
-
-    # Appréciation qualitative
-    if score_global >= 8.5:
-        appreciation = "🟢 Excellent emplacement"
-        couleur = "#00c853"
-    elif score_global >= 7.0:
-        appreciation = "🟢 Bon emplacement"
-        couleur = "#64dd17"
-    elif score_global >= 5.5:
-        appreciation = "🟡 Emplacement correct"
-        couleur = "#ffd600"
-    elif score_global >= 4.0:
-        appreciation = "🟠 Emplacement à risque modéré"
-        couleur = "#ff9100"
-    else:
-        appreciation = "🔴 Emplacement à risque élevé"
-        couleur = "#ff1744"
+    appreciation, couleur = APPRECIATIONS[_categorie(score_global)]
 
     return {
         "score_global": score_global,
@@ -178,3 +253,113 @@ def calculer_score_localisation(reponses: dict[str, str]) -> dict:
             for cid, critere_info in CRITERES.items()
         },
     }
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# CALCUL VECTORISÉ (LOT DE SECTEURS)
+# ═══════════════════════════════════════════════════════════════════════════
+
+# CRITERES compilé une fois : chaque réponse devient un code entier (rang de
+# l'option dans son critère), qui indexe une matrice de scores critères ×
+# options. La colonne CODE_INCONNU vaut 5 (option inconnue, comme dans
+# calculer_score_localisation) ; CODE_ABSENT marque une réponse manquante,
+# exclue du score et de la somme des poids.
+IDS_CRITERES = tuple(CRITERES)
+CODE_ABSENT = -1
+CODE_INCONNU = max(len(info["options"]) for info in CRITERES.values())
+
+_CODES_OPTIONS = {
+    cid: {option: code for code, option in enumerate(info["options"])}
+    for cid, info in CRITERES.items()
+}
+
+
+def _matrice_scores() -> np.ndarray:
+    """Scores critères × codes d'options (5 pour CODE_INCONNU et les codes inutilisés)."""
+    matrice = np.full((len(CRITERES), CODE_INCONNU + 1), 5.0)
+    for i, info in enumerate(CRITERES.values()):
+        matrice[i, :len(info["options"])] = list(info["options"].values())
+    return matrice
+
+
+_MATRICE_SCORES = _matrice_scores()
+_POIDS = np.array([info["poids"] for info in CRITERES.values()])
+_LIGNES_CRITERES = np.arange(len(CRITERES))
+
+
+def vecteur_poids(poids: dict[str, float] | None = None) -> np.ndarray:
+    """Poids dans l'ordre de IDS_CRITERES (ceux de CRITERES si ``poids`` est None)."""
+    return _POIDS if poids is None else np.array([poids[cid] for cid in IDS_CRITERES], dtype=float)
+
+
+def scores_criteres(codes: np.ndarray) -> np.ndarray:
+    """Scores (N × len(CRITERES)) des codes de ``encoder_reponses`` ; 5 pour une réponse absente."""
+    codes = np.asarray(codes)
+    return _MATRICE_SCORES[_LIGNES_CRITERES, np.where(codes != CODE_ABSENT, codes, CODE_INCONNU)]
+
+
+def _coder(table: dict, option) -> int:
+    if option is None or option != option:  # None ou NaN (cellule vide d'un DataFrame)
+        return CODE_ABSENT
+    return table.get(option, CODE_INCONNU)
+
+
+def encoder_reponses(reponses) -> np.ndarray:
+    """
+    Codes entiers (N × len(CRITERES), colonnes dans l'ordre de IDS_CRITERES)
+    des réponses de N secteurs.
+
+    Args:
+        reponses: liste de dicts {critere_id: option_choisie}, ou colonnes
+            {critere_id: séquence d'options} / DataFrame. Un critère absent
+            ou une valeur None/NaN donne CODE_ABSENT ; une option inconnue
+            donne CODE_INCONNU.
+    """
+    if isinstance(reponses, (list, tuple)):
+        colonnes = {cid: [r.get(cid) for r in reponses] for cid in IDS_CRITERES}
+        nb = len(reponses)
+    else:
+        colonnes = {cid: reponses[cid] for cid in IDS_CRITERES if cid in reponses}
+        nb = len(next(iter(colonnes.values()))) if colonnes else len(reponses)
+
+    codes = np.full((nb, len(IDS_CRITERES)), CODE_ABSENT, dtype=np.int8)
+    for j, cid in enumerate(IDS_CRITERES):
+        if cid in colonnes:
+            table = _CODES_OPTIONS[cid]
+            codes[:, j] = np.fromiter((_coder(table, option) for option in colonnes[cid]), np.int8, nb)
+    return codes
+
+
+def calculer_score_localisation_batch(reponses, poids: dict[str, float] | None = None) -> dict[str, np.ndarray]:
+    """
+    Version vectorisée du score global de ``calculer_score_localisation``.
+
+    Args:
+        reponses: codes de ``encoder_reponses`` (tableau d'entiers
+            N × len(CRITERES)), ou toute entrée acceptée par celle-ci.
+        poids: dict {critere_id: poids} (voir charger_profil) ; par défaut,
+            les poids de CRITERES.
+
+    Returns:
+        dict de tableaux de longueur N : score global (arrondi à 0.1, 0 sans
+        aucune réponse), indice de catégorie dans APPRECIATIONS,
+        appréciation et couleur.
+    """
+    codes = np.asarray(reponses) if isinstance(reponses, np.ndarray) else encoder_reponses(reponses)
+    presentes = codes != CODE_ABSENT
+    scores = scores_criteres(codes)
+    vecteur = vecteur_poids(poids)
+
+    total_pondere = np.where(presentes, scores, 0.0) @ vecteur
+    total_poids = presentes @ vecteur
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score_global = np.where(total_poids > 0, _arrondir_dixieme(total_pondere / total_poids), 0.0)
+
+    categorie = _categorie(score_global)
+    libelles, couleurs = (np.array(colonne, dtype=object) for colonne in zip(*APPRECIATIONS))
+    return {
+        "score_global": score_global,
+        "categorie": categorie,
+        "appreciation": libelles[categorie],
+        "couleur": couleurs[categorie],
+    }
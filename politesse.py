@@ -0,0 +1,309 @@
+"""
+Politesse du scraper : débit par domaine, robots.txt et disjoncteur.
+
+- ``LimiteurDebit`` : seau à jetons par domaine. Une requête réserve un
+  jeton ; s'il n'y en a pas, elle attend le temps de recharge (l'attente se
+  fait hors verrou, plusieurs threads peuvent réserver en parallèle).
+- ``CacheRobots`` : règles robots.txt par origine, gardées 24 h. Comme le
+  prévoit la RFC 9309, un robots.txt absent (4xx) autorise tout et un
+  robots.txt injoignable (5xx, réseau) interdit tout temporairement.
+- ``Disjoncteur`` : après plusieurs échecs consécutifs sur un domaine, les
+  requêtes suivantes sont refusées immédiatement pendant un délai, au lieu
+  d'attendre chacune l'expiration complète du délai réseau.
+
+Les métriques séparent le temps passé à attendre (débit) du temps passé à
+télécharger, pour régler le débit au plus près de ce que le site tolère.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# PARAMÈTRES
+# ═══════════════════════════════════════════════════════════════════════════
+
+DEBIT_PAR_DEFAUT = 1.0      # requêtes par seconde et par domaine
+RAFALE = 3                  # requêtes consécutives permises sans attente
+# Débits propres à certains domaines (None = illimité) : serveurs de test locaux
+DEBITS_DOMAINES: dict[str, float | None] = {"localhost": None, "127.0.0.1": None}
+
+AGENT_ROBOTS = "AppFinanceBot"
+# En-tête User-Agent réellement envoyé : les règles robots.txt vérifiées sont les siennes
+USER_AGENT = f"{AGENT_ROBOTS}/1.0"
+DUREE_ROBOTS = 24 * 3600        # secondes de validité d'un robots.txt
+DUREE_ROBOTS_INJOIGNABLE = 300  # nouvel essai après un robots.txt injoignable
+
+SEUIL_DISJONCTEUR = 5           # échecs consécutifs avant ouverture
+DELAI_DISJONCTEUR = 60.0        # secondes avant un nouvel essai
+
+
+def domaine_de(url: str) -> str:
+    """Domaine (hôte sans port) d'une URL, en minuscules."""
+    return (urlparse(url).hostname or "").lower()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# LIMITEUR DE DÉBIT (SEAU À JETONS)
+# ═══════════════════════════════════════════════════════════════════════════
+
+class LimiteurDebit:
+    """Seau à jetons indépendant pour chaque domaine."""
+
+    def __init__(
+        self,
+        debit: float = DEBIT_PAR_DEFAUT,
+        rafale: int = RAFALE,
+        debits_domaines: dict[str, float | None] | None = None,
+    ):
+        self.debit = debit
+        self.rafale = rafale
+        self.debits_domaines = dict(DEBITS_DOMAINES if debits_domaines is None else debits_domaines)
+        self._seaux: dict[str, list[float]] = {}  # domaine -> [jetons, dernière recharge]
+        self._verrou = threading.Lock()
+
+    def debit_de(self, domaine: str) -> float | None:
+        return self.debits_domaines.get(domaine, self.debit)
+
+    def limiter(self, domaine: str, debit: float) -> None:
+        """Abaisse le débit d'un domaine (ex. Crawl-delay du robots.txt)."""
+        with self._verrou:
+            actuel = self.debits_domaines.get(domaine, self.debit)
+            if actuel is None or debit < actuel:
+                self.debits_domaines[domaine] = debit
+
+    def reserver(self, domaine: str) -> float:
+        """Réserve un jeton et retourne l'attente nécessaire (s), sans dormir."""
+        debit = self.debit_de(domaine)
+        if debit is None or debit <= 0:
+            return 0.0
+        maintenant = time.monotonic()
+        with self._verrou:
+            jetons, derniere = self._seaux.get(domaine, (float(self.rafale), maintenant))
+            jetons = min(float(self.rafale), jetons + (maintenant - derniere) * debit)
+            # Le solde peut devenir négatif : chaque réservation attend son tour
+            jetons -= 1.0
+            self._seaux[domaine] = [jetons, maintenant]
+        return 0.0 if jetons >= 0 else -jetons / debit
+
+    def acquerir(self, domaine: str) -> float:
+        """Attend son tour pour ``domaine`` ; retourne le temps attendu (s)."""
+        attente = self.reserver(domaine)
+        if attente > 0:
+            time.sleep(attente)
+        return attente
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# CACHE ROBOTS.TXT
+# ═══════════════════════════════════════════════════════════════════════════
+
+class CacheRobots:
+    """
+    Règles robots.txt par origine (schéma + hôte + port).
+
+    ``telecharger(url)`` doit retourner ``(code HTTP, texte)`` et lever une
+    exception en cas d'erreur réseau.
+    """
+
+    def __init__(self, agent: str = AGENT_ROBOTS, duree: float = DUREE_ROBOTS):
+        self.agent = agent
+        self.duree = duree
+        self._regles: dict[str, tuple[RobotFileParser, float]] = {}
+        self._verrous: dict[str, threading.Lock] = defaultdict(threading.Lock)
+        self._verrou = threading.Lock()
+
+    def regles(self, url: str, telecharger: Callable[[str], tuple[int, str]]) -> RobotFileParser:
+        morceaux = urlparse(url)
+        origine = f"{morceaux.scheme}://{morceaux.netloc}"
+        with self._verrou:
+            verrou_origine = self._verrous[origine]
+        # Un seul téléchargement du robots.txt par origine, même en parallèle
+        with verrou_origine:
+            entree = self._regles.get(origine)
+            if entree is not None and entree[1] > time.monotonic():
+                return entree[0]
+            parseur = RobotFileParser(origine + "/robots.txt")
+            duree = self.duree
+            try:
+                code, texte = telecharger(parseur.url)
+            except Exception:
+                code, texte = 503, ""
+            if code >= 500:
+                parseur.disallow_all = True
+                duree = DUREE_ROBOTS_INJOIGNABLE
+            elif code >= 400:
+                parseur.allow_all = True
+            else:
+                parseur.parse(texte.splitlines())
+            parseur.modified()
+            self._regles[origine] = (parseur, time.monotonic() + duree)
+            return parseur
+
+    def autorise(self, url: str, telecharger: Callable[[str], tuple[int, str]]) -> bool:
+        return self.regles(url, telecharger).can_fetch(self.agent, url)
+
+    def delai_exploration(self, url: str, telecharger: Callable[[str], tuple[int, str]]) -> float | None:
+        """Crawl-delay déclaré pour notre agent (s), ou None."""
+        delai = self.regles(url, telecharger).crawl_delay(self.agent)
+        return float(delai) if delai is not None else None
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# DISJONCTEUR
+# ═══════════════════════════════════════════════════════════════════════════
+
+class Disjoncteur:
+    """
+    Disjoncteur par domaine : fermé → ouvert après ``seuil`` échecs
+    consécutifs → semi-ouvert après ``delai`` s (une requête d'essai) →
+    fermé si elle réussit, de nouveau ouvert sinon.
+    """
+
+    def __init__(self, seuil: int = SEUIL_DISJONCTEUR, delai: float = DELAI_DISJONCTEUR):
+        self.seuil = seuil
+        self.delai = delai
+        self._echecs: dict[str, int] = defaultdict(int)
+        self._ouvert_jusqua: dict[str, float] = {}
+        self._essai_en_cours: set[str] = set()
+        self._verrou = threading.Lock()
+
+    def autorise(self, domaine: str) -> bool:
+        with self._verrou:
+            fin = self._ouvert_jusqua.get(domaine)
+            if fin is None:
+                return True
+            if time.monotonic() < fin or domaine in self._essai_en_cours:
+                return False
+            self._essai_en_cours.add(domaine)
+            return True
+
+    def liberer(self, domaine: str) -> None:
+        """Rend la requête d'essai réservée par ``autorise`` quand elle n'est finalement pas partie."""
+        with self._verrou:
+            self._essai_en_cours.discard(domaine)
+
+    def succes(self, domaine: str) -> None:
+        with self._verrou:
+            self._echecs.pop(domaine, None)
+            self._ouvert_jusqua.pop(domaine, None)
+            self._essai_en_cours.discard(domaine)
+
+    def echec(self, domaine: str) -> None:
+        with self._verrou:
+            self._echecs[domaine] += 1
+            if self._echecs[domaine] >= self.seuil or domaine in self._essai_en_cours:
+                self._ouvert_jusqua[domaine] = time.monotonic() + self.delai
+            self._essai_en_cours.discard(domaine)
+
+    def etat(self, domaine: str) -> str:
+        with self._verrou:
+            fin = self._ouvert_jusqua.get(domaine)
+        if fin is None:
+            return "fermé"
+        return "ouvert" if time.monotonic() < fin else "semi-ouvert"
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# POLITESSE (ASSEMBLAGE + MÉTRIQUES)
+# ═══════════════════════════════════════════════════════════════════════════
+
+class Politesse:
+    """Limiteur, robots.txt et disjoncteur, avec métriques par domaine."""
+
+    def __init__(
+        self,
+        debit: float = DEBIT_PAR_DEFAUT,
+        rafale: int = RAFALE,
+        debits_domaines: dict[str, float | None] | None = None,
+        respecter_robots: bool = True,
+        seuil_disjoncteur: int = SEUIL_DISJONCTEUR,
+        delai_disjoncteur: float = DELAI_DISJONCTEUR,
+    ):
+        self.limiteur = LimiteurDebit(debit, rafale, debits_domaines)
+        self.robots = CacheRobots() if respecter_robots else None
+        self.disjoncteur = Disjoncteur(seuil_disjoncteur, delai_disjoncteur)
+        self._metriques: dict[str, dict] = defaultdict(lambda: dict.fromkeys(
+            ("requetes", "echecs", "refus_robots", "court_circuits", "attente_s", "telechargement_s"), 0
+        ))
+        self._verrou = threading.Lock()
+
+    def _compter(self, domaine: str, **increments) -> None:
+        with self._verrou:
+            metriques = self._metriques[domaine]
+            for cle, valeur in increments.items():
+                metriques[cle] += valeur
+
+    def avant_requete(self, url: str, telecharger_robots: Callable[[str], tuple[int, str]]) -> str | None:
+        """
+        Attend son tour pour ``url``. Retourne None si la requête peut partir,
+        sinon la raison du refus ("disjoncteur" ou "robots.txt").
+        """
+        domaine = domaine_de(url)
+        if not self.disjoncteur.autorise(domaine):
+            self._compter(domaine, court_circuits=1)
+            return "disjoncteur"
+        if self.robots is not None:
+            try:
+                autorisee = self.robots.autorise(url, telecharger_robots)
+                delai = self.robots.delai_exploration(url, telecharger_robots) if autorisee else None
+            except BaseException:
+                self.disjoncteur.liberer(domaine)
+                raise
+            if not autorisee:
+                # Aucune requête ne part : l'essai éventuel du disjoncteur semi-ouvert est rendu
+                self.disjoncteur.liberer(domaine)
+                self._compter(domaine, refus_robots=1)
+                return "robots.txt"
+            if delai:
+                self.limiteur.limiter(domaine, 1.0 / delai)
+        self._compter(domaine, attente_s=self.limiteur.acquerir(domaine))
+        return None
+
+    def apres_requete(self, url: str, duree: float, reussie: bool) -> None:
+        """Enregistre l'issue d'un téléchargement (``reussie`` : le domaine a répondu sainement)."""
+        domaine = domaine_de(url)
+        if reussie:
+            self.disjoncteur.succes(domaine)
+        else:
+            self.disjoncteur.echec(domaine)
+        self._compter(domaine, requetes=1, echecs=int(not reussie), telechargement_s=duree)
+
+    def statistiques(self) -> dict:
+        """Métriques par domaine, avec l'état du disjoncteur."""
+        with self._verrou:
+            copie = {domaine: dict(m) for domaine, m in self._metriques.items()}
+        for domaine, metriques in copie.items():
+            metriques["disjoncteur"] = self.disjoncteur.etat(domaine)
+        return copie
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# POLITESSE PARTAGÉE DU MODULE
+# ═══════════════════════════════════════════════════════════════════════════
+
+_politesse: Politesse | None = None
+_verrou_politesse = threading.Lock()
+
+
+def configurer_politesse(**parametres) -> Politesse:
+    """(Re)crée la politesse partagée ; accepte les paramètres de ``Politesse``."""
+    global _politesse
+    nouvelle = Politesse(**parametres)
+    with _verrou_politesse:
+        _politesse = nouvelle
+    return nouvelle
+
+
+def obtenir_politesse() -> Politesse:
+    """Retourne la politesse partagée, créée au premier appel."""
+    global _politesse
+    if _politesse is None:
+        with _verrou_politesse:
+            if _politesse is None:
+                _politesse = Politesse()
+    return _politesse
@@ -1,15 +1,33 @@
 """
 Module de web scraping pour extraire les données d'annonces immobilières.
 Supporte : Centris, DuProprio, LesPACs.
-Méthode : requests + BeautifulSoup (scraping basique).
+Méthode : requests + lxml (données structurées, puis XPath ciblés).
 Si le scraping échoue, l'utilisateur pourra saisir les données manuellement.
 """
 
+import codecs
+import hashlib
+import inspect
+import json
 import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict, deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
 from urllib.parse import urlparse
 
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree
+from lxml import html as lxml_html
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+from cache_http import obtenir_cache
+from politesse import USER_AGENT, domaine_de, obtenir_politesse
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -33,15 +51,90 @@ def detecter_plateforme(url: str) -> str | None:
 # ═══════════════════════════════════════════════════════════════════════════
 
 HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/120.0.0.0 Safari/537.36"
-    ),
+    # Le robot s'identifie : robots.txt est vérifié pour AGENT_ROBOTS (voir politesse.py)
+    "User-Agent": USER_AGENT,
     "Accept-Language": "fr-CA,fr;q=0.9,en;q=0.8",
+    # gzip/deflate toujours ; br seulement si urllib3 sait le décoder (paquet brotli)
+    "Accept-Encoding": ACCEPT_ENCODING,
 }
 
 
+# ═══════════════════════════════════════════════════════════════════════════
+# SESSION HTTP PARTAGÉE (POOL DE CONNEXIONS, REPRISES)
+# ═══════════════════════════════════════════════════════════════════════════
+
+TAILLE_POOL = 10
+DELAI_CONNEXION = 5.0   # secondes pour établir la connexion
+DELAI_LECTURE = 15.0    # secondes entre deux octets reçus
+NB_REPRISES = 3
+FACTEUR_ATTENTE = 0.5   # attentes exponentielles : 0.5 s, 1 s, 2 s, ...
+CODES_A_REPRENDRE = (429, 500, 502, 503, 504)
+
+_session: requests.Session | None = None
+_verrou_session = threading.RLock()
+
+
+def configurer_session(
+    taille_pool: int = TAILLE_POOL,
+    nb_reprises: int = NB_REPRISES,
+    facteur_attente: float = FACTEUR_ATTENTE,
+) -> requests.Session:
+    """
+    (Re)crée la session HTTP partagée du module.
+
+    La session garde les connexions ouvertes (keep-alive) dans un pool par
+    domaine et reprend automatiquement les requêtes en 429/5xx avec une
+    attente exponentielle (en respectant l'en-tête Retry-After).
+    """
+    global _session
+    reprises = Retry(
+        total=nb_reprises,
+        backoff_factor=facteur_attente,
+        status_forcelist=CODES_A_REPRENDRE,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adaptateur = HTTPAdapter(pool_connections=taille_pool, pool_maxsize=taille_pool, max_retries=reprises)
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.mount("https://", adaptateur)
+    session.mount("http://", adaptateur)
+    with _verrou_session:
+        ancienne, _session = _session, session
+    if ancienne is not None:
+        ancienne.close()
+    return session
+
+
+def obtenir_session() -> requests.Session:
+    """Retourne la session partagée, créée au premier appel."""
+    if _session is None:
+        with _verrou_session:
+            if _session is None:
+                configurer_session()
+    return _session
+
+
+def statistiques_connexions() -> dict:
+    """
+    Connexions TCP ouvertes vs requêtes servies par les pools de la session.
+
+    « reutilisees » compte les requêtes passées sur une connexion déjà
+    ouverte : un nombre élevé confirme que le keep-alive fonctionne.
+    """
+    nouvelles = requetes = 0
+    if _session is not None:
+        for adaptateur in set(_session.adapters.values()):
+            pools = adaptateur.poolmanager.pools
+            for cle in list(pools.keys()):
+                pool = pools.get(cle)
+                if pool is not None:
+                    nouvelles += pool.num_connections
+                    requetes += pool.num_requests
+    return {"requetes": requetes, "nouvelles": nouvelles, "reutilisees": requetes - nouvelles}
+
+
 def _nettoyer_prix(texte: str) -> float | None:
     """Extrait un prix numérique d'un texte."""
     if not texte:
@@ -55,21 +148,564 @@ def _nettoyer_prix(texte: str) -> float | None:
         return None
 
 
-def _telecharger_page(url: str) -> BeautifulSoup | None:
-    """Télécharge et parse une page HTML."""
+def _telecharger_robots(url: str) -> tuple[int, str]:
+    """Télécharge un robots.txt : (code HTTP, texte)."""
+    response = obtenir_session().get(url, timeout=(DELAI_CONNEXION, DELAI_LECTURE))
+    return response.status_code, response.text
+
+
+# ── Lecture en flux, plafonnée ───────────────────────────────────────────────
+
+TAILLE_MAX_PAGE = 5 * 1024 * 1024   # octets décodés au-delà desquels la page est tronquée
+TAILLE_BLOC = 64 * 1024
+_CHEVAUCHEMENT = 4096               # marge de recherche des marqueurs entre deux blocs
+
+_RE_CHARSET_META = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([A-Za-z0-9_.:-]+)""", re.I)
+_BOMS = ((codecs.BOM_UTF8, "utf-8"), (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16"))
+
+_journal_telechargements: deque = deque(maxlen=1000)
+_totaux_telechargements = dict.fromkeys(
+    ("requetes", "octets_reseau", "octets_decodes", "plafonnees", "arrets_anticipes", "duree_s"), 0
+)
+_verrou_journal = threading.Lock()
+
+
+def _lire_flux(response: requests.Response, marqueurs: tuple | None) -> tuple[bytes, str]:
+    """
+    Lit le corps par blocs. Retourne les octets et la raison de la fin :
+    "complete", "plafond" (TAILLE_MAX_PAGE atteinte) ou "arret" (tous les
+    ``marqueurs`` — regex sur octets — ont été reçus).
+    """
+    tampon = bytearray()
+    restants = list(marqueurs) if marqueurs else None
+    for bloc in response.iter_content(TAILLE_BLOC):
+        tampon += bloc
+        if len(tampon) > TAILLE_MAX_PAGE:
+            del tampon[TAILLE_MAX_PAGE:]
+            return bytes(tampon), "plafond"
+        if restants:
+            depart = max(0, len(tampon) - len(bloc) - _CHEVAUCHEMENT)
+            restants = [m for m in restants if not m.search(tampon, depart)]
+            if not restants:
+                return bytes(tampon), "arret"
+    return bytes(tampon), "complete"
+
+
+def _encodage(response: requests.Response, contenu: bytes) -> str:
+    """
+    Encodage explicite, sans détection statistique : charset de l'en-tête
+    HTTP, sinon BOM, sinon <meta charset> du début de page, sinon UTF-8.
+    """
+    candidats = [requests.utils.get_encoding_from_headers(response.headers)
+                 if "charset" in response.headers.get("Content-Type", "").lower() else None]
+    candidats += [nom for bom, nom in _BOMS if contenu.startswith(bom)]
+    meta = _RE_CHARSET_META.search(contenu, 0, 4096)
+    candidats += [meta.group(1).decode("ascii") if meta else None, "utf-8"]
+    for nom in candidats:
+        if nom:
+            try:
+                return codecs.lookup(nom).name
+            except LookupError:
+                continue
+    return "utf-8"
+
+
+def _noter_telechargement(url: str, octets_reseau: int, octets: int, duree: float, fin: str) -> None:
+    with _verrou_journal:
+        _journal_telechargements.append(
+            {"url": url, "octets_reseau": octets_reseau, "octets_decodes": octets, "duree_s": duree, "fin": fin}
+        )
+        _totaux_telechargements["requetes"] += 1
+        _totaux_telechargements["octets_reseau"] += octets_reseau
+        _totaux_telechargements["octets_decodes"] += octets
+        _totaux_telechargements["duree_s"] += duree
+        _totaux_telechargements["plafonnees"] += fin == "plafond"
+        _totaux_telechargements["arrets_anticipes"] += fin == "arret"
+
+
+def statistiques_telechargements(detail: bool = False) -> dict:
+    """
+    Totaux des téléchargements réseau (octets reçus sur le réseau et après
+    décompression, durée, pages tronquées) ; ``detail=True`` ajoute le
+    journal des dernières requêtes.
+    """
+    with _verrou_journal:
+        stats = dict(_totaux_telechargements)
+        if detail:
+            stats["journal"] = list(_journal_telechargements)
+    return stats
+
+
+def _telecharger_document(url: str, marqueurs: tuple | None = None) -> tuple[str | None, bool]:
+    """
+    Retourne ``(html, complet)`` pour une page, en passant par le cache disque.
+
+    Une page en cache encore fraîche est servie sans réseau ; sinon elle est
+    revalidée par GET conditionnel (304 = inchangée). Chaque requête réseau
+    respecte la politesse du domaine (débit, robots.txt, disjoncteur) et lit
+    le corps en flux, plafonné à TAILLE_MAX_PAGE ; avec ``marqueurs``, la
+    lecture s'arrête dès qu'ils ont tous été reçus. Une page tronquée
+    (``complet`` faux) n'est pas mise en cache. Si le réseau échoue ou la
+    requête est refusée, la dernière copie connue est servie plutôt que rien.
+    """
+    cache = obtenir_cache()
+    entree = cache.lire(url) if cache is not None else None
+    if entree is not None and entree.est_fraiche(cache.duree_fraicheur):
+        cache.compter_succes()
+        return entree.texte, True
+    secours = (entree.texte if entree is not None else None), True
+
+    politesse = obtenir_politesse()
+    if politesse.avant_requete(url, _telecharger_robots) is not None:
+        return secours
+
+    entetes = entree.entetes_conditionnels() if entree is not None else {}
+    debut = time.perf_counter()
+    try:
+        with obtenir_session().get(
+            url, headers=entetes, timeout=(DELAI_CONNEXION, DELAI_LECTURE), stream=True
+        ) as response:
+            contenu, fin = _lire_flux(response, marqueurs) if response.ok else (b"", "complete")
+            octets_reseau = response.raw.tell()
+    except requests.RequestException:
+        politesse.apres_requete(url, time.perf_counter() - debut, reussie=False)
+        return secours
+    duree = time.perf_counter() - debut
+    # Seuls 429 et 5xx (après reprises) signalent un domaine en difficulté ; un 404 n'en est pas un
+    politesse.apres_requete(url, duree, reussie=response.status_code not in CODES_A_REPRENDRE)
+    _noter_telechargement(url, octets_reseau, len(contenu), duree, fin)
+
+    if response.status_code == 304 and entree is not None:
+        cache.marquer_valide(url, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return secours
+    if not response.ok:
+        return secours
+
+    html = contenu.decode(_encodage(response, contenu), errors="replace")
+    complet = fin == "complete"
+    if cache is not None and complet:
+        cache.enregistrer(url, html, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    return html, complet
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# CACHE DES EXTRACTIONS
+# ═══════════════════════════════════════════════════════════════════════════
+
+# À incrémenter pour forcer la ré-extraction sans modifier le code des règles
+VERSION_EXTRACTION = 1
+
+_versions_extracteurs: dict = {}
+_stats_extraction = {"succes": 0, "echecs": 0}
+_verrou_stats = threading.Lock()
+
+
+def _version_extracteur(extracteur) -> str:
+    """
+    Empreinte des règles d'extraction : source de l'extracteur, des
+    fonctions utilitaires qu'il appelle, de la table des règles par
+    plateforme, des clés structurées et du classement des types. Toute
+    modification de ces règles change la clé de cache, ce qui invalide les
+    anciens résultats. Sans les sources (zipapp, installation .pyc seule),
+    l'empreinte ne repose que sur VERSION_EXTRACTION et les tables.
+    """
+    version = _versions_extracteurs.get(extracteur)
+    if version is None:
+        sources = [
+            str(VERSION_EXTRACTION), repr(REGLES_EXTRACTION), repr(sorted(_CLES_STRUCTUREES.items())),
+            _RE_TYPE_IMMEUBLE.pattern, repr(TYPES_IMMEUBLE),
+        ]
+        try:
+            sources += [inspect.getsource(f) for f in (extracteur, *_UTILITAIRES_EXTRACTION)]
+        except (OSError, TypeError):
+            sources.append(getattr(extracteur, "__qualname__", repr(extracteur)))
+        version = hashlib.sha256("\n".join(sources).encode("utf-8")).hexdigest()[:16]
+        _versions_extracteurs[extracteur] = version
+    return version
+
+
+def _extraire_avec_cache(url: str, extracteur, marqueurs: tuple | None = None) -> dict | None:
+    """
+    Télécharge ``url`` et applique ``extracteur`` (html -> champs).
+
+    Le résultat est mis en cache par empreinte du HTML et version de
+    l'extracteur : une page revenue inchangée n'est pas re-parsée. Une page
+    tronquée (plafond ou arrêt anticipé sur ``marqueurs``) est extraite
+    sans passer par le cache. Retourne None si la page n'a pas pu être chargée.
+    """
+    html, complet = _telecharger_document(url, marqueurs)
+    if html is None:
+        return None
+
+    cache = obtenir_cache() if complet else None
+    if cache is not None:
+        empreinte = hashlib.sha256(html.encode("utf-8")).hexdigest()
+        version = _version_extracteur(extracteur)
+        champs = cache.lire_extraction(empreinte, version)
+        with _verrou_stats:
+            _stats_extraction["succes" if champs is not None else "echecs"] += 1
+        if champs is not None:
+            return champs
+
+    champs = extracteur(html)
+    if cache is not None:
+        cache.enregistrer_extraction(empreinte, extracteur.__name__, version, champs)
+    return champs
+
+
+def statistiques_extraction() -> dict:
+    """Succès / échecs du cache d'extraction depuis le démarrage."""
+    with _verrou_stats:
+        stats = dict(_stats_extraction)
+    total = stats["succes"] + stats["echecs"]
+    stats["taux_succes"] = stats["succes"] / total if total else 0.0
+    return stats
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# TYPE D'IMMEUBLE
+# ═══════════════════════════════════════════════════════════════════════════
+
+# Libellés de la liste « Type d'immeuble » de l'application et nombre de
+# logements correspondant (None : indéterminé)
+TYPES_IMMEUBLE = {
+    "Duplex": 2,
+    "Triplex": 3,
+    "Quadruplex": 4,
+    "Quintuplex": 5,
+    "6-plex": 6,
+    "Immeuble (7+ logements)": None,
+    "Autre": None,
+}
+_MOTS_PLEX = {"duplex": 2, "triplex": 3, "quadruplex": 4, "quintuplex": 5, "sixplex": 6, "hexaplex": 6}
+
+# Une seule alternative compilée, appliquée au texte mis en minuscules (plus
+# rapide qu'une expression insensible à la casse) ; la priorité départage
+# les correspondances (un nombre explicite l'emporte sur un mot, un mot sur
+# un terme collectif, celui-ci sur un terme générique), puis la position.
+_NOMBRE_LOGEMENTS = (
+    r"(?P<nb_plex>\d{1,3})\s*-?\s*plex"
+    r"|(?P<nb_logements>\d{1,3})\s+(?:logements?|unit[ée]s?(?:\s+r[ée]sidentielles)?|units|portes|appartements)"
+)
+_RE_TYPE_IMMEUBLE = re.compile(
+    r"\b(?:" + _NOMBRE_LOGEMENTS
+    + r"|(?P<mot>" + "|".join(_MOTS_PLEX) + r")"
+    r"|(?P<grand>7\s*\+\s*logements|multi-?logements?|multiplex)"
+    r"|(?P<generique>immeuble(?:\s+[àa]\s+revenus)?|income\s+property|plex)"
+    r")\b"
+)
+# Après un mot (priorité 1), seul un nombre explicite peut encore l'emporter :
+# la suite du texte n'est parcourue qu'avec cette expression, plus sélective
+_RE_NOMBRE_LOGEMENTS = re.compile(r"\b(?:" + _NOMBRE_LOGEMENTS + r")\b")
+_PRIORITE_TYPE = {"nb_plex": 0, "nb_logements": 0, "mot": 1, "grand": 2, "generique": 3}
+
+
+def _type_selon_logements(nb: int) -> str:
+    for libelle, logements in TYPES_IMMEUBLE.items():
+        if logements == nb:
+            return libelle
+    return "Immeuble (7+ logements)" if nb >= 7 else "Autre"
+
+
+def _classer_immeuble(texte: str) -> tuple[str | None, int | None]:
+    """
+    Type d'immeuble (libellé de TYPES_IMMEUBLE) et nombre de logements
+    déduits d'un texte (titre de page, catégorie), ou (None, None).
+
+    Un terme générique (« immeuble à revenus », « plex ») ne dit rien du
+    nombre de logements : il donne « Autre » faute de nombre explicite.
+    """
+    texte = texte.lower()
+    meilleure, priorite = None, len(_PRIORITE_TYPE)
+    expression = _RE_TYPE_IMMEUBLE
+    correspondance = expression.search(texte)
+    while correspondance is not None:
+        groupe = correspondance.lastgroup
+        rang = _PRIORITE_TYPE[groupe]
+        if rang == 0:
+            nb = int(correspondance[groupe])
+            if nb >= 2:
+                return _type_selon_logements(nb), nb
+        elif rang < priorite:
+            meilleure, priorite = correspondance, rang
+            if rang == 1:
+                expression = _RE_NOMBRE_LOGEMENTS
+        correspondance = expression.search(texte, correspondance.end())
+
+    if meilleure is None:
+        return None, None
+    groupe = meilleure.lastgroup
+    if groupe == "mot":
+        nb = _MOTS_PLEX[meilleure[groupe]]
+        return _type_selon_logements(nb), nb
+    if groupe == "grand":
+        return "Immeuble (7+ logements)", None
+    return "Autre", None
+
+
+def _detecter_type(titre_texte: str) -> str | None:
+    """Type d'immeuble d'après le titre de la page."""
+    return _classer_immeuble(titre_texte)[0]
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# RÈGLES D'EXTRACTION PAR PLATEFORME (LXML + XPATH PRÉCOMPILÉS)
+# ═══════════════════════════════════════════════════════════════════════════
+
+# Pour chaque champ : éléments (balise, classes) essayés dans l'ordre, puis
+# une balise <meta property> de secours. Cette table est compilée une fois
+# en XPath (extraction) et en marqueurs d'octets (arrêt anticipé).
+REGLES_EXTRACTION = {
+    "centris": {
+        "prix": {"elements": (("span", "price|prix"),), "meta": "og:price:amount"},
+        "adresse": {"elements": (("h2", "address|adresse"),), "meta": None},
+    },
+    "duproprio": {
+        "prix": {"elements": (("div", "price|listing-price"), ("span", "price")), "meta": "og:price:amount"},
+        "adresse": {"elements": (("h1", "address|listing-location"),), "meta": "og:title"},
+    },
+}
+
+_ESPACES_XPATH = {"re": "http://exslt.org/regular-expressions"}
+
+
+def _compiler_regles(regles: dict) -> dict:
+    """Expressions compilées de chaque élément : premier nœud dans l'ordre du document."""
+    return {
+        champ: {
+            "xpaths": [
+                etree.XPath(f"(//{balise}[re:test(@class, '{classes}', 'i')])[1]", namespaces=_ESPACES_XPATH)
+                for balise, classes in regle["elements"]
+            ],
+            "meta": regle["meta"],
+        }
+        for champ, regle in regles.items()
+    }
+
+
+_REGLES = {plateforme: _compiler_regles(regles) for plateforme, regles in REGLES_EXTRACTION.items()}
+_XP_TITRE = etree.XPath("(//title)[1]")
+_XP_META = etree.XPath("(//meta[@property=$propriete])[1]")
+# Texte visible : comme get_text(), sans le contenu des <script> et <style>
+_XP_TEXTES = etree.XPath(".//text()[not(ancestor::script) and not(ancestor::style)]")
+# Le HTML est décodé en amont : on le ré-encode en UTF-8, ce qui rend
+# inoffensives les déclarations d'encodage contenues dans la page.
+_PARSEUR_HTML = lxml_html.HTMLParser(encoding="utf-8")
+
+
+def _analyser(html: str):
+    """Arbre lxml de la page, ou None si le document est vide."""
     try:
-        response = requests.get(url, headers=HEADERS, timeout=15)
-        response.raise_for_status()
-        return BeautifulSoup(response.text, "lxml")
-    except Exception:
+        return lxml_html.document_fromstring(html.encode("utf-8"), parser=_PARSEUR_HTML)
+    except etree.ParserError:
         return None
 
 
+def _texte(noeud, strip: bool = False) -> str:
+    """Équivalent de ``get_text()`` / ``get_text(strip=True)``."""
+    morceaux = _XP_TEXTES(noeud)
+    if strip:
+        return "".join(m.strip() for m in morceaux if m.strip())
+    return "".join(morceaux)
+
+
+def _extraire_dom(html: str, plateforme: str) -> dict:
+    """Champs lus dans le DOM d'une page selon les règles de ``plateforme``."""
+    champs = {"prix": None, "adresse": None, "type_immeuble": None, "nb_logements": None}
+    arbre = _analyser(html)
+    if arbre is None:
+        return champs
+
+    for champ, regle in _REGLES[plateforme].items():
+        noeud = next((n for xpath in regle["xpaths"] for n in xpath(arbre)), None)
+        if noeud is not None:
+            champs[champ] = _nettoyer_prix(_texte(noeud)) if champ == "prix" else _texte(noeud, strip=True)
+        if champs[champ] is None and regle["meta"]:
+            meta = _XP_META(arbre, propriete=regle["meta"])
+            if meta:
+                contenu = meta[0].get("content", "")
+                champs[champ] = _nettoyer_prix(contenu) if champ == "prix" else contenu
+
+    titre = _XP_TITRE(arbre)
+    if titre:
+        champs["type_immeuble"], champs["nb_logements"] = _classer_immeuble(_texte(titre[0]))
+    return champs
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# DONNÉES STRUCTURÉES (JSON-LD, ÉTAT EMBARQUÉ)
+# ═══════════════════════════════════════════════════════════════════════════
+
+# Blocs JSON-LD / JSON et états d'application sérialisés (window.__ETAT__ = {...}).
+# Le JSON est décodé sur place avec raw_decode, sans construire de DOM ni
+# chercher la fin du <script> : le décodeur s'arrête à la fin de l'objet.
+_RE_SCRIPT_JSON = re.compile(r"<script\b[^>]*\btype\s*=\s*[\"']application/(?:ld\+)?json[\"'][^>]*>", re.I)
+_RE_ETAT_EMBARQUE = re.compile(r"\b(?:window\.)?__[A-Z][A-Z0-9_]*__\s*=\s*(?=[\[{])")
+_DECODEUR_JSON = json.JSONDecoder()
+
+# Clés reconnues par champ, après normalisation (minuscules, sans accents ni séparateurs)
+_CLES_STRUCTUREES = {
+    "prix": ("price", "prix", "askingprice", "listprice", "listingprice"),
+    "adresse": ("streetaddress", "address", "adresse", "fulladdress"),
+    "ville": ("addresslocality", "city", "ville", "municipality", "municipalite"),
+    "nb_logements": (
+        "numberofunits", "nbunits", "unitcount", "residentialunits",
+        "nblogements", "nombrelogements", "unitesresidentielles", "logements", "units",
+    ),
+    "revenus_bruts": (
+        "grossrevenue", "potentialgrossrevenue", "grossincome", "annualrevenue",
+        "revenusbruts", "revenusbrutspotentiels", "revenusannuels",
+    ),
+    "depenses": ("expenses", "totalexpenses", "annualexpenses", "depenses", "depensestotales", "depensesannuelles"),
+    "type_immeuble": ("propertytype", "buildingtype", "typeimmeuble", "typepropriete", "category"),
+}
+_CHAMP_PAR_CLE = {cle: champ for champ, cles in _CLES_STRUCTUREES.items() for cle in cles}
+_CLES_MONTANT = ("value", "amount", "total", "montant")
+
+
+@lru_cache(maxsize=4096)
+def _normaliser_cle(cle: str) -> str:
+    sans_accents = unicodedata.normalize("NFKD", cle).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]", "", sans_accents.lower())
+
+
+def _documents_json(html: str) -> list:
+    """Objets JSON des blocs <script> JSON-LD/JSON puis des états embarqués."""
+    documents = []
+    for motif in (_RE_SCRIPT_JSON, _RE_ETAT_EMBARQUE):
+        for correspondance in motif.finditer(html):
+            debut = correspondance.end()
+            while debut < len(html) and html[debut].isspace():
+                debut += 1
+            try:
+                document, _ = _DECODEUR_JSON.raw_decode(html, debut)
+            except ValueError:
+                continue
+            documents.append(document)
+    return documents
+
+
+def _montant(valeur, ventilation: bool = False) -> float | None:
+    """
+    Montant numérique : nombre, texte « 52 800 $ » ou objet {value: ...}.
+    Avec ``ventilation`` (dépenses seulement), un objet sans clé de montant
+    est une ventilation {taxes: ..., assurances: ...} dont on somme les postes.
+    """
+    if isinstance(valeur, bool):
+        return None
+    if isinstance(valeur, (int, float)):
+        return float(valeur)
+    if isinstance(valeur, str):
+        return _nettoyer_prix(valeur)
+    if isinstance(valeur, dict):
+        for cle, sous_valeur in valeur.items():
+            if _normaliser_cle(cle) in _CLES_MONTANT:
+                return _montant(sous_valeur, ventilation)
+        if not ventilation:
+            # Ex. {minPrice, maxPrice, priceCurrency} : aucun montant unique à retenir
+            return None
+        postes = [_montant(v) for v in valeur.values() if isinstance(v, (int, float, str)) and not isinstance(v, bool)]
+        postes = [p for p in postes if p is not None]
+        return sum(postes) if postes else None
+    return None
+
+
+def _valeur_structuree(champ: str, valeur):
+    """Convertit la valeur JSON d'un champ reconnu, ou None si inutilisable."""
+    if champ in ("prix", "revenus_bruts", "depenses"):
+        montant = _montant(valeur, ventilation=champ == "depenses")
+        return montant if montant is not None and montant > 0 else None
+    if champ == "nb_logements":
+        if isinstance(valeur, list):
+            return len(valeur) or None
+        montant = _montant(valeur) if not isinstance(valeur, dict) else None
+        return int(montant) if montant is not None and 1 <= montant < 1000 and montant == int(montant) else None
+    if champ == "type_immeuble":
+        return _detecter_type(valeur) if isinstance(valeur, str) else None
+    # adresse, ville : texte non vide (un objet PostalAddress est parcouru ensuite)
+    if isinstance(valeur, str) and valeur.strip():
+        return valeur.strip()
+    return None
+
+
+def _extraire_structure(html: str) -> dict:
+    """
+    Champs tirés des données structurées de la page.
+
+    Parcours en largeur : la première occurrence la moins profonde d'une clé
+    gagne, ce qui privilégie l'annonce principale sur les annonces similaires
+    imbriquées plus bas dans l'état.
+    """
+    champs = dict.fromkeys(_CLES_STRUCTUREES)
+    a_trouver = len(champs)
+    file = deque(_documents_json(html))
+    while file and a_trouver:
+        noeud = file.popleft()
+        if isinstance(noeud, list):
+            file.extend(noeud)
+            continue
+        if not isinstance(noeud, dict):
+            continue
+        for cle, valeur in noeud.items():
+            champ = _CHAMP_PAR_CLE.get(_normaliser_cle(cle)) if isinstance(cle, str) else None
+            if champ is not None and champs[champ] is None:
+                champs[champ] = _valeur_structuree(champ, valeur)
+                a_trouver -= champs[champ] is not None
+            if isinstance(valeur, (dict, list)):
+                file.append(valeur)
+    return champs
+
+
+def _completer_par_dom(champs: dict, plateforme: str, html: str) -> dict:
+    """
+    Complète les champs manquants avec l'extraction DOM (seulement si
+    nécessaire), puis déduit le nombre de logements du type d'immeuble.
+    """
+    if any(champs.get(cle) is None for cle in ("prix", "adresse", "type_immeuble")):
+        for cle, valeur in _extraire_dom(html, plateforme).items():
+            if champs.get(cle) is None:
+                champs[cle] = valeur
+    if champs.get("nb_logements") is None:
+        champs["nb_logements"] = TYPES_IMMEUBLE.get(champs.get("type_immeuble"))
+    return champs
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# ARRÊT ANTICIPÉ DU TÉLÉCHARGEMENT
+# ═══════════════════════════════════════════════════════════════════════════
+
+# Avec arret_anticipe=True, le téléchargement s'arrête dès que la fin du
+# <head> et les éléments lus par l'extracteur DOM (prix, adresse) ont été
+# reçus : les premiers nœuds correspondants sont alors dans le tampon. Un
+# état d'application sérialisé plus bas dans la page est en revanche perdu,
+# d'où un mode optionnel, utile pour les gros volumes.
+
+def _marqueur_element(balise: str, classes: str) -> bytes:
+    """Motif d'un élément ``balise`` complet dont l'attribut class contient ``classes``."""
+    return rf"<{balise}\b[^>]*\bclass\s*=\s*[\"']?[^\"'>]*(?:{classes})[^>]*>.*?</{balise}\s*>".encode()
+
+
+_FIN_HEAD = re.compile(rb"</head\s*>", re.I)
+# Par plateforme : fin du <head>, puis un marqueur par champ (l'un de ses éléments)
+_MARQUEURS_ARRET = {
+    plateforme: (_FIN_HEAD, *(
+        re.compile(b"|".join(_marqueur_element(balise, classes) for balise, classes in regle["elements"]), re.I | re.S)
+        for regle in regles.values()
+    ))
+    for plateforme, regles in REGLES_EXTRACTION.items()
+}
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # SCRAPER CENTRIS
 # ═══════════════════════════════════════════════════════════════════════════
 
-def scraper_centris(url: str) -> dict:
+def _extraire_centris(html: str) -> dict:
+    """Champs d'une page d'annonce Centris : données structurées, puis DOM."""
+    return _completer_par_dom(_extraire_structure(html), "centris", html)
+
+
+def scraper_centris(url: str, arret_anticipe: bool = False) -> dict:
     """Tente d'extraire les données d'une annonce Centris."""
     resultat = {
         "plateforme": "Centris",
@@ -84,40 +720,15 @@ def scraper_centris(url: str) -> dict:
         "erreur": None,
     }
 
-    soup = _telecharger_page(url)
-    if soup is None:
+    champs = _extraire_avec_cache(url, _extraire_centris, _MARQUEURS_ARRET["centris"] if arret_anticipe else None)
+    if champs is None:
         resultat["erreur"] = (
             "Impossible de charger la page Centris. "
             "Le site utilise du JavaScript dynamique. "
             "Veuillez saisir les données manuellement."
         )
         return resultat
-
-    # Tentative d'extraction du prix
-    prix_el = soup.find("span", class_=re.compile(r"price|prix", re.I))
-    if prix_el:
-        resultat["prix"] = _nettoyer_prix(prix_el.get_text())
-
-    # Tentative d'extraction de l'adresse
-    adresse_el = soup.find("h2", class_=re.compile(r"address|adresse", re.I))
-    if adresse_el:
-        resultat["adresse"] = adresse_el.get_text(strip=True)
-
-    # Si on n'a pas trouvé le prix, chercher dans les meta tags
-    if resultat["prix"] is None:
-        meta_price = soup.find("meta", {"property": "og:price:amount"})
-        if meta_price:
-            resultat["prix"] = _nettoyer_prix(meta_price.get("content", ""))
-
-    # Tentative titre
-    title = soup.find("title")
-    if title:
-        titre_texte = title.get_text()
-        # Essayer d'extraire le type d'immeuble du titre
-        for mot in ["Duplex", "Triplex", "Quadruplex", "Quintuplex", "Immeuble", "Plex"]:
-            if mot.lower() in titre_texte.lower():
-                resultat["type_immeuble"] = mot
-                break
+    resultat.update(champs)
 
     if resultat["prix"] is None and resultat["adresse"] is None:
         resultat["erreur"] = (
@@ -132,7 +743,12 @@ def scraper_centris(url: str) -> dict:
 # SCRAPER DUPROPRIO
 # ═══════════════════════════════════════════════════════════════════════════
 
-def scraper_duproprio(url: str) -> dict:
+def _extraire_duproprio(html: str) -> dict:
+    """Champs d'une page d'annonce DuProprio : données structurées, puis DOM."""
+    return _completer_par_dom(_extraire_structure(html), "duproprio", html)
+
+
+def scraper_duproprio(url: str, arret_anticipe: bool = False) -> dict:
     """Tente d'extraire les données d'une annonce DuProprio."""
     resultat = {
         "plateforme": "DuProprio",
@@ -147,45 +763,14 @@ def scraper_duproprio(url: str) -> dict:
         "erreur": None,
     }
 
-    soup = _telecharger_page(url)
-    if soup is None:
+    champs = _extraire_avec_cache(url, _extraire_duproprio, _MARQUEURS_ARRET["duproprio"] if arret_anticipe else None)
+    if champs is None:
         resultat["erreur"] = (
             "Impossible de charger la page DuProprio. "
             "Veuillez saisir les données manuellement."
         )
         return resultat
-
-    # Prix
-    prix_el = soup.find("div", class_=re.compile(r"price|listing-price", re.I))
-    if not prix_el:
-        prix_el = soup.find("span", class_=re.compile(r"price", re.I))
-    if prix_el:
-        resultat["prix"] = _nettoyer_prix(prix_el.get_text())
-
-    # Adresse
-    adresse_el = soup.find("h1", class_=re.compile(r"address|listing-location", re.I))
-    if adresse_el:
-        resultat["adresse"] = adresse_el.get_text(strip=True)
-
-    # Meta tags comme fallback
-    if resultat["prix"] is None:
-        meta_price = soup.find("meta", {"property": "og:price:amount"})
-        if meta_price:
-            resultat["prix"] = _nettoyer_prix(meta_price.get("content", ""))
-
-    if resultat["adresse"] is None:
-        meta_title = soup.find("meta", {"property": "og:title"})
-        if meta_title:
-            resultat["adresse"] = meta_title.get("content", "")
-
-    # Type d'immeuble
-    title = soup.find("title")
-    if title:
-        titre_texte = title.get_text()
-        for mot in ["Duplex", "Triplex", "Quadruplex", "Quintuplex", "Immeuble", "Plex"]:
-            if mot.lower() in titre_texte.lower():
-                resultat["type_immeuble"] = mot
-                break
+    resultat.update(champs)
 
     if resultat["prix"] is None and resultat["adresse"] is None:
         resultat["erreur"] = (
@@ -196,6 +781,14 @@ def scraper_duproprio(url: str) -> dict:
     return resultat
 
 
+# Fonctions appelées par les extracteurs : leur source entre dans la version du cache
+_UTILITAIRES_EXTRACTION = (
+    _nettoyer_prix, _classer_immeuble, _type_selon_logements, _detecter_type,
+    _analyser, _texte, _extraire_dom, _documents_json, _montant,
+    _valeur_structuree, _extraire_structure, _completer_par_dom,
+)
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # SCRAPER LESPACS
 # ═══════════════════════════════════════════════════════════════════════════
@@ -223,14 +816,19 @@ def scraper_lespacs(url: str) -> dict:
 # FONCTION PRINCIPALE
 # ═══════════════════════════════════════════════════════════════════════════
 
-def extraire_donnees(url: str) -> dict:
-    """Fonction principale : détecte la plateforme et extrait les données."""
+def extraire_donnees(url: str, arret_anticipe: bool = False) -> dict:
+    """
+    Fonction principale : détecte la plateforme et extrait les données.
+
+    ``arret_anticipe`` interrompt le téléchargement dès que la région utile
+    de la page a été reçue (voir _MARQUEURS_ARRET).
+    """
     plateforme = detecter_plateforme(url)
 
     if plateforme == "centris":
-        return scraper_centris(url)
+        return scraper_centris(url, arret_anticipe)
     elif plateforme == "duproprio":
-        return scraper_duproprio(url)
+        return scraper_duproprio(url, arret_anticipe)
     elif plateforme == "lespacs":
         return scraper_lespacs(url)
     else:
@@ -250,3 +848,83 @@ def extraire_donnees(url: str) -> dict:
                 f"Veuillez saisir les données manuellement."
             ),
         }
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# EXTRACTION EN LOT
+# ═══════════════════════════════════════════════════════════════════════════
+
+# Fin des URLs à extraire (``None`` peut figurer parmi elles)
+_FIN = object()
+# Clés d'un résultat de extraire_donnees
+_CHAMPS_RESULTAT = (
+    "plateforme", "url", "prix", "type_immeuble", "nb_logements", "adresse",
+    "ville", "revenus_bruts", "depenses", "erreur",
+)
+
+
+def extraire_donnees_batch(
+    urls: Iterable[str],
+    concurrence: int = 8,
+    par_domaine: int = 4,
+    arret_anticipe: bool = False,
+) -> Iterator[dict]:
+    """
+    Extrait plusieurs annonces en parallèle et les retourne au fil de l'eau.
+
+    Un pool de threads borné appelle ``extraire_donnees`` sur la session
+    partagée. Au plus ``concurrence`` pages sont en cours au total, et au plus
+    ``par_domaine`` par domaine : une URL n'est lancée que si son domaine a
+    de la capacité, sans bloquer de thread en attente.
+
+    Les résultats sont produits dans l'ordre où ils se terminent (chaque
+    dict contient sa clé "url") ; ``urls`` peut être un générateur. Une
+    extraction qui lève une exception donne un résultat vide avec son
+    message dans "erreur", sans interrompre le reste du lot.
+    """
+    if concurrence < 1 or par_domaine < 1:
+        raise ValueError("concurrence et par_domaine doivent être ≥ 1")
+    # La session partagée n'est jamais remplacée ici : d'autres threads peuvent s'en
+    # servir. Si elle existe déjà avec un pool plus petit que ``par_domaine``, les
+    # connexions en surnombre sont ouvertes quand même, sans être gardées ouvertes.
+    with _verrou_session:
+        if _session is None:
+            configurer_session(taille_pool=max(TAILLE_POOL, par_domaine))
+
+    restantes = iter(urls)
+    en_attente: dict[str, deque] = defaultdict(deque)
+    actives: dict[str, int] = defaultdict(int)
+    en_cours = {}
+    # URLs lues d'avance au plus, pour ne pas vider un générateur en mémoire
+    tampon_max = 4 * concurrence
+
+    def lancer(executeur: ThreadPoolExecutor) -> None:
+        # Alimente les files par domaine, puis lance tout ce que les plafonds permettent
+        while len(en_cours) < concurrence:
+            domaine = next((d for d, file in en_attente.items() if file and actives[d] < par_domaine), None)
+            if domaine is None:
+                if sum(map(len, en_attente.values())) >= tampon_max:
+                    return
+                url = next(restantes, _FIN)
+                if url is _FIN:
+                    return
+                en_attente[domaine_de(url)].append(url)
+                continue
+            url = en_attente[domaine].popleft()
+            actives[domaine] += 1
+            en_cours[executeur.submit(extraire_donnees, url, arret_anticipe)] = (url, domaine)
+
+    with ThreadPoolExecutor(max_workers=concurrence, thread_name_prefix="scraper") as executeur:
+        lancer(executeur)
+        while en_cours:
+            terminees, _ = wait(en_cours, return_when=FIRST_COMPLETED)
+            for future in terminees:
+                url, domaine = en_cours.pop(future)
+                actives[domaine] -= 1
+                try:
+                    resultat = future.result()
+                except Exception as erreur:
+                    resultat = dict.fromkeys(_CHAMPS_RESULTAT)
+                    resultat.update(url=url, erreur=f"Échec de l'extraction : {erreur}")
+                yield resultat
+            lancer(executeur)
@@ -0,0 +1,239 @@
+"""
+Données de secteurs pour pré-remplir les critères de localisation.
+
+donnees/secteurs.csv décrit un secteur par région de tri d'acheminement
+(RTA : trois premiers caractères du code postal) : centroïde et
+indicateurs (croissance démographique, écart des loyers à la moyenne
+régionale, inoccupation, arrêts de transport, services, commerces,
+criminalité, litiges locatifs). Le fichier fourni est illustratif ; on le
+remplace par un extrait du recensement et de la SCHL au même format.
+
+Au chargement, les indicateurs sont convertis une fois en codes d'options
+de CRITERES (voir location.encoder_reponses), puis les secteurs sont
+rangés dans une grille de cellules (hachage spatial) : un code postal se
+résout par dictionnaire et des coordonnées par les seules cellules
+voisines, en bien moins d'une milliseconde.
+"""
+
+import csv
+import math
+import re
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from location import CODE_ABSENT, CRITERES, IDS_CRITERES, calculer_score_localisation_batch
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# PARAMÈTRES
+# ═══════════════════════════════════════════════════════════════════════════
+
+FICHIER_SECTEURS = Path(__file__).resolve().parent / "donnees" / "secteurs.csv"
+
+PAS_GRILLE = 0.1            # degrés de latitude/longitude par cellule
+DISTANCE_MAX_KM = 25.0      # au-delà, aucun secteur n'est jugé représentatif
+RAYON_TERRE_KM = 6371.0
+
+# Indicateur lu pour chaque critère, bornes séparant ses options (de la
+# meilleure à la pire, dans l'ordre de CRITERES) et sens : True si une
+# valeur plus élevée est meilleure. L'option retenue est le nombre de
+# bornes franchies dans le mauvais sens.
+CLASSEMENT_CRITERES = {
+    "croissance_demographique": ("croissance_pct", (3.0, 1.0, -0.5, -1.5), True),
+    "niveau_loyers": ("ecart_loyer_pct", (15.0, 5.0, -5.0, -15.0), True),
+    "taux_inoccupation": ("inoccupation_pct", (1.0, 3.0, 5.0, 8.0), False),
+    "transport": ("arrets_500m", (25, 12, 6, 1), True),
+    "ecoles": ("services_1km", (14, 10, 6, 3), True),
+    "commerces": ("commerces_1km", (100, 50, 25, 10), True),
+    "securite": ("criminalite_1000", (25.0, 40.0, 60.0, 90.0), False),
+    "risque_locatif": ("litiges_100", (1.0, 2.0, 3.0, 5.0), False),
+}
+
+_RE_CODE_POSTAL = re.compile(r"\b([A-CEGHJ-NPR-TVXY]\d[A-CEGHJ-NPR-TV-Z])\s*-?\s*(\d[A-CEGHJ-NPR-TV-Z]\d)?\b", re.I)
+
+
+def _code_postal(correspondance: re.Match) -> str:
+    rta, ldu = correspondance.groups()
+    return f"{rta.upper()} {ldu.upper()}" if ldu else rta.upper()
+
+
+def extraire_code_postal(texte: str) -> str | None:
+    """Premier code postal canadien (ou RTA seule) d'un texte, normalisé « H2J 2L1 » / « H2J »."""
+    correspondance = _RE_CODE_POSTAL.search(texte or "")
+    return _code_postal(correspondance) if correspondance is not None else None
+
+
+def retirer_code_postal(texte: str) -> tuple[str | None, str]:
+    """(code postal comme extraire_code_postal, ``texte`` sans ce code)."""
+    texte = texte or ""
+    correspondance = _RE_CODE_POSTAL.search(texte)
+    if correspondance is None:
+        return None, texte
+    return _code_postal(correspondance), f"{texte[:correspondance.start()]} {texte[correspondance.end():]}"
+
+
+def cellules_anneau(ligne: int, colonne: int, anneau: int):
+    """Cellules de grille à exactement ``anneau`` pas (distance de Tchebychev) de (ligne, colonne)."""
+    if anneau == 0:
+        yield ligne, colonne
+        return
+    for d in range(-anneau, anneau + 1):
+        yield ligne - anneau, colonne + d
+        yield ligne + anneau, colonne + d
+    for d in range(-anneau + 1, anneau):
+        yield ligne + d, colonne - anneau
+        yield ligne + d, colonne + anneau
+
+
+def coder_indicateurs(colonnes: dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Codes d'options (N × len(CRITERES), ordre de IDS_CRITERES) déduits des
+    colonnes d'indicateurs. Une valeur manquante (NaN) donne CODE_ABSENT.
+    """
+    nb = len(next(iter(colonnes.values())))
+    codes = np.full((nb, len(IDS_CRITERES)), CODE_ABSENT, dtype=np.int8)
+    for j, cid in enumerate(IDS_CRITERES):
+        colonne, bornes, croissant = CLASSEMENT_CRITERES[cid]
+        valeurs = colonnes[colonne]
+        bornes = np.asarray(bornes, dtype=float)
+        if croissant:
+            rang = np.sum(valeurs[:, None] < bornes[None, :], axis=1)
+        else:
+            rang = np.sum(valeurs[:, None] >= bornes[None, :], axis=1)
+        codes[:, j] = np.where(np.isnan(valeurs), CODE_ABSENT, rang)
+    return codes
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SECTEURS
+# ═══════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class Secteur:
+    """Secteur trouvé, avec les réponses aux critères qu'il suggère."""
+
+    rta: str
+    municipalite: str
+    latitude: float
+    longitude: float
+    distance_km: float | None
+    indicateurs: dict[str, float]
+    reponses: dict[str, str]
+
+
+class Secteurs:
+    """Secteurs chargés en mémoire, indexés par RTA et par grille spatiale."""
+
+    def __init__(self, chemin: str | Path = FICHIER_SECTEURS, pas: float = PAS_GRILLE):
+        self.chemin = Path(chemin)
+        self.pas = pas
+        with open(self.chemin, encoding="utf-8", newline="") as fichier:
+            lignes = list(csv.DictReader(fichier))
+
+        self.rta = [ligne["rta"].strip().upper() for ligne in lignes]
+        self.municipalites = [ligne["municipalite"] for ligne in lignes]
+        self.latitudes = np.array([float(ligne["latitude"]) for ligne in lignes])
+        self.longitudes = np.array([float(ligne["longitude"]) for ligne in lignes])
+        colonnes_indicateurs = {colonne for colonne, _, _ in CLASSEMENT_CRITERES.values()}
+        self.indicateurs = {
+            colonne: np.array([float(ligne[colonne]) if ligne.get(colonne) else np.nan for ligne in lignes])
+            for colonne in sorted(colonnes_indicateurs)
+        }
+        self.codes = coder_indicateurs(self.indicateurs)
+
+        self._par_rta = {rta: i for i, rta in enumerate(self.rta)}
+        self._grille: dict[tuple[int, int], list[int]] = defaultdict(list)
+        for i, (latitude, longitude) in enumerate(zip(self.latitudes, self.longitudes)):
+            self._grille[self._cellule(latitude, longitude)].append(i)
+
+    def __len__(self) -> int:
+        return len(self.rta)
+
+    def _cellule(self, latitude: float, longitude: float) -> tuple[int, int]:
+        return math.floor(latitude / self.pas), math.floor(longitude / self.pas)
+
+    # ── Recherche ────────────────────────────────────────────────────────────
+
+    def par_code_postal(self, code_postal: str) -> Secteur | None:
+        """Secteur de la RTA d'un code postal (« H2J 2L1 », « h2j2l1 » ou « H2J »)."""
+        code = extraire_code_postal(code_postal)
+        i = self._par_rta.get(code[:3]) if code else None
+        return None if i is None else self.secteur(i)
+
+    def plus_proche(self, latitude: float, longitude: float, distance_max: float = DISTANCE_MAX_KM) -> Secteur | None:
+        """
+        Secteur dont le centroïde est le plus proche du point, à moins de
+        ``distance_max`` km. Les cellules sont parcourues par anneaux
+        concentriques, jusqu'à ce qu'aucun anneau ne puisse plus contenir
+        de secteur plus proche.
+        """
+        ligne, colonne = self._cellule(latitude, longitude)
+        # Côté le plus court d'une cellule (km) : la longitude se resserre vers les pôles
+        latitude_max = min(abs(latitude) + self.pas, 89.0)
+        km_par_cellule = math.radians(self.pas) * RAYON_TERRE_KM * math.cos(math.radians(latitude_max))
+        anneaux_max = math.ceil(distance_max / km_par_cellule) + 1
+
+        meilleur, meilleure_distance = None, distance_max
+        for anneau in range(anneaux_max + 1):
+            if meilleur is not None and (anneau - 1) * km_par_cellule > meilleure_distance:
+                break
+            for cellule in cellules_anneau(ligne, colonne, anneau):
+                for i in self._grille.get(cellule, ()):
+                    distance = self._distance_km(latitude, longitude, i)
+                    if distance <= meilleure_distance:
+                        meilleur, meilleure_distance = i, distance
+        return None if meilleur is None else self.secteur(meilleur, meilleure_distance)
+
+    def _distance_km(self, latitude: float, longitude: float, i: int) -> float:
+        """Distance équirectangulaire (précise à l'échelle d'une région)."""
+        phi = math.radians((latitude + self.latitudes[i]) / 2)
+        dx = math.radians(longitude - self.longitudes[i]) * math.cos(phi)
+        dy = math.radians(latitude - self.latitudes[i])
+        return RAYON_TERRE_KM * math.hypot(dx, dy)
+
+    # ── Résultats ────────────────────────────────────────────────────────────
+
+    def secteur(self, i: int, distance_km: float | None = None) -> Secteur:
+        return Secteur(
+            rta=self.rta[i],
+            municipalite=self.municipalites[i],
+            latitude=float(self.latitudes[i]),
+            longitude=float(self.longitudes[i]),
+            distance_km=distance_km,
+            indicateurs={colonne: float(valeurs[i]) for colonne, valeurs in self.indicateurs.items()},
+            reponses=self.reponses(i),
+        )
+
+    def reponses(self, i: int) -> dict[str, str]:
+        """Réponses {critere_id: option} du secteur, pour calculer_score_localisation."""
+        return {
+            cid: list(CRITERES[cid]["options"])[code]
+            for cid, code in zip(IDS_CRITERES, self.codes[i].tolist())
+            if code != CODE_ABSENT
+        }
+
+    def scores(self) -> dict[str, np.ndarray]:
+        """Score de localisation de tous les secteurs (voir calculer_score_localisation_batch)."""
+        return calculer_score_localisation_batch(self.codes)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SECTEURS PARTAGÉS DU MODULE
+# ═══════════════════════════════════════════════════════════════════════════
+
+_secteurs: Secteurs | None = None
+_verrou_secteurs = threading.Lock()
+
+
+def obtenir_secteurs() -> Secteurs | None:
+    """Secteurs de FICHIER_SECTEURS, chargés au premier appel (None si le fichier est absent)."""
+    global _secteurs
+    if _secteurs is None:
+        with _verrou_secteurs:
+            if _secteurs is None and FICHIER_SECTEURS.is_file():
+                _secteurs = Secteurs()
+    return _secteurs